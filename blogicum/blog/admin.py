@@ -1,6 +1,7 @@
 from django.contrib import admin
 
-from .models import Category, Comment, Location, Post
+from .models import Category, Comment, ImageTask, Location, Post
+from .search import search_posts
 
 
 @admin.register(Post)
@@ -18,9 +19,15 @@ class PostAdmin(admin.ModelAdmin):
     list_editable = (
         'is_published',
     )
-    search_fields = ('title', 'pub_date', 'category')
+    search_fields = ('title', 'text')
     list_filter = ('pub_date', 'category')
 
+    def get_search_results(self, request, queryset, search_term):
+        """Ищет по поисковому индексу вместо LIKE по всей таблице."""
+        if not search_term.strip():
+            return queryset, False
+        return search_posts(queryset, search_term), False
+
 
 @admin.register(Location)
 class LocationAdmin(admin.ModelAdmin):
@@ -59,4 +66,16 @@ class CommentAdmin(admin.ModelAdmin):
     )
 
 
+@admin.register(ImageTask)
+class ImageTaskAdmin(admin.ModelAdmin):
+    list_display = (
+        'image',
+        'post',
+        'attempts',
+        'locked_at',
+        'created_at'
+    )
+    readonly_fields = ('error',)
+
+
 admin.site.empty_value_display = 'Не задано'
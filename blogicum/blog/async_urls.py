@@ -0,0 +1,20 @@
+"""Маршруты блога для ASGI: страницы для чтения заменены async-вариантами."""
+from django.urls import path
+
+from . import async_views, urls
+
+app_name = urls.app_name
+
+ASYNC_VIEWS = {
+    'index': async_views.AsyncPostsListView,
+    'post_detail': async_views.AsyncPostDetailView,
+    'category_posts': async_views.AsyncCategoryDetailView,
+    'profile': async_views.AsyncUserDetailView,
+}
+
+urlpatterns = [
+    path(str(pattern.pattern), ASYNC_VIEWS[pattern.name].as_view(),
+         name=pattern.name)
+    if pattern.name in ASYNC_VIEWS else pattern
+    for pattern in urls.urlpatterns
+]
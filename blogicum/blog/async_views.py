@@ -0,0 +1,238 @@
+"""
+Async-варианты страниц для чтения, которые обслуживаются под ASGI.
+
+ORM в Django 3.2 синхронный, поэтому каждая выборка выполняется в потоке
+через sync_to_async. Независимые выборки одной страницы — например,
+категория и страница её постов — запускаются одновременно в потоках
+пула, у каждого из которых своё соединение с базой. Кеш страниц,
+условный GET и чтение из реплик работают так же, как в views.py.
+"""
+import asyncio
+from contextlib import nullcontext
+from http import HTTPStatus
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.paginator import InvalidPage, Paginator
+from django.db import close_old_connections
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from django.template.response import TemplateResponse
+from django.utils.cache import get_conditional_response
+from django.views import View
+
+from .forms import CommentForm
+from .middleware import reads_from_replicas
+from .mixins import AsyncViewMixin, page_validators, set_page_validators
+from .models import Category, Comment, Post
+from .page_cache import (POST_LIST_TAG, cache_page_response, get_cached_page,
+                         page_cache_key, post_tag)
+from .paginators import KeysetPaginator
+from .routers import read_from_replicas
+from .utils import get_post_list
+from .views import (COMMENTS_CHUNK_SIZE, MAX_POSTS_ON_MAIN,
+                    get_post_page_state, get_tagged_page_state)
+
+UserModel = get_user_model()
+
+
+def _with_connection_cleanup(func, *args, **kwargs):
+    # close_old_connections() вызывается сигналами запроса только в его
+    # потоке; соединения потоков пула проверяются и закрываются здесь,
+    # с учётом CONN_MAX_AGE. Пока соединение не устарело, поток пула
+    # использует его и в следующих вызовах.
+    close_old_connections()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+def in_thread(func, *args, **kwargs):
+    """Выполняет синхронную функцию в отдельном потоке пула."""
+    return sync_to_async(_with_connection_cleanup, thread_sensitive=False)(
+        func, *args, **kwargs)
+
+
+def get_page(queryset, page_number, per_page=MAX_POSTS_ON_MAIN):
+    """Страница выборки по номеру с уже загруженными объектами."""
+    paginator = Paginator(queryset, per_page)
+    try:
+        page = paginator.page(page_number or 1)
+    except InvalidPage:
+        raise Http404('Такой страницы нет.')
+    page.object_list = list(page.object_list)
+    return page
+
+
+def get_keyset_page(queryset, field='pub_date', descending=True,
+                    per_page=MAX_POSTS_ON_MAIN, after=None, before=None):
+    """Страница курсорной пагинации с уже загруженными объектами."""
+    return KeysetPaginator(queryset, per_page, field, descending).page(
+        after=after, before=before)
+
+
+class AsyncPageView(AsyncViewMixin, View):
+    """
+    Основа async-страницы.
+
+    Для неавторизованных пользователей состояние страницы для условного
+    GET и страница из кеша запрашиваются одновременно; шаблон
+    отрисовывается, только если ни то, ни другое не дало ответа.
+    """
+
+    template_name = None
+    page_cache = True
+    page_cache_tags = ()
+
+    def get_page_state(self):
+        """Пара (время изменения, данные для ETag) или None."""
+        return None
+
+    def get_page_cache_tags(self):
+        return self.page_cache_tags
+
+    async def get_context_data(self):
+        return {}
+
+    def inspect_user(self):
+        """Загружает пользователя; возвращает (аноним, читать из реплик)."""
+        return (not self.request.user.is_authenticated,
+                reads_from_replicas(self.request))
+
+    def get_cached_page(self):
+        key = page_cache_key(self.request, self.get_page_cache_tags())
+        return key, get_cached_page(key)
+
+    async def render_page(self):
+        context = await self.get_context_data()
+        response = TemplateResponse(self.request, self.template_name, context)
+        await sync_to_async(response.render)()
+        return response
+
+    async def get(self, request, *args, **kwargs):
+        anonymous, use_replicas = await sync_to_async(self.inspect_user)()
+        with read_from_replicas() if use_replicas else nullcontext():
+            if not anonymous:
+                return await self.render_page()
+            return await self.get_anonymous_page()
+
+    async def get_anonymous_page(self):
+        lookups = [in_thread(self.get_page_state)]
+        if self.page_cache:
+            lookups.append(in_thread(self.get_cached_page))
+        state, *cached = await asyncio.gather(*lookups)
+        key, response = cached[0] if cached else (None, None)
+        validators = None if state is None else page_validators(state)
+        if validators is not None:
+            etag, last_modified = validators
+            not_modified = get_conditional_response(
+                self.request, etag=etag, last_modified=last_modified)
+            if not_modified is not None:
+                return set_page_validators(not_modified, *validators)
+        if response is None:
+            response = await self.render_page()
+            if key is not None and response.status_code == HTTPStatus.OK:
+                await in_thread(cache_page_response, key, response)
+        if validators is not None:
+            set_page_validators(response, *validators)
+        return response
+
+
+class AsyncPostsListView(AsyncPageView):
+    template_name = 'blog/index.html'
+    page_cache_tags = (POST_LIST_TAG,)
+
+    def get_page_state(self):
+        return get_tagged_page_state(self.page_cache_tags)
+
+    async def get_context_data(self):
+        page = await in_thread(
+            get_keyset_page, get_post_list(),
+            after=self.request.GET.get('after'),
+            before=self.request.GET.get('before'))
+        return {'page_obj': page, 'object_list': page.object_list}
+
+
+class AsyncPostDetailView(AsyncPageView):
+    template_name = 'blog/detail.html'
+
+    def get_page_state(self):
+        return get_post_page_state(self.kwargs['post_id'])
+
+    def get_page_cache_tags(self):
+        return (post_tag(self.kwargs['post_id']),)
+
+    async def get_context_data(self):
+        post_id = self.kwargs['post_id']
+        post, comments = await asyncio.gather(
+            in_thread(
+                get_object_or_404,
+                Post.objects.visible_to(self.request.user).with_related(),
+                pk=post_id),
+            in_thread(
+                get_keyset_page,
+                Comment.objects.filter(post_id=post_id).select_related(
+                    'author'),
+                'created_at', descending=False,
+                per_page=COMMENTS_CHUNK_SIZE),
+        )
+        return {'post': post, 'object': post, 'form': CommentForm(),
+                'comments': comments}
+
+
+class AsyncCategoryDetailView(AsyncPageView):
+    template_name = 'blog/category.html'
+    page_cache_tags = (POST_LIST_TAG,)
+
+    def get_page_state(self):
+        category = Category.objects.filter(
+            slug=self.kwargs['category_slug'], is_published=True
+        ).values('pk', 'updated_at').first()
+        if category is None:
+            return None
+        return get_tagged_page_state(
+            self.page_cache_tags, category, category['updated_at'])
+
+    async def get_context_data(self):
+        slug = self.kwargs['category_slug']
+        category, page = await asyncio.gather(
+            in_thread(
+                get_object_or_404, Category, slug=slug, is_published=True),
+            in_thread(
+                get_page, get_post_list().filter(category__slug=slug),
+                self.request.GET.get('page')),
+        )
+        return {'category': category, 'object': category, 'page_obj': page,
+                'paginator': page.paginator,
+                'is_paginated': page.has_other_pages(),
+                'object_list': page.object_list}
+
+
+class AsyncUserDetailView(AsyncPageView):
+    template_name = 'blog/profile.html'
+    # Как и UserDetailView, профиль не кешируется целиком.
+    page_cache = False
+
+    def get_page_state(self):
+        profile = UserModel.objects.filter(
+            username=self.kwargs['username']
+        ).values('pk', 'first_name', 'last_name', 'is_staff').first()
+        if profile is None:
+            return None
+        return get_tagged_page_state((POST_LIST_TAG,), profile)
+
+    async def get_context_data(self):
+        username = self.kwargs['username']
+        profile, page = await asyncio.gather(
+            in_thread(get_object_or_404, UserModel, username=username),
+            in_thread(
+                get_page,
+                Post.objects.filter(author__username=username).visible_to(
+                    self.request.user).with_related().order_by('-pub_date'),
+                self.request.GET.get('page')),
+        )
+        return {'profile': profile, 'object': profile, 'page_obj': page,
+                'paginator': page.paginator,
+                'is_paginated': page.has_other_pages(),
+                'object_list': page.object_list}
@@ -0,0 +1,176 @@
+"""
+Генератор синтетического набора данных для замеров.
+
+Модуль не зависит от Django, чтобы его функции можно было выполнять
+в отдельных процессах. Объекты порождаются пачками по
+GENERATION_CHUNK_SIZE; генератор случайных чисел каждой пачки
+инициализируется зерном набора, видом объектов и номером пачки, поэтому
+набор одинаков при любом числе процессов и размере пачек вставки.
+Ссылки на другие объекты задаются их порядковыми номерами.
+"""
+import math
+import random
+from functools import lru_cache
+from itertools import accumulate
+
+# Размер пачки генерации входит в зерно пачек, поэтому не зависит
+# от размера пачек вставки: иначе --batch-size менял бы сам набор.
+GENERATION_CHUNK_SIZE = 1000
+
+WORDS = (
+    'публикация поездка горы море город дорога утро вечер солнце '
+    'дождь лес река озеро поезд самолёт друг семья работа книга фильм '
+    'музыка кофе завтрак ужин прогулка парк улица дом окно небо ветер '
+    'снег лето зима осень весна праздник история фотография камера '
+    'вид берег мост площадь музей выставка концерт театр рынок кухня '
+    'рецепт пирог чай сад цветы кот собака ребёнок школа учёба проект '
+    'идея мысль вопрос ответ новость событие встреча разговор письмо '
+    'тишина шум свет тень звезда луна облако туман поле деревня '
+    'красивый тёплый холодный новый старый большой маленький долгий '
+    'быстрый тихий светлый тёмный интересный важный простой сложный '
+    'гулять смотреть читать писать думать ехать идти видеть слушать '
+    'готовить любить помнить ждать встречать рассказывать снимать '
+    'очень снова вместе сегодня вчера завтра всегда иногда долго рядом'
+).split()
+# Средняя длина и разброс числа слов (логнормальное распределение).
+POST_WORDS = (120, 0.8, 5, 1500)
+COMMENT_WORDS = (12, 0.9, 1, 300)
+TITLE_WORDS = (2, 8)
+SENTENCE_WORDS = (4, 15)
+MINUTES_IN_DAY = 24 * 60
+FEMALE_NAMES = (
+    'Анна Мария Елена Ольга Наталья Ирина Дарья Алиса Ксения').split()
+MALE_NAMES = (
+    'Иван Пётр Сергей Андрей Алексей Михаил Дмитрий Олег Павел').split()
+LAST_NAMES = (
+    'Иванов Петров Смирнов Кузнецов Попов Соколов Лебедев Козлов Новиков '
+    'Морозов Волков Орлов Зайцев Павлов Семёнов Голубев Виноградов Белов'
+).split()
+
+
+def chunk_random(seed, kind, number):
+    """Генератор случайных чисел пачки."""
+    return random.Random(f'{seed}:{kind}:{number}')
+
+
+@lru_cache(maxsize=8)
+def popularity(seed, kind, count, exponent):
+    """
+    Накопленные веса закона Ципфа для count объектов.
+
+    Ранги перемешаны, чтобы популярность не зависела от порядкового
+    номера объекта.
+    """
+    ranks = list(range(1, count + 1))
+    random.Random(f'{seed}:{kind}:popularity').shuffle(ranks)
+    return list(accumulate(rank ** -exponent for rank in ranks))
+
+
+def word_count(rnd, median, sigma, low, high):
+    return min(high, max(low, round(
+        rnd.lognormvariate(math.log(median), sigma))))
+
+
+def sentence(rnd, words):
+    text = ' '.join(rnd.choice(WORDS) for _ in range(words))
+    return text[0].upper() + text[1:]
+
+
+def paragraph(rnd, words):
+    """Текст из предложений общей длиной words слов."""
+    sentences = []
+    while words > 0:
+        length = min(words, rnd.randint(*SENTENCE_WORDS))
+        sentences.append(sentence(rnd, length) + '.')
+        words -= length
+    return ' '.join(sentences)
+
+
+def user_rows(seed, count):
+    """Пары (имя, фамилия) для count пользователей."""
+    rnd = chunk_random(seed, 'user', 0)
+    rows = []
+    for _ in range(count):
+        last_name = rnd.choice(LAST_NAMES)
+        if rnd.random() < 0.5:
+            rows.append((rnd.choice(FEMALE_NAMES), last_name + 'а'))
+        else:
+            rows.append((rnd.choice(MALE_NAMES), last_name))
+    return rows
+
+
+def category_rows(seed, count, unpublished):
+    """Кортежи (заголовок, описание, опубликована ли)."""
+    rnd = chunk_random(seed, 'category', 0)
+    return [(sentence(rnd, rnd.randint(1, 3)),
+             paragraph(rnd, rnd.randint(10, 40)),
+             rnd.random() >= unpublished)
+            for _ in range(count)]
+
+
+def location_rows(seed, count, unpublished):
+    """Пары (название, опубликовано ли)."""
+    rnd = chunk_random(seed, 'location', 0)
+    return [(sentence(rnd, rnd.randint(1, 2)), rnd.random() >= unpublished)
+            for _ in range(count)]
+
+
+def post_chunk(task):
+    """
+    Пачка постов.
+
+    Кортежи (заголовок, текст, сдвиг даты публикации в минутах
+    от текущего момента, опубликован ли, номер автора, номер категории,
+    номер местоположения).
+    """
+    seed, number, count, options = task
+    rnd = chunk_random(seed, 'post', number)
+    authors = popularity(
+        seed, 'author', options['users'], options['author_exponent'])
+    future_minutes = options['future_days'] * MINUTES_IN_DAY
+    past_minutes = options['days'] * MINUTES_IN_DAY
+    posts = []
+    for author in rnd.choices(
+            range(options['users']), cum_weights=authors, k=count):
+        if rnd.random() < options['future']:
+            offset = rnd.randint(1, future_minutes)
+        else:
+            offset = -rnd.randint(0, past_minutes)
+        posts.append((
+            sentence(rnd, rnd.randint(*TITLE_WORDS)),
+            paragraph(rnd, word_count(rnd, *POST_WORDS)),
+            offset,
+            rnd.random() >= options['unpublished'],
+            author,
+            rnd.randrange(options['categories']),
+            rnd.randrange(options['locations']),
+        ))
+    return posts
+
+
+def comment_chunk(task):
+    """
+    Пачка комментариев.
+
+    Кортежи (номер поста, номер автора, текст, доля времени между
+    публикацией поста и текущим моментом).
+    """
+    seed, number, count, options = task
+    rnd = chunk_random(seed, 'comment', number)
+    posts = popularity(
+        seed, 'post', options['posts'], options['comment_exponent'])
+    return [
+        (post, rnd.randrange(options['users']),
+         paragraph(rnd, word_count(rnd, *COMMENT_WORDS)), rnd.random())
+        for post in rnd.choices(
+            range(options['posts']), cum_weights=posts, k=count)
+    ]
+
+
+def chunk_tasks(seed, total, options):
+    """Задания для генерации total объектов пачками."""
+    return [
+        (seed, number, min(GENERATION_CHUNK_SIZE, total - start), options)
+        for number, start in enumerate(
+            range(0, total, GENERATION_CHUNK_SIZE))
+    ]
@@ -0,0 +1,11 @@
+from django.conf import settings
+
+
+def configure_sqlite(connection):
+    """Выполняет SQLITE_PRAGMAS для нового соединения с SQLite."""
+    if connection.vendor != 'sqlite':
+        return
+    # Прагмы выполняются напрямую через драйвер, чтобы не попадать
+    # в журнал запросов и счётчики запросов в тестах.
+    for name, value in settings.SQLITE_PRAGMAS.items():
+        connection.connection.execute(f'PRAGMA {name} = {value}')
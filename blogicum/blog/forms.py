@@ -1,6 +1,10 @@
 from django import forms
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.forms import UserCreationForm
+from django.core.exceptions import ValidationError
+from django.template.defaultfilters import filesizeformat
+from PIL import Image
 
 from .models import Comment, Post
 
@@ -39,12 +43,61 @@ class CommentForm(forms.ModelForm):
         fields = ('text',)
 
 
+class PostImageField(forms.ImageField):
+    """
+    Поле изображения с проверкой размера файла и числа пикселей.
+
+    Обе проверки выполняются до того, как Pillow начнёт разбирать
+    файл целиком: размер известен обработчику загрузки, а ширина
+    и высота читаются из заголовка изображения.
+    """
+
+    default_error_messages = {
+        'file_too_large': 'Размер файла не должен превышать %(max_size)s.',
+        'too_many_pixels': (
+            'Изображение слишком большое: '
+            'допускается не более %(max_pixels)s пикселей.'),
+    }
+
+    def to_python(self, data):
+        if data and data.size > settings.POST_IMAGE_MAX_SIZE:
+            raise ValidationError(
+                self.error_messages['file_too_large'],
+                code='file_too_large',
+                params={'max_size': filesizeformat(
+                    settings.POST_IMAGE_MAX_SIZE)},
+            )
+        if data and hasattr(data, 'seek'):
+            self.check_dimensions(data)
+        return super().to_python(data)
+
+    def check_dimensions(self, data):
+        try:
+            # Image.open читает только заголовок файла.
+            width, height = Image.open(data).size
+            too_many_pixels = width * height > settings.POST_IMAGE_MAX_PIXELS
+        except Image.DecompressionBombError:
+            too_many_pixels = True
+        except (OSError, SyntaxError, ValueError):
+            # Некорректный файл отклонит проверка ImageField.
+            too_many_pixels = False
+        finally:
+            data.seek(0)
+        if too_many_pixels:
+            raise ValidationError(
+                self.error_messages['too_many_pixels'],
+                code='too_many_pixels',
+                params={'max_pixels': settings.POST_IMAGE_MAX_PIXELS},
+            )
+
+
 class PostForm(forms.ModelForm):
     """Форма для отображения объекта публикации."""
 
     class Meta:
         model = Post
         exclude = ('author',)
+        field_classes = {'image': PostImageField}
         widgets = {
             'pub_date': forms.DateTimeInput(attrs={'type': 'datetime-local'})
         }
@@ -0,0 +1,127 @@
+import posixpath
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+from .models import ImageStatus, Post
+from .storage import post_image_storage
+
+VARIANTS_DIR = 'variants'
+# Ширина производных изображений: карточка в ленте, страница поста
+# и их версии для экранов с двойной плотностью пикселей.
+IMAGE_VARIANTS = {
+    'card': 640,
+    'card_2x': 1280,
+    'detail': 960,
+    'detail_2x': 1920,
+}
+# Ошибки Pillow при разборе повреждённых или слишком больших файлов.
+IMAGE_ERRORS = (OSError, SyntaxError, ValueError, Image.DecompressionBombError)
+IMAGE_FORMATS = {
+    'webp': {'format': 'WEBP', 'quality': 80, 'method': 6},
+    'jpg': {'format': 'JPEG', 'quality': 85, 'optimize': True,
+            'progressive': True},
+}
+
+
+def variant_name(name, variant, extension):
+    """Имя файла производного изображения рядом с оригиналом."""
+    directory, filename = posixpath.split(name)
+    stem = posixpath.splitext(filename)[0]
+    return posixpath.join(
+        directory, VARIANTS_DIR, f'{stem}_{variant}.{extension}')
+
+
+def variant_size(width, height, variant):
+    """Размер производного изображения; оригинал никогда не увеличивается."""
+    target = min(IMAGE_VARIANTS[variant], width)
+    return target, max(1, round(height * target / width))
+
+
+def variant_srcset(name, width, height, extension, storage=post_image_storage):
+    """Значение атрибута srcset из всех вариантов одного формата."""
+    candidates = {}
+    for variant in IMAGE_VARIANTS:
+        variant_width = variant_size(width, height, variant)[0]
+        candidates.setdefault(
+            variant_width,
+            storage.url(variant_name(name, variant, extension)))
+    return ', '.join(
+        f'{url} {variant_width}w'
+        for variant_width, url in sorted(candidates.items())
+    )
+
+
+def prepare_image(image):
+    """Поворачивает по EXIF и приводит к RGB для сохранения в JPEG/WebP."""
+    image = ImageOps.exif_transpose(image)
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    return image
+
+
+def strip_metadata(name, storage=post_image_storage):
+    """
+    Сохраняет копию оригинала без EXIF, повёрнутую согласно метаданным.
+
+    Возвращает имя очищенного файла; файлы без EXIF не копируются.
+    """
+    with storage.open(name) as source:
+        image = Image.open(source)
+        if not image.getexif():
+            return name
+        image_format = image.format
+        image = ImageOps.exif_transpose(image)
+    buffer = BytesIO()
+    image.save(buffer, format=image_format)
+    return storage.save(name, ContentFile(buffer.getvalue()))
+
+
+def generate_variants(name, storage=post_image_storage):
+    """
+    Создаёт все производные изображения для файла из хранилища.
+
+    Возвращает описание для Post.image_variants: имя оригинала
+    и его размеры после поворота по EXIF.
+    """
+    with storage.open(name) as source:
+        original = prepare_image(Image.open(source))
+    for variant in IMAGE_VARIANTS:
+        resized = original.resize(
+            variant_size(*original.size, variant), Image.LANCZOS)
+        for extension, options in IMAGE_FORMATS.items():
+            buffer = BytesIO()
+            resized.save(buffer, **options)
+            storage.save_as(variant_name(name, variant, extension),
+                            ContentFile(buffer.getvalue()))
+    width, height = original.size
+    return {'name': name, 'width': width, 'height': height}
+
+
+def delete_variants(name, storage=post_image_storage):
+    for variant in IMAGE_VARIANTS:
+        for extension in IMAGE_FORMATS:
+            storage.delete(variant_name(name, variant, extension))
+
+
+def delete_unused_image(name, storage=post_image_storage):
+    """
+    Удаляет изображение с вариантами, если его не использует ни один пост.
+
+    Одинаковые загрузки хранятся одним файлом, поэтому удалять его
+    при замене или удалении изображения поста можно только последним.
+    """
+    if not name or Post.objects.filter(image=name).exists():
+        return False
+    storage.delete(name)
+    delete_variants(name, storage)
+    return True
+
+
+def update_image_variants(post):
+    """Создаёт варианты изображения поста и сохраняет их описание."""
+    post.image_variants = generate_variants(post.image.name)
+    post.image_status = ImageStatus.READY
+    Post.objects.filter(pk=post.pk, image=post.image.name).update(
+        image_variants=post.image_variants, image_status=post.image_status)
@@ -0,0 +1,374 @@
+"""
+Нагрузочное тестирование запущенного сервера блога.
+
+Виртуальные пользователи — потоки со своими cookies — в течение заданного
+времени выполняют сценарии, похожие на живой трафик: листают ленту
+и категории, читают посты, а вошедшие пользователи ещё комментируют
+и публикуют посты с изображениями. Каждый запрос относится к маршруту
+из blog/urls.py через resolve(); по маршрутам считаются перцентили
+задержки и пропускная способность. Посты и категории для сценариев
+берутся из той же базы, с которой работает сервер.
+"""
+import io
+import json
+import math
+import random
+import re
+import secrets
+import threading
+import time
+import uuid
+from http.cookiejar import CookieJar
+from typing import Dict, List, NamedTuple
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode, urlsplit
+from urllib.request import (HTTPCookieProcessor, HTTPRedirectHandler, Request,
+                            build_opener)
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.urls import Resolver404, resolve
+from django.utils import timezone
+from PIL import Image
+
+from .models import Category, Location, Post
+
+User = get_user_model()
+LOAD_USERNAME_PREFIX = 'loadtest_user_'
+# Сценарий -> (вес, нужен ли вход).
+SCENARIOS = {
+    'browse_feed': (40, False),
+    'browse_category': (20, False),
+    'read_post': (30, False),
+    'add_comment': (7, True),
+    'create_post': (3, True),
+}
+PERCENTILES = {'p50_ms': 0.5, 'p95_ms': 0.95, 'p99_ms': 0.99}
+REQUEST_TIMEOUT = 30
+NEXT_PAGE_RE = re.compile(r'href="\?after=([\w-]+)"')
+PAGE_RE = re.compile(r'href="\?page=(\d+)"')
+MORE_COMMENTS_RE = re.compile(r'href="(/posts/\d+/comments/\?after=[\w-]+)"')
+
+
+class Targets(NamedTuple):
+    post_ids: List[int]
+    category_slugs: List[str]
+    category_ids: List[int]
+    location_ids: List[int]
+
+
+def load_targets(sample=1000):
+    """Опубликованные посты, категории и местоположения для сценариев."""
+    categories = Category.objects.filter(is_published=True)
+    return Targets(
+        list(Post.objects.published().order_by('?').values_list(
+            'pk', flat=True)[:sample]),
+        list(categories.values_list('slug', flat=True)),
+        list(categories.values_list('pk', flat=True)),
+        list(Location.objects.filter(is_published=True).values_list(
+            'pk', flat=True)),
+    )
+
+
+def prepare_accounts(count):
+    """
+    Создаёт пользователей нагрузки со случайным паролем этого запуска.
+
+    Возвращает имена пользователей и пароль.
+    """
+    names = [f'{LOAD_USERNAME_PREFIX}{i}' for i in range(count)]
+    password = secrets.token_urlsafe()
+    hashed = make_password(password)
+    existing = set(User.objects.filter(username__in=names).values_list(
+        'username', flat=True))
+    User.objects.bulk_create(
+        User(username=name, password=hashed)
+        for name in names if name not in existing)
+    User.objects.filter(username__in=existing).update(password=hashed)
+    return names, password
+
+
+def remove_accounts():
+    """Удаляет пользователей нагрузки вместе с их постами и комментариями."""
+    return User.objects.filter(
+        username__startswith=LOAD_USERNAME_PREFIX).delete()[0]
+
+
+def percentile(values, share):
+    """Перцентиль по ближайшему рангу для отсортированного списка."""
+    if not values:
+        return None
+    return values[max(0, math.ceil(share * len(values)) - 1)]
+
+
+def route_name(path):
+    """Имя маршрута для пути запроса, например blog:post_detail."""
+    try:
+        return resolve(urlsplit(path).path).view_name
+    except Resolver404:
+        return 'other'
+
+
+class Recorder:
+    """Собирает задержки и ошибки запросов по маршрутам из всех потоков."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = {}
+        self.errors = {}
+
+    def add(self, route, seconds, ok):
+        with self.lock:
+            self.latencies.setdefault(route, []).append(seconds)
+            self.errors.setdefault(route, 0)
+            if not ok:
+                self.errors[route] += 1
+
+    def _stats(self, latencies, errors, elapsed):
+        latencies = sorted(latencies)
+        stats = {
+            'requests': len(latencies),
+            'errors': errors,
+            'rps': round(len(latencies) / elapsed, 2),
+        }
+        for key, share in PERCENTILES.items():
+            stats[key] = round(1000 * percentile(latencies, share), 2)
+        stats['max_ms'] = round(1000 * latencies[-1], 2)
+        return stats
+
+    def report(self, elapsed):
+        with self.lock:
+            routes = {
+                route: self._stats(
+                    latencies, self.errors[route], elapsed)
+                for route, latencies in sorted(self.latencies.items())
+            }
+            total = self._stats(
+                [value for latencies in self.latencies.values()
+                 for value in latencies],
+                sum(self.errors.values()), elapsed,
+            ) if self.latencies else {}
+        return {'total': total, 'routes': routes}
+
+
+class NoRedirect(HTTPRedirectHandler):
+    """Перенаправления не выполняются: замеряется сам маршрут."""
+
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+def sample_image(seed=0, size=(1200, 800)):
+    """JPEG, похожий по размеру на фотографию."""
+    image = Image.effect_noise(size, 48).convert('RGB')
+    image = Image.merge('RGB', [
+        channel.point(lambda value, shift=shift: (value + shift) % 256)
+        for shift, channel in zip(
+            random.Random(seed).sample(range(256), 3), image.split())
+    ])
+    buffer = io.BytesIO()
+    image.save(buffer, 'JPEG', quality=85)
+    return buffer.getvalue()
+
+
+def encode_multipart(fields, files):
+    """Тело multipart/form-data и его Content-Type."""
+    boundary = uuid.uuid4().hex
+    body = io.BytesIO()
+    for name, value in fields.items():
+        body.write(
+            f'--{boundary}\r\nContent-Disposition: form-data; '
+            f'name="{name}"\r\n\r\n{value}\r\n'.encode())
+    for name, (filename, content, content_type) in files.items():
+        body.write(
+            f'--{boundary}\r\nContent-Disposition: form-data; '
+            f'name="{name}"; filename="{filename}"\r\n'
+            f'Content-Type: {content_type}\r\n\r\n'.encode())
+        body.write(content)
+        body.write(b'\r\n')
+    body.write(f'--{boundary}--\r\n'.encode())
+    return body.getvalue(), f'multipart/form-data; boundary={boundary}'
+
+
+class VirtualUser:
+    """Пользователь нагрузки со своими cookies и случайными решениями."""
+
+    def __init__(self, base_url, targets, recorder, rnd, image=None):
+        self.base_url = base_url.rstrip('/')
+        self.targets = targets
+        self.recorder = recorder
+        self.rnd = rnd
+        self.image = image
+        self.cookies = CookieJar()
+        self.opener = build_opener(HTTPCookieProcessor(self.cookies),
+                                   NoRedirect)
+
+    def request(self, path, data=None, files=None, expect=None):
+        """Выполняет запрос и записывает задержку; возвращает (код, тело)."""
+        headers = {}
+        if files:
+            body, headers['Content-Type'] = encode_multipart(data, files)
+        elif data is not None:
+            body = urlencode(data).encode()
+        else:
+            body = None
+        request = Request(self.base_url + path, body, headers)
+        start = time.perf_counter()
+        try:
+            with self.opener.open(
+                    request, timeout=REQUEST_TIMEOUT) as response:
+                status, content = response.status, response.read()
+        except HTTPError as error:
+            status, content = error.code, error.read()
+        except (URLError, OSError):
+            status, content = 0, b''
+        seconds = time.perf_counter() - start
+        ok = status == expect if expect else 0 < status < 400
+        self.recorder.add(route_name(path), seconds, ok)
+        return status, content.decode('utf-8', 'replace')
+
+    def csrf_token(self):
+        for cookie in self.cookies:
+            if cookie.name == 'csrftoken':
+                return cookie.value
+        return ''
+
+    def login(self, username, password):
+        self.request('/auth/login/')
+        status, _ = self.request('/auth/login/', {
+            'username': username,
+            'password': password,
+            'csrfmiddlewaretoken': self.csrf_token(),
+        }, expect=302)
+        return status == 302
+
+    def browse_feed(self):
+        """Лента и несколько следующих страниц."""
+        path = '/'
+        for _ in range(self.rnd.randint(1, 4)):
+            _, page = self.request(path)
+            cursor = NEXT_PAGE_RE.search(page)
+            if cursor is None:
+                break
+            path = f'/?after={cursor.group(1)}'
+
+    def browse_category(self):
+        if not self.targets.category_slugs:
+            return
+        path = f'/category/{self.rnd.choice(self.targets.category_slugs)}/'
+        _, page = self.request(path)
+        pages = PAGE_RE.findall(page)
+        if pages and self.rnd.random() < 0.5:
+            self.request(f'{path}?page={self.rnd.choice(pages)}')
+
+    def read_post(self):
+        """Пост и, иногда, следующая порция комментариев."""
+        if not self.targets.post_ids:
+            return
+        _, page = self.request(
+            f'/posts/{self.rnd.choice(self.targets.post_ids)}/')
+        more = MORE_COMMENTS_RE.search(page)
+        if more is not None and self.rnd.random() < 0.3:
+            self.request(more.group(1))
+
+    def add_comment(self):
+        if not self.targets.post_ids:
+            return
+        post_id = self.rnd.choice(self.targets.post_ids)
+        self.request(f'/posts/{post_id}/')
+        self.request(f'/posts/{post_id}/comment/', {
+            'text': f'Комментарий нагрузки {self.rnd.randrange(10 ** 6)}',
+            'csrfmiddlewaretoken': self.csrf_token(),
+        }, expect=302)
+
+    def create_post(self):
+        if not (self.targets.category_ids and self.targets.location_ids):
+            return
+        self.request('/posts/create/')
+        fields = {
+            'title': f'Пост нагрузки {self.rnd.randrange(10 ** 6)}',
+            'text': 'Текст публикации. ' * self.rnd.randint(5, 100),
+            'pub_date': timezone.localtime().strftime('%Y-%m-%d %H:%M'),
+            'is_published': 'on',
+            'category': self.rnd.choice(self.targets.category_ids),
+            'location': self.rnd.choice(self.targets.location_ids),
+            'csrfmiddlewaretoken': self.csrf_token(),
+        }
+        files = {}
+        if self.image is not None:
+            files['image'] = ('load.jpg', self.image, 'image/jpeg')
+        self.request('/posts/create/', fields, files, expect=302)
+
+    def run(self, scenarios, deadline, think=0):
+        """Выполняет случайные сценарии с учётом весов до срока."""
+        names = list(scenarios)
+        weights = [scenarios[name] for name in names]
+        while names and time.monotonic() < deadline:
+            getattr(self, self.rnd.choices(names, weights)[0])()
+            if think:
+                time.sleep(self.rnd.uniform(0, 2 * think))
+
+
+def run_load(base_url, duration=30, concurrency=10, logged_in=2,
+             scenarios=None, seed=0, think=0):
+    """
+    Нагружает сервер concurrency пользователями, из которых logged_in
+    вошли на сайт; возвращает отчёт для сохранения в JSON.
+    """
+    scenarios = scenarios or {
+        name: weight for name, (weight, _) in SCENARIOS.items()}
+    logged_in = min(logged_in, concurrency)
+    targets = load_targets()
+    accounts, password = prepare_accounts(logged_in)
+    image = sample_image(seed) if 'create_post' in scenarios else None
+    recorder = Recorder()
+    users = []
+    for number in range(concurrency):
+        # Вход не входит в замер: его запросы пишутся в отдельный журнал.
+        user = VirtualUser(base_url, targets, Recorder(),
+                           random.Random(f'{seed}:{number}'), image)
+        authenticated = number < logged_in and user.login(
+            accounts[number], password)
+        user.recorder = recorder
+        users.append((user, {
+            name: weight for name, weight in scenarios.items()
+            if authenticated or not SCENARIOS[name][1]
+        }))
+    started_at = timezone.now()
+    start = time.monotonic()
+    threads = [
+        threading.Thread(
+            target=user.run, args=(allowed, start + duration, think))
+        for user, allowed in users
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - start
+    return {
+        'base_url': base_url,
+        'started_at': started_at.isoformat(),
+        'duration_s': round(elapsed, 2),
+        'concurrency': concurrency,
+        'logged_in': logged_in,
+        'seed': seed,
+        'scenarios': scenarios,
+        **recorder.report(elapsed),
+    }
+
+
+def compare_reports(before: Dict, after: Dict):
+    """Строки (маршрут, rps до/после, p95 до/после) для общих маршрутов."""
+    return [
+        (route,
+         before['routes'][route]['rps'], stats['rps'],
+         before['routes'][route]['p95_ms'], stats['p95_ms'])
+        for route, stats in after['routes'].items()
+        if route in before['routes']
+    ]
+
+
+def save_report(report, path):
+    with open(path, 'w', encoding='utf-8') as stream:
+        json.dump(report, stream, indent=2, ensure_ascii=False)
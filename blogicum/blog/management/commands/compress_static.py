@@ -0,0 +1,64 @@
+import gzip
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = (
+    '.css', '.js', '.json', '.map', '.svg', '.txt', '.xml', '.ico')
+MIN_SIZE = 256
+
+
+def compress_gzip(data):
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def compress_brotli(data):
+    return brotli.compress(data, quality=11)
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт рядом с собранной статикой сжатые копии .gz и .br '
+        '(если установлен пакет brotli) для отдачи веб-сервером.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'root', nargs='?', default=settings.STATIC_ROOT,
+            help='Каталог со статикой; по умолчанию STATIC_ROOT.')
+        parser.add_argument(
+            '--min-size', type=int, default=MIN_SIZE,
+            help='Файлы меньшего размера в байтах не сжимаются.')
+
+    def handle(self, *args, **options):
+        compressors = {'.gz': compress_gzip}
+        if brotli is not None:
+            compressors['.br'] = compress_brotli
+        else:
+            self.stderr.write('Пакет brotli не установлен, .br не создаются.')
+        created = 0
+        for directory, _, filenames in os.walk(options['root']):
+            for filename in filenames:
+                if not filename.endswith(COMPRESSIBLE_EXTENSIONS):
+                    continue
+                path = os.path.join(directory, filename)
+                with open(path, 'rb') as file:
+                    data = file.read()
+                if len(data) < options['min_size']:
+                    continue
+                for extension, compress in compressors.items():
+                    compressed = compress(data)
+                    # Сжатая копия, которая не меньше оригинала, бесполезна.
+                    if len(compressed) >= len(data):
+                        continue
+                    with open(path + extension, 'wb') as file:
+                        file.write(compressed)
+                    created += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано сжатых копий: {created}'))
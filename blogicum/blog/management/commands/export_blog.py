@@ -0,0 +1,47 @@
+import sys
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from blog.transfer import (TRANSFER_BATCH_SIZE, TRANSFER_FIELDS, export_rows,
+                           write_csv, write_jsonl)
+
+
+class Command(BaseCommand):
+    help = ('Потоково выгружает категории, местоположения, пользователей, '
+            'публикации и комментарии в JSON Lines или CSV.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'output',
+            help='Файл JSON Lines («-» — стандартный вывод) '
+                 'или каталог для CSV.')
+        parser.add_argument(
+            '--format', choices=('jsonl', 'csv'), default='jsonl',
+            help='jsonl — один файл; csv — по файлу на модель.')
+        parser.add_argument(
+            '--models', nargs='+', choices=list(TRANSFER_FIELDS),
+            default=list(TRANSFER_FIELDS), help='Какие модели выгрузить.')
+        parser.add_argument(
+            '--with-passwords', action='store_true',
+            help='Выгрузить хеши паролей пользователей.')
+        parser.add_argument(
+            '--batch-size', type=int, default=TRANSFER_BATCH_SIZE,
+            help='Сколько строк читать из базы за один запрос.')
+
+    def handle(self, *args, **options):
+        models = [name for name in TRANSFER_FIELDS
+                  if name in options['models']]
+        rows = export_rows(
+            models, options['with_passwords'], options['batch_size'])
+        output = options['output']
+        if options['format'] == 'csv':
+            directory = Path(output)
+            directory.mkdir(parents=True, exist_ok=True)
+            count = write_csv(rows, directory)
+        elif output == '-':
+            count = write_jsonl(rows, sys.stdout)
+        else:
+            with open(output, 'w', encoding='utf-8') as stream:
+                count = write_jsonl(rows, stream)
+        self.stderr.write(self.style.SUCCESS(f'Выгружено записей: {count}'))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from blog.images import IMAGE_ERRORS, update_image_variants
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Создаёт уменьшенные копии изображений публикаций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Пересоздать варианты, даже если они уже есть.')
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='').only(
+            'image', 'image_variants').iterator()
+        created = 0
+        for post in posts:
+            if not options['force'] and post.image_variants_ready:
+                continue
+            try:
+                update_image_variants(post)
+            except IMAGE_ERRORS as error:
+                self.stderr.write(f'{post.image.name}: {error}')
+                continue
+            created += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Созданы варианты для изображений: {created}'))
@@ -0,0 +1,62 @@
+import sys
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.page_cache import ALL_PAGES_TAG, purge_page_cache
+from blog.search import rebuild_index
+from blog.transfer import (TRANSFER_BATCH_SIZE, import_rows, read_csv,
+                           read_jsonl)
+from blog.utils import recount_comments
+
+PROGRESS_INTERVAL = 1
+
+
+class Command(BaseCommand):
+    help = ('Потоково загружает данные блога из JSON Lines или CSV '
+            'пачками через bulk_create.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'source',
+            help='Файл JSON Lines («-» — стандартный ввод) '
+                 'или каталог с CSV.')
+        parser.add_argument(
+            '--format', choices=('jsonl', 'csv'), default='jsonl')
+        parser.add_argument(
+            '--batch-size', type=int, default=TRANSFER_BATCH_SIZE,
+            help='Сколько записей вставлять в одной транзакции.')
+
+    def progress(self, model, count):
+        now = time.monotonic()
+        if now - self.last_progress >= PROGRESS_INTERVAL:
+            self.last_progress = now
+            self.stderr.write(f'{model}: {count}')
+
+    def load(self, rows):
+        self.last_progress = time.monotonic()
+        try:
+            return import_rows(rows, self.batch_size, self.progress)
+        except (KeyError, ValueError) as error:
+            raise CommandError(f'Неверная запись в файле: {error}')
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+        source = options['source']
+        if options['format'] == 'csv':
+            stats = self.load(read_csv(Path(source)))
+        elif source == '-':
+            stats = self.load(read_jsonl(sys.stdin))
+        else:
+            with open(source, encoding='utf-8') as stream:
+                stats = self.load(read_jsonl(stream))
+        # bulk_create не вызывает сигналов: счётчики комментариев,
+        # поисковый индекс и кеш страниц обновляются после загрузки.
+        if {'post', 'comment'} & set(stats):
+            recount_comments()
+            rebuild_index()
+        purge_page_cache(ALL_PAGES_TAG)
+        for model, (loaded, skipped) in stats.items():
+            self.stdout.write(self.style.SUCCESS(
+                f'{model}: принято {loaded}, пропущено {skipped}'))
@@ -0,0 +1,84 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.loadtest import (SCENARIOS, compare_reports, remove_accounts,
+                           run_load, save_report)
+
+
+def scenario_weight(value):
+    name, _, weight = value.partition('=')
+    if name not in SCENARIOS:
+        raise ValueError(name)
+    return name, int(weight or 1)
+
+
+class Command(BaseCommand):
+    help = ('Нагружает запущенный сервер сценариями чтения и записи '
+            'и сохраняет перцентили задержки и rps по маршрутам в JSON.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url', default='http://127.0.0.1:8000',
+            help='Адрес сервера, работающего с той же базой.')
+        parser.add_argument('--duration', type=float, default=30,
+                            help='Длительность замера в секундах.')
+        parser.add_argument('--concurrency', type=int, default=10,
+                            help='Число одновременных пользователей.')
+        parser.add_argument('--logged-in', type=int, default=2,
+                            help='Сколько из них входят на сайт.')
+        parser.add_argument(
+            '--scenario', type=scenario_weight, action='append',
+            metavar='NAME=WEIGHT',
+            help=f'Сценарий и его вес: {", ".join(SCENARIOS)}. '
+                 f'По умолчанию — все с весами '
+                 f'{", ".join(str(w) for w, _ in SCENARIOS.values())}.')
+        parser.add_argument('--think', type=float, default=0,
+                            help='Средняя пауза между сценариями, секунд.')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', default='loadtest_report.json',
+                            help='Куда сохранить отчёт.')
+        parser.add_argument('--compare', metavar='REPORT',
+                            help='Сравнить с отчётом прошлого запуска.')
+        parser.add_argument(
+            '--keep-accounts', action='store_true',
+            help='Не удалять пользователей нагрузки и их посты после '
+                 'замера.')
+
+    def handle(self, *args, **options):
+        before = None
+        if options['compare']:
+            try:
+                with open(options['compare'], encoding='utf-8') as stream:
+                    before = json.load(stream)
+            except (OSError, ValueError) as error:
+                raise CommandError(f'Не удалось прочитать отчёт: {error}')
+        try:
+            report = run_load(
+                options['url'], options['duration'], options['concurrency'],
+                options['logged_in'], dict(options['scenario'] or ()),
+                options['seed'], options['think'])
+        finally:
+            if not options['keep_accounts']:
+                remove_accounts()
+        save_report(report, options['output'])
+
+        self.stdout.write(
+            f'{"маршрут":<24}{"запросы":>9}{"ошибки":>8}{"rps":>9}'
+            f'{"p50, мс":>10}{"p95, мс":>10}{"p99, мс":>10}')
+        for route, stats in {**report['routes'],
+                             'всего': report['total']}.items():
+            if stats:
+                self.stdout.write(
+                    f'{route:<24}{stats["requests"]:>9}{stats["errors"]:>8}'
+                    f'{stats["rps"]:>9}{stats["p50_ms"]:>10}'
+                    f'{stats["p95_ms"]:>10}{stats["p99_ms"]:>10}')
+        if before is not None:
+            self.stdout.write(f'\nСравнение с {options["compare"]}:')
+            for route, rps_was, rps, p95_was, p95 in compare_reports(
+                    before, report):
+                self.stdout.write(
+                    f'{route:<24}rps {rps_was} -> {rps}, '
+                    f'p95 {p95_was} -> {p95} мс')
+        self.stdout.write(self.style.SUCCESS(
+            f'Отчёт сохранён в {options["output"]}'))
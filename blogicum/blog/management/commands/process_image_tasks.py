@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.tasks import process_image_tasks
+
+
+class Command(BaseCommand):
+    help = 'Фоновый обработчик очереди загруженных изображений.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Обработать очередь и завершиться.')
+        parser.add_argument(
+            '--sleep', type=float, default=5,
+            help='Пауза в секундах, когда очередь пуста.')
+
+    def handle(self, *args, **options):
+        processed = 0
+        try:
+            while True:
+                processed += process_image_tasks()
+                if options['once']:
+                    break
+                time.sleep(options['sleep'])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано изображений: {processed}'))
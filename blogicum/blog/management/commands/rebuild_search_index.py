@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from blog.search import INDEX_BATCH_SIZE, get_backend, rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Заново строит поисковый индекс по всем публикациям.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=INDEX_BATCH_SIZE,
+            help='Сколько публикаций индексировать за один проход.')
+
+    def handle(self, *args, **options):
+        indexed = rebuild_index(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Проиндексировано публикаций: {indexed} '
+            f'(хранилище индекса: {get_backend().name})'))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import Post
+from blog.utils import RECOUNT_BATCH_SIZE, recount_comments
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает сохранённые счётчики комментариев у публикаций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'post_ids', nargs='*', type=int,
+            help='id публикаций; по умолчанию проверяются все.')
+        parser.add_argument(
+            '--batch-size', type=int, default=RECOUNT_BATCH_SIZE,
+            help='Сколько публикаций обновлять одним запросом.')
+
+    def handle(self, *args, **options):
+        post_list = Post.objects.all()
+        if options['post_ids']:
+            post_list = post_list.filter(pk__in=options['post_ids'])
+        fixed = recount_comments(post_list, options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Исправлено счётчиков комментариев: {fixed}'))
@@ -0,0 +1,56 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.page_cache import ALL_PAGES_TAG, purge_page_cache
+from blog.seeding import SEED_CHUNK_SIZE, SEED_DEFAULTS, seed_blog
+
+PROGRESS_INTERVAL = 1
+
+
+class Command(BaseCommand):
+    help = ('Заполняет базу воспроизводимым синтетическим набором данных '
+            'для нагрузочных замеров.')
+
+    def add_arguments(self, parser):
+        for key in ('users', 'categories', 'locations', 'posts',
+                    'comments', 'days', 'future_days'):
+            parser.add_argument(
+                f'--{key.replace("_", "-")}', type=int,
+                default=SEED_DEFAULTS[key])
+        for key in ('future', 'unpublished', 'author_exponent',
+                    'comment_exponent'):
+            parser.add_argument(
+                f'--{key.replace("_", "-")}', type=float,
+                default=SEED_DEFAULTS[key])
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Зерно генератора: при одном зерне набор одинаков.')
+        parser.add_argument(
+            '--prefix', default='seed',
+            help='Префикс имён пользователей и slug категорий.')
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Сколько процессов генерируют тексты.')
+        parser.add_argument(
+            '--batch-size', type=int, default=SEED_CHUNK_SIZE,
+            help='Сколько объектов вставлять в одной транзакции.')
+
+    def progress(self, model, count):
+        now = time.monotonic()
+        if now - self.last_progress >= PROGRESS_INTERVAL:
+            self.last_progress = now
+            self.stderr.write(f'{model}: {count}')
+
+    def handle(self, *args, **options):
+        self.last_progress = time.monotonic()
+        try:
+            stats = seed_blog(
+                options['seed'], options['prefix'], options['workers'],
+                options['batch_size'], self.progress,
+                **{key: options[key] for key in SEED_DEFAULTS})
+        except ValueError as error:
+            raise CommandError(error)
+        purge_page_cache(ALL_PAGES_TAG)
+        for model, count in stats.items():
+            self.stdout.write(self.style.SUCCESS(f'{model}: {count}'))
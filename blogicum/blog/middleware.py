@@ -0,0 +1,46 @@
+import time
+
+from django.conf import settings
+from django.utils.deprecation import MiddlewareMixin
+
+from .routers import replicas_may_lag
+
+REPLICA_PIN_KEY = 'replica_pinned_until'
+
+
+class ReplicaPinMiddleware(MiddlewareMixin):
+    """
+    Закрепляет пользователя за основной базой после записи.
+
+    После успешного POST-запроса авторизованный пользователь ещё
+    REPLICA_PIN_SECONDS секунд читает из основной базы и видит свои
+    изменения, даже если реплики от неё отстают. MiddlewareMixin
+    позволяет работать и под WSGI, и под ASGI без перехода в синхронный
+    режим для всей цепочки.
+    """
+
+    def process_response(self, request, response):
+        if (request.method not in ('GET', 'HEAD', 'OPTIONS')
+                and response.status_code < 400
+                and request.user.is_authenticated):
+            request.session[REPLICA_PIN_KEY] = (
+                time.time() + settings.REPLICA_PIN_SECONDS)
+        return response
+
+
+def is_pinned_to_primary(request):
+    """Читает ли пользователь сейчас только из основной базы."""
+    return request.session.get(REPLICA_PIN_KEY, 0) > time.time()
+
+
+def reads_from_replicas(request):
+    """
+    Можно ли читать данные страницы из реплик.
+
+    Нельзя, если пользователь закреплён за основной базой или реплики
+    могут ещё не получить последнюю запись: страница и карточки постов
+    попадают в общий кеш.
+    """
+    if request.user.is_authenticated and is_pinned_to_primary(request):
+        return False
+    return not replicas_may_lag()
@@ -0,0 +1,19 @@
+# Generated by Django 3.2.16 on 2026-10-18 17:00
+
+import blog.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0015_image_tasks'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, storage=blog.storage.ContentHashedStorage(), upload_to='posts_images', verbose_name='Изображение'),
+        ),
+    ]
@@ -0,0 +1,57 @@
+from django.db import migrations
+from django.db.utils import OperationalError
+
+from blog.search import tokenize
+
+
+def split_fts_tables(apps, schema_editor):
+    """Переносит комментарии из документа поста в отдельную таблицу FTS5."""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    try:
+        schema_editor.execute('DROP TABLE IF EXISTS blog_search')
+        schema_editor.execute(
+            'CREATE VIRTUAL TABLE blog_search USING fts5(title, text)')
+        schema_editor.execute(
+            'CREATE VIRTUAL TABLE IF NOT EXISTS blog_search_comment '
+            'USING fts5(text)')
+    except OperationalError:
+        return
+    Post = apps.get_model('blog', 'Post')
+    Comment = apps.get_model('blog', 'Comment')
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany(
+            'INSERT INTO blog_search (rowid, title, text) VALUES (%s, %s, %s)',
+            [(pk, ' '.join(tokenize(title)), ' '.join(tokenize(text)))
+             for pk, title, text in Post.objects.values_list(
+                 'pk', 'title', 'text').iterator()])
+        cursor.executemany(
+            'INSERT INTO blog_search_comment (rowid, text) VALUES (%s, %s)',
+            [(pk, ' '.join(tokenize(text)))
+             for pk, text in Comment.objects.values_list(
+                 'pk', 'text').iterator()])
+
+
+def merge_fts_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute('DROP TABLE IF EXISTS blog_search_comment')
+    schema_editor.execute('DROP TABLE IF EXISTS blog_search')
+    try:
+        schema_editor.execute(
+            'CREATE VIRTUAL TABLE blog_search '
+            'USING fts5(title, text, comments)')
+    except OperationalError:
+        pass
+    # Документы в прежнем виде строит manage.py rebuild_search_index.
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0018_search'),
+    ]
+
+    operations = [
+        migrations.RunPython(split_fts_tables, merge_fts_tables),
+    ]
@@ -1,9 +1,42 @@
+import asyncio
+import hashlib
+import inspect
+from http import HTTPStatus
+
 from django.contrib.auth.mixins import UserPassesTestMixin
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse, reverse_lazy
+from django.utils.cache import get_conditional_response
+from django.utils.functional import cached_property
+from django.utils.decorators import method_decorator
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
 
 from .forms import CommentForm
+from .middleware import reads_from_replicas
 from .models import Comment, Post
+from .page_cache import cache_page_response, get_cached_page, page_cache_key
+from .paginators import KeysetPaginator
+from .routers import read_from_replicas
+from .uploads import LimitedUploadHandler
+
+
+def page_validators(state):
+    """Возвращает ETag и время изменения в секундах по состоянию страницы."""
+    last_modified, etag_data = state
+    etag = quote_etag(hashlib.md5(repr(etag_data).encode()).hexdigest())
+    if last_modified is not None:
+        last_modified = int(last_modified.timestamp())
+    return etag, last_modified
+
+
+def set_page_validators(response, etag, last_modified):
+    """Добавляет ETag и Last-Modified к ответу 200 или 304."""
+    if response.status_code in (HTTPStatus.OK, HTTPStatus.NOT_MODIFIED):
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+    return response
 
 
 class ProfileUrlByUsername:
@@ -15,6 +48,153 @@ class ProfileUrlByUsername:
             kwargs={'username': self.request.user.username})
 
 
+def mark_coroutine_function(func):
+    """
+    Помечает синхронную функцию, возвращающую корутину, как корутинную.
+
+    Django 3.2 проверяет обработчики через asyncio.iscoroutinefunction().
+    В Python 3.12 для пометки есть inspect.markcoroutinefunction(),
+    а в asgiref — с 3.6; проект закреплён на asgiref 3.5.2, поэтому
+    в более старом Python используется признак самого asyncio.
+    """
+    if hasattr(inspect, 'markcoroutinefunction'):
+        return inspect.markcoroutinefunction(func)
+    func._is_coroutine = asyncio.coroutines._is_coroutine
+    return func
+
+
+class AsyncViewMixin:
+    """
+    Представление-класс с async-обработчиками.
+
+    Django 3.2 поддерживает только async-функции, поэтому функция
+    из as_view() помечается как корутинная: под ASGI обработчик ждёт её
+    без перехода в синхронный режим, под WSGI — вызывает через
+    async_to_sync.
+    """
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        return mark_coroutine_function(super().as_view(**initkwargs))
+
+    # Ответы, которые View формирует сам, тоже должны быть корутинами:
+    # функцию представления всегда ждут через await.
+    async def http_method_not_allowed(self, request, *args, **kwargs):
+        return super().http_method_not_allowed(request, *args, **kwargs)
+
+    async def options(self, request, *args, **kwargs):
+        return super().options(request, *args, **kwargs)
+
+
+class ReplicaReadMixin:
+    """Отвечает на GET-запросы, читая данные из реплик."""
+
+    def dispatch(self, request, *args, **kwargs):
+        # Пользователь загружается до переключения, из основной базы.
+        if (request.method not in ('GET', 'HEAD')
+                or not reads_from_replicas(request)):
+            return super().dispatch(request, *args, **kwargs)
+        with read_from_replicas():
+            response = super().dispatch(request, *args, **kwargs)
+            if hasattr(response, 'render'):
+                # Шаблон отрисовывается лениво и тоже читает из базы.
+                response.render()
+            return response
+
+
+class ConditionalGetMixin:
+    """
+    Отвечает неавторизованным пользователям 304 Not Modified.
+
+    Состояние страницы описывает get_page_state(): время последнего
+    изменения и данные для ETag — версии тегов кеша страниц и не больше
+    одной короткой выборки по ключу. Если у клиента актуальная копия,
+    шаблон не отрисовывается.
+    """
+
+    def get_page_state(self):
+        """Пара (время изменения, данные для ETag) или None."""
+        return None
+
+    def dispatch(self, request, *args, **kwargs):
+        if (request.method not in ('GET', 'HEAD')
+                or request.user.is_authenticated):
+            return super().dispatch(request, *args, **kwargs)
+        state = self.get_page_state()
+        if state is None:
+            return super().dispatch(request, *args, **kwargs)
+        etag, last_modified = page_validators(state)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+        return set_page_validators(response, etag, last_modified)
+
+
+class AnonymousPageCacheMixin:
+    """Отдаёт неавторизованным пользователям страницу из кеша."""
+
+    page_cache_tags = ()
+
+    def get_page_cache_tags(self):
+        return self.page_cache_tags
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method != 'GET' or request.user.is_authenticated:
+            return super().dispatch(request, *args, **kwargs)
+        key = page_cache_key(request, self.get_page_cache_tags())
+        cached = get_cached_page(key)
+        if cached is not None:
+            return cached
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code != HTTPStatus.OK:
+            return response
+        response.render()
+        cache_page_response(key, response)
+        return response
+
+
+class KeysetPaginationMixin:
+    """Курсорная пагинация списка по параметрам ?after= / ?before=."""
+
+    keyset_field = 'pub_date'
+    keyset_descending = True
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = KeysetPaginator(
+            queryset, page_size, self.keyset_field, self.keyset_descending)
+        page = paginator.page(
+            after=self.request.GET.get('after'),
+            before=self.request.GET.get('before'))
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class LimitedUploadMixin:
+    """
+    Принимает файлы через LimitedUploadHandler.
+
+    Обработчики загрузки можно сменить только до чтения request.POST,
+    а его читает CsrfViewMiddleware, поэтому CSRF-токен проверяется
+    здесь, после подключения обработчика.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        request.upload_handlers.insert(0, LimitedUploadHandler(request))
+        return csrf_protect(super().dispatch)(request, *args, **kwargs)
+
+
+class RequestObjectCacheMixin:
+    """Загружает объект представления не больше одного раза за запрос."""
+
+    def get_object(self, queryset=None):
+        if queryset is not None:
+            return super().get_object(queryset)
+        if not hasattr(self, '_request_object'):
+            self._request_object = super().get_object()
+        return self._request_object
+
+
 class UnauthorizedUsers(UserPassesTestMixin):
     """Проверка, является ли авторизованный пользователь автором."""
 
@@ -27,7 +207,7 @@ class UnauthorizedUsers(UserPassesTestMixin):
             'blog:post_detail', kwargs={'post_id': self.get_object().pk}))
 
 
-class PostDeleteUpdateMixin:
+class PostDeleteUpdateMixin(RequestObjectCacheMixin):
     """Вспомогательный миксин для классов удаления, обновления поста."""
 
     model = Post
@@ -42,12 +222,19 @@ class PostDeleteUpdateMixin:
 class CommentMixin:
     """Вспомогательный миксин для классов комментариев."""
 
-    related_post = None
     model = Comment
     form_class = CommentForm
 
+    @cached_property
+    def related_post(self):
+        """Видимый пользователю пост; загружается только первичный ключ."""
+        return get_object_or_404(
+            Post.objects.visible_to(self.request.user).only('pk'),
+            pk=self.kwargs['post_id'])
+
     def dispatch(self, request, *args, **kwargs):
-        self.related_post = get_object_or_404(Post, pk=kwargs['post_id'])
+        # Несуществующий или скрытый пост даёт 404 до проверки авторизации.
+        self.related_post
         return super().dispatch(request, *args, **kwargs)
 
     def form_valid(self, form):
@@ -60,14 +247,11 @@ class CommentMixin:
                        kwargs={'post_id': self.related_post.pk})
 
 
-class CommentUpdateDeleteMixin:
+class CommentUpdateDeleteMixin(RequestObjectCacheMixin):
     """Вспомогательный миксин для классов удаления, обновления комментария."""
 
     template_name = 'blog/comment.html'
+    pk_url_kwarg = 'comment_id'
 
-    def get_object(self):
-        return get_object_or_404(
-            Comment,
-            pk=self.kwargs['comment_id'],
-            author=self.request.user
-        )
+    def get_queryset(self):
+        return Comment.objects.filter(author=self.request.user)
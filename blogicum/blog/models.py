@@ -1,11 +1,51 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
 from django.contrib.auth import get_user_model
 from django.db import models
 from django.urls import reverse
+from django.utils import timezone
+
+from .storage import post_image_storage
 
 
 User = get_user_model()
 TITLE_MAX_LENGTH = 256
 TITLE_MAX_CHARS = 15
+POST_CARD_FIELDS = (
+    'title', 'text', 'pub_date', 'updated_at', 'is_published',
+    'comment_count',
+    'image', 'image_variants', 'image_status',
+    'author__username',
+    'category__title', 'category__slug', 'category__is_published',
+    'location__name', 'location__is_published',
+)
+# Посты, удаляемые текущим вызовом delete(): их комментарии удаляются
+# каскадом, и обновлять счётчик и индекс для каждого из них незачем.
+_deleting_posts = ContextVar('deleting_posts', default=None)
+
+
+@contextmanager
+def tracking_deleted_posts():
+    """Собирает id постов, удаляемых внутри блока; вне блока — ничего."""
+    if _deleting_posts.get() is not None:
+        yield
+        return
+    token = _deleting_posts.set(set())
+    try:
+        yield
+    finally:
+        _deleting_posts.reset(token)
+
+
+def mark_post_deleting(pk):
+    posts = _deleting_posts.get()
+    if posts is not None:
+        posts.add(pk)
+
+
+def is_post_deleting(pk):
+    return pk in (_deleting_posts.get() or ())
 
 
 class PublishedModel(models.Model):
@@ -14,6 +54,8 @@ class PublishedModel(models.Model):
         help_text='Снимите галочку, чтобы скрыть публикацию.')
     created_at = models.DateTimeField(
         verbose_name='Добавлено', auto_now_add=True)
+    updated_at = models.DateTimeField(
+        verbose_name='Изменено', auto_now=True)
 
     class Meta:
         abstract = True
@@ -52,6 +94,44 @@ class Category(PublishedModel):
         return self.title[:TITLE_MAX_CHARS]
 
 
+class PostQuerySet(models.QuerySet):
+    """Выборки публикаций с учётом правил видимости."""
+
+    @staticmethod
+    def published_q():
+        """Условие видимости публикации для всех пользователей."""
+        return models.Q(
+            is_published=True,
+            category__is_published=True,
+            pub_date__lte=timezone.now()
+        )
+
+    def published(self):
+        """Посты, видимые всем пользователям."""
+        return self.filter(self.published_q())
+
+    def with_related(self):
+        """Подгружает автора, категорию и место одним запросом."""
+        return self.select_related('author', 'category', 'location').only(
+            *POST_CARD_FIELDS)
+
+    def visible_to(self, user):
+        """Опубликованные посты, а для автора — также все его собственные."""
+        if not user.is_authenticated:
+            return self.published()
+        return self.filter(self.published_q() | models.Q(author=user))
+
+    def delete(self):
+        with tracking_deleted_posts():
+            return super().delete()
+
+
+class ImageStatus(models.TextChoices):
+    PENDING = 'pending', 'В очереди'
+    READY = 'ready', 'Готово'
+    FAILED = 'failed', 'Ошибка'
+
+
 class Post(PublishedModel):
     title = models.CharField(
         max_length=TITLE_MAX_LENGTH, verbose_name='Заголовок')
@@ -85,20 +165,91 @@ class Post(PublishedModel):
     image = models.ImageField(
         'Изображение',
         upload_to='posts_images',
+        storage=post_image_storage,
         blank=True
     )
+    image_variants = models.JSONField(
+        'Варианты изображения',
+        default=dict,
+        editable=False
+    )
+    image_status = models.CharField(
+        'Обработка изображения',
+        max_length=16,
+        choices=ImageStatus.choices,
+        blank=True,
+        editable=False
+    )
+    comment_count = models.PositiveIntegerField(
+        'Количество комментариев',
+        default=0,
+        editable=False
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
+        indexes = (
+            models.Index(
+                fields=('pub_date', 'id'),
+                condition=models.Q(is_published=True),
+                name='post_feed_idx'),
+            models.Index(
+                fields=('category', 'pub_date'),
+                condition=models.Q(is_published=True),
+                name='post_category_feed_idx'),
+            models.Index(
+                fields=('author', 'pub_date'),
+                name='post_author_feed_idx'),
+            models.Index(
+                fields=('pub_date', 'updated_at'),
+                name='post_freshness_idx'),
+        )
+
+    @property
+    def image_variants_ready(self):
+        """Созданы ли уменьшенные копии текущего изображения."""
+        return (bool(self.image)
+                and self.image_variants.get('name') == self.image.name)
 
     def get_absolute_url(self):
         return reverse('blog:post_detail', kwargs={'post_id': self.pk})
 
+    def delete(self, *args, **kwargs):
+        with tracking_deleted_posts():
+            return super().delete(*args, **kwargs)
+
     def __str__(self):
         return self.title[:TITLE_MAX_CHARS]
 
 
+class ImageTask(models.Model):
+    """Задача фоновой обработки загруженного изображения поста."""
+
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='image_task',
+        verbose_name='Публикация'
+    )
+    image = models.CharField('Файл', max_length=255)
+    attempts = models.PositiveSmallIntegerField('Попытки', default=0)
+    locked_at = models.DateTimeField('Взята в работу', null=True, blank=True)
+    error = models.TextField('Последняя ошибка', blank=True)
+    created_at = models.DateTimeField(
+        verbose_name='Добавлено', auto_now_add=True)
+
+    class Meta:
+        ordering = ('created_at', 'id')
+        verbose_name = 'обработка изображения'
+        verbose_name_plural = 'Обработка изображений'
+
+    def __str__(self):
+        return self.image
+
+
 class Comment(models.Model):
     text = models.TextField('Текст комментария')
     post = models.ForeignKey(
@@ -119,6 +270,40 @@ class Comment(models.Model):
         ordering = ('created_at',)
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = (
+            models.Index(
+                fields=('post', 'created_at'),
+                name='comment_post_created_idx'),
+        )
 
     def __str__(self):
         return self.title[:TITLE_MAX_CHARS]
+
+
+class SearchTerm(models.Model):
+    """Запись обратного индекса поиска: основа слова в посте и её вес."""
+
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='search_terms',
+        verbose_name='Публикация'
+    )
+    term = models.CharField('Основа слова', max_length=64)
+    in_comments = models.BooleanField('Из комментариев', default=False)
+    weight = models.PositiveIntegerField('Вес')
+
+    class Meta:
+        verbose_name = 'термин поиска'
+        verbose_name_plural = 'Термины поиска'
+        indexes = (
+            models.Index(fields=('term', 'post'), name='search_term_idx'),
+        )
+        constraints = (
+            models.UniqueConstraint(
+                fields=('post', 'in_comments', 'term'),
+                name='unique_search_term'),
+        )
+
+    def __str__(self):
+        return self.term
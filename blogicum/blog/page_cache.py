@@ -0,0 +1,121 @@
+import time
+from datetime import datetime, timezone
+from hashlib import md5
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.http import urlencode
+
+from .routers import note_primary_write
+from .schedule import pop_due_publication, seconds_until_next_publication
+
+PAGE_CACHE_PREFIX = 'page_cache'
+ALL_PAGES_TAG = 'all'
+POST_LIST_TAG = 'post_list'
+# Параметры запроса, от которых зависит содержимое кешируемых страниц.
+# Остальные (метки рекламных кампаний, случайные параметры) не создают
+# новых записей в кеше.
+PAGE_QUERY_PARAMS = ('after', 'before', 'page')
+
+
+def post_tag(post_id):
+    """Тег страницы отдельного поста."""
+    return f'post:{post_id}'
+
+
+def _tag_key(tag):
+    return f'{PAGE_CACHE_PREFIX}:tag:{tag}'
+
+
+def _get_tag_versions(tags):
+    keys = [_tag_key(tag) for tag in tags]
+    versions = cache.get_many(keys)
+    # Версия начинается со времени сброса тега: это время изменения
+    # страниц для Last-Modified.
+    missing = {
+        key: f'{time.time():.6f}:{uuid4().hex}'
+        for key in keys if key not in versions
+    }
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def get_tag_versions(tags):
+    """Текущие версии тегов страницы вместе с общим тегом всех страниц."""
+    if pop_due_publication():
+        purge_page_cache(POST_LIST_TAG)
+    return _get_tag_versions((ALL_PAGES_TAG, *tags))
+
+
+def tags_changed_at(versions):
+    """Время последнего сброса любого из тегов по их версиям."""
+    moments = [
+        float(moment)
+        for moment, separator, _ in (v.partition(':') for v in versions)
+        if separator
+    ]
+    if not moments:
+        return None
+    return datetime.fromtimestamp(max(moments), tz=timezone.utc)
+
+
+def page_cache_path(request):
+    """Путь страницы только с параметрами из PAGE_QUERY_PARAMS."""
+    query = urlencode([
+        (name, value)
+        for name in PAGE_QUERY_PARAMS
+        for value in request.GET.getlist(name)
+    ])
+    return f'{request.path}?{query}' if query else request.path
+
+
+def page_cache_key(request, tags):
+    """
+    Возвращает ключ страницы с учётом текущих версий её тегов.
+
+    Сброс тега меняет его версию, поэтому все помеченные им страницы
+    перестают находиться в кеше, а остальные продолжают отдаваться.
+    """
+    raw = '|'.join([page_cache_path(request), *get_tag_versions(tags)])
+    return f'{PAGE_CACHE_PREFIX}:response:{md5(raw.encode()).hexdigest()}'
+
+
+def purge_page_cache(*tags):
+    """Сбрасывает все страницы, помеченные любым из указанных тегов."""
+    cache.delete_many([_tag_key(tag) for tag in tags])
+    # Пока реплики догоняют запись, страницы читаются из основной базы,
+    # иначе кеш снова заполнится старыми данными.
+    note_primary_write()
+
+
+def get_page_cache_timeout():
+    """
+    Время жизни страницы в кеше в секундах.
+
+    Не превышает времени до ближайшей отложенной публикации,
+    чтобы пост появился в ленте вовремя.
+    """
+    seconds = seconds_until_next_publication()
+    if seconds is None:
+        return settings.PAGE_CACHE_TIMEOUT
+    return min(settings.PAGE_CACHE_TIMEOUT, seconds)
+
+
+def get_cached_page(key):
+    """Страница из кеша в виде ответа или None."""
+    cached = cache.get(key)
+    if cached is None:
+        return None
+    content, headers = cached
+    return HttpResponse(content, headers=headers)
+
+
+def cache_page_response(key, response):
+    """Сохраняет отрисованную страницу вместе с заголовками ответа."""
+    timeout = get_page_cache_timeout()
+    if timeout > 0:
+        cache.set(key, (response.content, dict(response.items())), timeout)
@@ -0,0 +1,127 @@
+import binascii
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+
+from django.db.models import Q
+from django.http import Http404
+
+CURSOR_SEPARATOR = '|'
+
+
+def encode_cursor(obj, field):
+    """Возвращает непрозрачный курсор для позиции объекта в выборке."""
+    raw = f'{getattr(obj, field).isoformat()}{CURSOR_SEPARATOR}{obj.pk}'
+    return urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Разбирает курсор в пару (дата, pk) или вызывает Http404."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        raw = urlsafe_b64decode(padded.encode()).decode()
+        value, pk = raw.split(CURSOR_SEPARATOR)
+        return datetime.fromisoformat(value), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise Http404('Неверный курсор страницы.')
+
+
+class KeysetPage:
+    """Страница выборки, полученная по курсору, без подсчёта общего числа."""
+
+    is_keyset = True
+
+    def __init__(self, object_list, field, has_next, has_previous):
+        self.object_list = object_list
+        self.field = field
+        # У пустой страницы нет курсоров, поэтому нет и ссылок.
+        self._has_next = has_next and bool(object_list)
+        self._has_previous = has_previous and bool(object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        """Курсор следующей страницы."""
+        if self._has_next:
+            return encode_cursor(self.object_list[-1], self.field)
+        return None
+
+    @property
+    def previous_cursor(self):
+        """Курсор предыдущей страницы."""
+        if self._has_previous:
+            return encode_cursor(self.object_list[0], self.field)
+        return None
+
+
+class KeysetPaginator:
+    """
+    Пагинация по ключу (field, id) вместо OFFSET.
+
+    Стоимость любой страницы одинакова: выбирается per_page + 1 строка
+    по индексу, COUNT(*) по всей выборке не выполняется. По умолчанию
+    страницы идут от новых постов к старым.
+    """
+
+    def __init__(self, queryset, per_page, field='pub_date', descending=True):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.field = field
+        self.descending = descending
+
+    def _seek(self, cursor, forward):
+        return self._seek_from(*decode_cursor(cursor), forward=forward)
+
+    def _seek_from(self, value, pk, forward):
+        lookup = 'lt' if forward == self.descending else 'gt'
+        return (
+            Q(**{f'{self.field}__{lookup}': value})
+            | Q(**{self.field: value, f'pk__{lookup}': pk})
+        )
+
+    def _ordering(self, forward):
+        prefix = '-' if forward == self.descending else ''
+        return f'{prefix}{self.field}', f'{prefix}pk'
+
+    def page(self, after=None, before=None):
+        if before:
+            rows = list(self.queryset.filter(
+                self._seek(before, forward=False)
+            ).order_by(*self._ordering(forward=False))[:self.per_page + 1])
+            has_previous = len(rows) > self.per_page
+            rows = rows[:self.per_page]
+            rows.reverse()
+            # Курсор мог указывать на уже удалённую строку или на начало
+            # выборки, поэтому наличие следующей страницы проверяется.
+            has_next = bool(rows) and self.queryset.filter(self._seek_from(
+                getattr(rows[-1], self.field), rows[-1].pk, forward=True
+            )).exists()
+            return KeysetPage(
+                rows, self.field, has_next=has_next,
+                has_previous=has_previous)
+        queryset = self.queryset.order_by(*self._ordering(forward=True))
+        if after:
+            queryset = queryset.filter(self._seek(after, forward=True))
+        rows = list(queryset[:self.per_page + 1])
+        return KeysetPage(
+            rows[:self.per_page],
+            self.field,
+            has_next=len(rows) > self.per_page,
+            has_previous=bool(after)
+        )
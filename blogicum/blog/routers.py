@@ -0,0 +1,57 @@
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+# Сессии читаются до выбора базы и всегда из основной базы.
+PRIMARY_ONLY_APPS = ('sessions',)
+
+PRIMARY_WRITE_KEY = 'replicas:last_primary_write'
+
+_read_from_replicas = ContextVar('read_from_replicas', default=False)
+
+
+def note_primary_write():
+    """Запоминает время записи, которую реплики могли ещё не получить."""
+    if settings.DATABASE_REPLICAS:
+        cache.set(PRIMARY_WRITE_KEY, time.time(), timeout=None)
+
+
+def replicas_may_lag():
+    """Могут ли реплики отставать от последней записи в основную базу."""
+    if not settings.DATABASE_REPLICAS:
+        return False
+    return (cache.get(PRIMARY_WRITE_KEY, 0) + settings.REPLICA_LAG_SECONDS
+            > time.time())
+
+
+@contextmanager
+def read_from_replicas():
+    """Направляет чтение внутри блока в реплики из DATABASE_REPLICAS."""
+    token = _read_from_replicas.set(True)
+    try:
+        yield
+    finally:
+        _read_from_replicas.reset(token)
+
+
+class ReplicaRouter:
+    """Пишет в основную базу, читает из реплик внутри read_from_replicas()."""
+
+    def db_for_read(self, model, **hints):
+        if (not _read_from_replicas.get()
+                or model._meta.app_label in PRIMARY_ONLY_APPS
+                or not settings.DATABASE_REPLICAS):
+            return None
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # В основной базе и репликах одни и те же данные.
+        return True
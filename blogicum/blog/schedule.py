@@ -0,0 +1,49 @@
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import Post
+
+NEXT_PUBLICATION_KEY = 'schedule:next_publication'
+NOTHING_SCHEDULED = 'nothing'
+
+
+def get_next_publication():
+    """Возвращает дату ближайшей отложенной публикации или None."""
+    next_pub_date = cache.get(NEXT_PUBLICATION_KEY)
+    if next_pub_date is None:
+        next_pub_date = Post.objects.filter(
+            is_published=True, pub_date__gt=timezone.now()
+        ).order_by('pub_date').values_list(
+            'pub_date', flat=True).first() or NOTHING_SCHEDULED
+        cache.set(NEXT_PUBLICATION_KEY, next_pub_date, timeout=None)
+    if next_pub_date == NOTHING_SCHEDULED:
+        return None
+    return next_pub_date
+
+
+def reset_next_publication():
+    """Забывает отслеживаемую дату, она будет заново найдена в базе."""
+    cache.delete(NEXT_PUBLICATION_KEY)
+
+
+def seconds_until_next_publication(now=None):
+    """Число секунд до ближайшей отложенной публикации или None."""
+    next_pub_date = get_next_publication()
+    if next_pub_date is None:
+        return None
+    now = now or timezone.now()
+    return max(0, int((next_pub_date - now).total_seconds()))
+
+
+def pop_due_publication(now=None):
+    """
+    Сообщает, наступил ли срок отслеживаемой публикации.
+
+    Если наступил, дата сбрасывается, и следующий вызов будет
+    отслеживать очередную публикацию.
+    """
+    next_pub_date = get_next_publication()
+    if next_pub_date is None or next_pub_date > (now or timezone.now()):
+        return False
+    reset_next_publication()
+    return True
@@ -0,0 +1,331 @@
+"""
+Полнотекстовый поиск по постам и комментариям к ним.
+
+Пост ищется по заголовку, тексту и комментариям: он найден, если каждое
+слово запроса есть в нём самом или в любом из его комментариев.
+При сохранении поста или комментария меняются только его строки индекса,
+без чтения поста и остальных комментариев. Слова приводятся к основе
+стеммером, поэтому разные формы слова находят друг друга. Индекс хранится
+в таблицах SQLite FTS5 — отдельно посты и комментарии, — а если FTS5
+недоступен, в обратном индексе на модели SearchTerm.
+"""
+import re
+from collections import Counter, defaultdict
+from itertools import chain
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import Count, Sum
+from django.db.models.expressions import RawSQL
+
+from .models import Comment, Post, SearchTerm
+from .stemmer import stem
+
+FTS_TABLE = 'blog_search'
+FTS_COMMENT_TABLE = 'blog_search_comment'
+FIELD_WEIGHTS = {'title': 4, 'text': 2, 'comments': 1}
+MAX_TERM_LENGTH = SearchTerm._meta.get_field('term').max_length
+WORD_RE = re.compile(r'\w+')
+INDEX_BATCH_SIZE = 500
+
+_fts_available = {}
+
+
+def tokenize(text):
+    """Основы всех слов текста в порядке появления."""
+    return [stem(word)[:MAX_TERM_LENGTH] for word in WORD_RE.findall(text)]
+
+
+def query_terms(query):
+    """Основы слов поискового запроса без повторов."""
+    return list(dict.fromkeys(tokenize(query)))
+
+
+def build_documents(post_ids):
+    """
+    Поля документов для постов: {pk: {поле: основы}}.
+
+    Основы комментариев собраны по их id: {'comments': {id: основы}}.
+    """
+    comments = defaultdict(dict)
+    for pk, post_id, text in Comment.objects.filter(
+            post_id__in=post_ids).values_list('pk', 'post_id', 'text'):
+        comments[post_id][pk] = tokenize(text)
+    return {
+        pk: {
+            'title': tokenize(title),
+            'text': tokenize(text),
+            'comments': comments[pk],
+        }
+        for pk, title, text in Post.objects.filter(
+            pk__in=post_ids).values_list('pk', 'title', 'text')
+    }
+
+
+def _count(terms, weight=1):
+    counts = Counter()
+    for term in terms:
+        counts[term] += weight
+    return counts
+
+
+class Fts5Backend:
+    """
+    Индекс в двух виртуальных таблицах FTS5; ранжирование — bm25.
+
+    Строка поста (rowid — id поста) хранит заголовок и текст, у каждого
+    комментария своя строка (rowid — id комментария). Запись комментария
+    меняет одну строку независимо от того, сколько комментариев у поста.
+    Пост комментария берётся из blog_comment по первичному ключу: это
+    быстрее, чем читать столбец из хранилища FTS5.
+    """
+
+    name = 'fts5'
+
+    def __init__(self, using):
+        self.connection = connections[using]
+
+    def _delete_comments_of(self, cursor, post_ids):
+        comment_table = Comment._meta.db_table
+        placeholders = ', '.join(['%s'] * len(post_ids))
+        cursor.execute(
+            f'DELETE FROM {FTS_COMMENT_TABLE} WHERE rowid IN ('
+            f'SELECT id FROM {comment_table} '
+            f'WHERE post_id IN ({placeholders}))',
+            list(post_ids))
+
+    def index(self, documents):
+        # Строк комментариев на порядок больше, чем постов: вне транзакции
+        # SQLite фиксировал бы каждую вставку отдельно.
+        with transaction.atomic(using=self.connection.alias), \
+                self.connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT OR REPLACE INTO {FTS_TABLE} (rowid, title, text) '
+                f'VALUES (%s, %s, %s)',
+                [(pk, ' '.join(fields['title']), ' '.join(fields['text']))
+                 for pk, fields in documents.items()])
+            self._delete_comments_of(cursor, list(documents))
+            cursor.executemany(
+                f'INSERT INTO {FTS_COMMENT_TABLE} (rowid, text) '
+                f'VALUES (%s, %s)',
+                [(comment_id, ' '.join(terms))
+                 for pk, fields in documents.items()
+                 for comment_id, terms in fields['comments'].items()])
+
+    def update_post(self, pk, title, text):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT OR REPLACE INTO {FTS_TABLE} (rowid, title, text) '
+                f'VALUES (%s, %s, %s)',
+                (pk, ' '.join(title), ' '.join(text)))
+
+    def update_comment(self, comment_id, post_id, terms, previous):
+        with self.connection.cursor() as cursor:
+            if terms:
+                cursor.execute(
+                    f'INSERT OR REPLACE INTO {FTS_COMMENT_TABLE} '
+                    f'(rowid, text) VALUES (%s, %s)',
+                    (comment_id, ' '.join(terms)))
+            else:
+                cursor.execute(
+                    f'DELETE FROM {FTS_COMMENT_TABLE} WHERE rowid = %s',
+                    (comment_id,))
+
+    def remove(self, post_ids):
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+                [(pk,) for pk in post_ids])
+            self._delete_comments_of(cursor, post_ids)
+
+    def clear(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+            cursor.execute(f'DELETE FROM {FTS_COMMENT_TABLE}')
+
+    def search(self, queryset, terms):
+        post_table = queryset.model._meta.db_table
+        # CROSS JOIN оставляет таблицу FTS5 ведущей: bm25 считается
+        # только при её просмотре по MATCH.
+        comments = (
+            f'FROM {FTS_COMMENT_TABLE} CROSS JOIN {Comment._meta.db_table} '
+            f'AS comment ON comment.id = {FTS_COMMENT_TABLE}.rowid '
+            f'WHERE {FTS_COMMENT_TABLE} MATCH %s'
+        )
+        quoted = ['"{}"'.format(term) for term in terms]
+        # Посты, в которых или в комментариях к которым есть слово,
+        # находятся по каждому слову запроса и пересекаются.
+        found = ' INTERSECT '.join([
+            f'SELECT post_id FROM ('
+            f'SELECT rowid AS post_id FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s '
+            f'UNION SELECT comment.post_id {comments})'
+        ] * len(terms))
+        # bm25 тем меньше, чем строка релевантнее. Оценки строк поста
+        # и его комментариев складываются; SQLite собирает их один раз
+        # и строит по ним временный индекс по post_id.
+        title_weight, text_weight, comments_weight = FIELD_WEIGHTS.values()
+        rank = (
+            f'SELECT SUM(score) FROM ('
+            f'SELECT rowid AS post_id, '
+            f'-bm25({FTS_TABLE}, {title_weight}, {text_weight}) AS score '
+            f'FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+            f'UNION ALL SELECT comment.post_id, '
+            f'-bm25({FTS_COMMENT_TABLE}, {comments_weight}) {comments}'
+            f') WHERE post_id = {post_table}.id'
+        )
+        any_term = ' OR '.join(quoted)
+        # Оценка — в extra(select=...), а не в annotate(): так COUNT(*)
+        # пагинатора её не вычисляет.
+        return queryset.filter(pk__in=RawSQL(
+            found, list(chain.from_iterable((q, q) for q in quoted)))
+        ).extra(select={'search_rank': rank},
+                select_params=(any_term, any_term))
+
+
+class TermBackend:
+    """
+    Обратный индекс на обычной таблице для баз без FTS5.
+
+    Для каждого поста хранятся две группы строк: основы из заголовка
+    и текста и основы из комментариев. Вес строки — число вхождений
+    основы, умноженное на вес поля.
+    """
+
+    name = 'terms'
+
+    def __init__(self, using):
+        self.terms = SearchTerm.objects.using(using)
+
+    def _post_weights(self, title, text):
+        return (_count(title, FIELD_WEIGHTS['title'])
+                + _count(text, FIELD_WEIGHTS['text']))
+
+    def _rows(self, pk, weights, in_comments=False):
+        return [
+            SearchTerm(post_id=pk, term=term, weight=weight,
+                       in_comments=in_comments)
+            for term, weight in weights.items()
+        ]
+
+    def index(self, documents):
+        self.terms.filter(post_id__in=list(documents)).delete()
+        rows = []
+        for pk, fields in documents.items():
+            rows += self._rows(
+                pk, self._post_weights(fields['title'], fields['text']))
+            rows += self._rows(
+                pk, _count(chain.from_iterable(fields['comments'].values()),
+                           FIELD_WEIGHTS['comments']),
+                in_comments=True)
+        self.terms.bulk_create(rows, batch_size=1000)
+
+    def update_post(self, pk, title, text):
+        self.terms.filter(post_id=pk, in_comments=False).delete()
+        self.terms.bulk_create(
+            self._rows(pk, self._post_weights(title, text)), batch_size=1000)
+
+    def update_comment(self, comment_id, post_id, terms, previous):
+        # Комментарии поста хранятся одной группой строк, поэтому
+        # меняются только веса основ, вошедших в старый или новый текст.
+        delta = _count(terms, FIELD_WEIGHTS['comments'])
+        delta.subtract(_count(previous, FIELD_WEIGHTS['comments']))
+        existing = self.terms.filter(
+            post_id=post_id, in_comments=True, term__in=list(delta))
+        changed, emptied = [], []
+        for row in existing:
+            row.weight += delta.pop(row.term)
+            if row.weight > 0:
+                changed.append(row)
+            else:
+                emptied.append(row.pk)
+        if emptied:
+            self.terms.filter(pk__in=emptied).delete()
+        if changed:
+            self.terms.bulk_update(changed, ['weight'])
+        self.terms.bulk_create(self._rows(
+            post_id, {term: weight for term, weight in delta.items()
+                      if weight > 0},
+            in_comments=True))
+
+    def remove(self, post_ids):
+        self.terms.filter(post_id__in=post_ids).delete()
+
+    def clear(self):
+        self.terms.all().delete()
+
+    def search(self, queryset, terms):
+        # Основа может встретиться и в посте, и в комментариях, поэтому
+        # совпавшие основы считаются без повторов.
+        return queryset.filter(search_terms__term__in=terms).annotate(
+            search_hits=Count('search_terms__term', distinct=True),
+            search_rank=Sum('search_terms__weight'),
+        ).filter(search_hits=len(terms))
+
+
+def has_fts_table(using):
+    """Есть ли в базе таблицы FTS5, созданные миграциями."""
+    if using not in _fts_available:
+        connection = connections[using]
+        _fts_available[using] = (
+            connection.vendor == 'sqlite'
+            and {FTS_TABLE, FTS_COMMENT_TABLE}.issubset(
+                connection.introspection.table_names()))
+    return _fts_available[using]
+
+
+def get_backend(using=None):
+    """Хранилище индекса согласно настройке SEARCH_BACKEND."""
+    using = using or router.db_for_write(Post)
+    backend = settings.SEARCH_BACKEND
+    if backend == 'auto':
+        backend = 'fts5' if has_fts_table(using) else 'terms'
+    if backend == 'fts5':
+        return Fts5Backend(using)
+    return TermBackend(using)
+
+
+def search_posts(queryset, query):
+    """Посты выборки, найденные по запросу, от самых релевантных."""
+    terms = query_terms(query)
+    if not terms:
+        return queryset.none()
+    return get_backend(queryset.db).search(queryset, terms).order_by(
+        '-search_rank', '-pub_date')
+
+
+def index_posts(post_ids):
+    """Заново индексирует посты целиком, вместе с комментариями."""
+    post_ids = set(post_ids)
+    documents = build_documents(post_ids)
+    backend = get_backend()
+    if documents:
+        backend.index(documents)
+    if post_ids - set(documents):
+        backend.remove(post_ids - set(documents))
+
+
+def index_post(post):
+    """Обновляет заголовок и текст поста в индексе без чтения из базы."""
+    get_backend().update_post(
+        post.pk, tokenize(post.title), tokenize(post.text))
+
+
+def index_comment(comment_id, post_id, text='', previous_text=''):
+    """Заменяет в индексе основы старого текста комментария новыми."""
+    get_backend().update_comment(
+        comment_id, post_id, tokenize(text), tokenize(previous_text))
+
+
+def remove_posts(post_ids):
+    get_backend().remove(list(post_ids))
+
+
+def rebuild_index(batch_size=INDEX_BATCH_SIZE):
+    """Строит индекс заново по всем постам; возвращает их число."""
+    backend = get_backend()
+    backend.clear()
+    post_ids = list(Post.objects.order_by('pk').values_list('pk', flat=True))
+    for start in range(0, len(post_ids), batch_size):
+        backend.index(build_documents(post_ids[start:start + batch_size]))
+    return len(post_ids)
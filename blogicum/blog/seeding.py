@@ -0,0 +1,165 @@
+"""
+Заполнение базы синтетическим набором данных для замеров.
+
+Объекты генерируются функциями из corpus.py — при workers > 1
+в пуле процессов — и вставляются пачками через bulk_create, каждая
+пачка в своей транзакции. При одинаковом зерне набор одинаков; даты
+отсчитываются от момента запуска.
+"""
+import multiprocessing
+from datetime import timedelta
+from itertools import chain, islice
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from . import corpus
+from .models import Category, Comment, Location, Post
+from .search import rebuild_index
+from .transfer import keep_created_at
+from .utils import recount_comments
+
+User = get_user_model()
+SEED_CHUNK_SIZE = 5000
+SEED_DEFAULTS = {
+    'users': 1000,
+    'categories': 20,
+    'locations': 50,
+    'posts': 50000,
+    'comments': 500000,
+    # Посты публикуются в течение days дней до запуска; доля future
+    # отложена на срок до future_days дней вперёд.
+    'days': 365,
+    'future': 0.05,
+    'future_days': 30,
+    'unpublished': 0.05,
+    # Показатели закона Ципфа: сколько постов у автора
+    # и сколько комментариев у поста.
+    'author_exponent': 0.8,
+    'comment_exponent': 0.8,
+}
+
+
+def _generate(func, tasks, workers):
+    if workers > 1:
+        with multiprocessing.Pool(workers) as pool:
+            yield from pool.imap(func, tasks)
+    else:
+        yield from map(func, tasks)
+
+
+def _rebatch(chunks, size):
+    """Пачки по size объектов из пачек генерации."""
+    objects = chain.from_iterable(chunks)
+    batch = list(islice(objects, size))
+    while batch:
+        yield batch
+        batch = list(islice(objects, size))
+
+
+def _insert(model, chunks, fields=(), progress=None):
+    """
+    Вставляет пачки объектов.
+
+    Возвращает значения fields новых строк или, если поля не заданы,
+    число вставленных объектов.
+    """
+    last_pk = model.objects.aggregate(last=Max('pk'))['last'] or 0
+    done = 0
+    for objects in chunks:
+        with transaction.atomic():
+            model.objects.bulk_create(objects)
+        done += len(objects)
+        if progress is not None:
+            progress(model._meta.model_name, done)
+    if not fields:
+        return done
+    # На SQLite bulk_create не возвращает первичные ключи.
+    return list(model.objects.filter(pk__gt=last_pk).order_by(
+        'pk').values_list(*fields))
+
+
+def seed_blog(seed=0, prefix='seed', workers=1, chunk_size=SEED_CHUNK_SIZE,
+              progress=None, **options):
+    """
+    Создаёт пользователей, категории, местоположения, посты и комментарии.
+
+    Возвращает {модель: число созданных объектов}.
+    """
+    options = {**SEED_DEFAULTS, **options}
+    for key in ('users', 'categories', 'locations', 'posts'):
+        if options[key] < 1:
+            raise ValueError(f'Нужен хотя бы один объект: {key}.')
+    if (User.objects.filter(username__startswith=f'{prefix}_user_').exists()
+            or Category.objects.filter(slug__startswith=f'{prefix}-')
+            .exists()):
+        raise ValueError(f'Набор с префиксом {prefix!r} уже загружен.')
+    now = timezone.now()
+
+    user_ids = [pk for pk, in _insert(User, [[
+        User(username=f'{prefix}_user_{i}', first_name=first_name,
+             last_name=last_name, password='!', date_joined=now)
+        for i, (first_name, last_name) in enumerate(
+            corpus.user_rows(seed, options['users']))
+    ]], ['pk'], progress)]
+    with keep_created_at():
+        category_ids = [pk for pk, in _insert(Category, [[
+            Category(title=title, description=description,
+                     slug=f'{prefix}-{i}', is_published=is_published,
+                     created_at=now)
+            for i, (title, description, is_published) in enumerate(
+                corpus.category_rows(
+                    seed, options['categories'], options['unpublished']))
+        ]], ['pk'], progress)]
+        location_ids = [pk for pk, in _insert(Location, [[
+            Location(name=name, is_published=is_published, created_at=now)
+            for name, is_published in corpus.location_rows(
+                seed, options['locations'], options['unpublished'])
+        ]], ['pk'], progress)]
+
+        def posts(rows):
+            return [
+                Post(title=title, text=text, is_published=is_published,
+                     pub_date=now + timedelta(minutes=offset),
+                     created_at=min(now, now + timedelta(minutes=offset)),
+                     author_id=user_ids[author],
+                     category_id=category_ids[category],
+                     location_id=location_ids[location])
+                for (title, text, offset, is_published, author, category,
+                     location) in rows
+            ]
+
+        post_rows = _insert(Post, map(posts, _rebatch(_generate(
+            corpus.post_chunk,
+            corpus.chunk_tasks(seed, options['posts'], options),
+            workers,
+        ), chunk_size)), ['pk', 'pub_date'], progress)
+
+        def comments(rows):
+            objects = []
+            for post, author, text, moment in rows:
+                post_id, pub_date = post_rows[post]
+                # Комментарии к отложенным постам — от момента запуска.
+                start = min(pub_date, now)
+                objects.append(Comment(
+                    post_id=post_id, author_id=user_ids[author], text=text,
+                    created_at=start + (now - start) * moment))
+            return objects
+
+        comment_count = _insert(Comment, map(comments, _rebatch(_generate(
+            corpus.comment_chunk,
+            corpus.chunk_tasks(seed, options['comments'], options),
+            workers,
+        ), chunk_size)), progress=progress)
+    # bulk_create не вызывает сигналов.
+    recount_comments()
+    rebuild_index()
+    return {
+        'user': len(user_ids),
+        'category': len(category_ids),
+        'location': len(location_ids),
+        'post': len(post_rows),
+        'comment': comment_count,
+    }
@@ -0,0 +1,208 @@
+from functools import partial
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models import F
+from django.db.models.signals import (post_delete, post_init, post_save,
+                                      pre_delete)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .db import configure_sqlite
+from .images import delete_unused_image
+from .models import (Category, Comment, ImageTask, Location, Post,
+                     is_post_deleting, mark_post_deleting)
+from .page_cache import (ALL_PAGES_TAG, POST_LIST_TAG, post_tag,
+                         purge_page_cache)
+from .schedule import reset_next_publication
+from .search import index_comment, index_post, index_posts, remove_posts
+from .tasks import enqueue_image_task
+from .utils import touch_posts
+
+User = get_user_model()
+
+
+@receiver(pre_delete, sender=Post)
+def mark_deleting_post(sender, instance, **kwargs):
+    """Отмечает пост, комментарии которого удаляются вместе с ним."""
+    mark_post_deleting(instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+def increment_comment_count(sender, instance, created, raw, **kwargs):
+    """Увеличивает счётчик комментариев поста при создании комментария."""
+    if created and not raw:
+        Post.objects.filter(pk=instance.post_id).update(
+            comment_count=F('comment_count') + 1, updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Comment)
+def touch_commented_post(sender, instance, created, raw, **kwargs):
+    """Отмечает пост изменённым при правке комментария."""
+    if not created and not raw:
+        touch_posts(Post.objects.filter(pk=instance.post_id))
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, **kwargs):
+    """Уменьшает счётчик комментариев поста при удалении комментария."""
+    if is_post_deleting(instance.post_id):
+        return
+    Post.objects.filter(pk=instance.post_id, comment_count__gt=0).update(
+        comment_count=F('comment_count') - 1, updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(pre_delete, sender=Location)
+def invalidate_related_post_cards(sender, instance, **kwargs):
+    """Отмечает изменёнными посты категории или местоположения."""
+    # Карточка поста кешируется по времени его изменения.
+    touch_posts(instance.posts.all())
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_post_cards(sender, instance, created, update_fields,
+                                 **kwargs):
+    """Сбрасывает карточки постов и страницы при смене имени автора."""
+    if created or (update_fields and 'username' not in update_fields):
+        return
+    touch_posts(instance.posts.all())
+    purge_page_cache(ALL_PAGES_TAG)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def purge_post_pages(sender, instance, **kwargs):
+    """Сбрасывает страницу поста и списки постов."""
+    purge_page_cache(POST_LIST_TAG, post_tag(instance.pk))
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def purge_commented_post_pages(sender, instance, **kwargs):
+    """Сбрасывает страницу поста и списки, где показано число комментариев."""
+    purge_page_cache(POST_LIST_TAG, post_tag(instance.post_id))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def purge_all_pages(sender, **kwargs):
+    """Сбрасывает все страницы: категории и места видны везде."""
+    purge_page_cache(ALL_PAGES_TAG)
+
+
+@receiver(post_save, sender=Post)
+def track_scheduled_post(sender, instance, **kwargs):
+    """Пересматривает ближайшую публикацию при сохранении отложенного поста."""
+    if instance.pub_date > timezone.now():
+        reset_next_publication()
+
+
+@receiver(post_save, sender=Post)
+def queue_image_processing(sender, instance, raw, **kwargs):
+    """Отправляет новое изображение поста в фоновую обработку."""
+    if raw:
+        return
+    if not instance.image:
+        if instance.image_status:
+            ImageTask.objects.filter(post=instance).delete()
+            instance.image_status = ''
+            Post.objects.filter(pk=instance.pk).update(image_status='')
+        return
+    if not instance.image_variants_ready:
+        enqueue_image_task(instance)
+
+
+def _loaded_image(instance):
+    """Имя файла изображения; None, если поле не загружалось из базы."""
+    value = instance.__dict__.get('image')
+    return getattr(value, 'name', value)
+
+
+def _delete_image_on_commit(name):
+    # При откате транзакции файл ещё нужен посту.
+    if name:
+        transaction.on_commit(partial(delete_unused_image, name))
+
+
+@receiver(post_init, sender=Post)
+def remember_stored_image(sender, instance, **kwargs):
+    """Запоминает имя файла изображения, сохранённого в базе."""
+    instance._stored_image = _loaded_image(instance) if instance.pk else None
+
+
+@receiver(post_save, sender=Post)
+def delete_replaced_image(sender, instance, created, raw, **kwargs):
+    """Удаляет прежнее изображение поста, если оно больше не используется."""
+    if 'image' not in instance.__dict__:
+        return
+    previous = instance._stored_image
+    instance._stored_image = _loaded_image(instance)
+    if not created and not raw and previous != instance._stored_image:
+        _delete_image_on_commit(previous)
+
+
+@receiver(post_delete, sender=Post)
+def delete_post_image(sender, instance, **kwargs):
+    """Удаляет изображение удалённого поста вместе с вариантами."""
+    _delete_image_on_commit(_loaded_image(instance))
+
+
+@receiver(post_save, sender=Post)
+def index_saved_post(sender, instance, raw, **kwargs):
+    """Обновляет заголовок и текст поста в поисковом индексе."""
+    if not raw:
+        index_post(instance)
+
+
+@receiver(pre_delete, sender=Post)
+def unindex_post(sender, instance, **kwargs):
+    """Убирает удаляемый пост и его комментарии из поискового индекса."""
+    # Комментарии поста в индексе находятся по blog_comment, поэтому
+    # убираются до каскадного удаления.
+    remove_posts([instance.pk])
+
+
+@receiver(post_init, sender=Comment)
+def remember_indexed_text(sender, instance, **kwargs):
+    """Запоминает текст комментария, который сейчас лежит в индексе."""
+    instance._indexed_text = instance.__dict__.get('text')
+
+
+@receiver(post_save, sender=Comment)
+def index_saved_comment(sender, instance, created, raw, **kwargs):
+    """Заменяет в индексе старый текст комментария новым."""
+    if raw:
+        return
+    if created:
+        index_comment(instance.pk, instance.post_id, instance.text)
+    elif instance._indexed_text is None:
+        # Текст не загружался из базы — старые основы неизвестны.
+        index_posts([instance.post_id])
+    else:
+        index_comment(instance.pk, instance.post_id, instance.text,
+                      instance._indexed_text)
+    instance._indexed_text = instance.text
+
+
+@receiver(post_delete, sender=Comment)
+def unindex_comment(sender, instance, **kwargs):
+    """Убирает из индекса текст удалённого комментария."""
+    if is_post_deleting(instance.post_id):
+        return
+    if instance._indexed_text is None:
+        index_posts([instance.post_id])
+    else:
+        index_comment(instance.pk, instance.post_id,
+                      previous_text=instance._indexed_text)
+
+
+@receiver(connection_created)
+def tune_sqlite_connection(sender, connection, **kwargs):
+    """Настраивает каждое новое соединение с базой SQLite."""
+    configure_sqlite(connection)
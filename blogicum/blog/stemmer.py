@@ -0,0 +1,120 @@
+"""
+Стеммер Snowball для русского языка.
+
+Переносит алгоритм https://snowballstem.org/algorithms/russian/stemmer.html:
+окончания отрезаются только в области RV, словообразовательные
+суффиксы — в области R2.
+"""
+from functools import lru_cache
+
+VOWELS = 'аеиоуыэюя'
+STEM_CACHE_SIZE = 65536
+# Окончания первой группы отрезаются, только если перед ними «а» или «я».
+AFTER_A = 'ая'
+
+
+def _endings(groups):
+    """Окончания с условиями, от самых длинных к коротким."""
+    return sorted(
+        ((ending, preceded_by) for endings, preceded_by in groups
+         for ending in endings),
+        key=lambda item: -len(item[0])
+    )
+
+
+PERFECTIVE_GERUND = _endings((
+    (('в', 'вши', 'вшись'), AFTER_A),
+    (('ив', 'ивши', 'ившись', 'ыв', 'ывши', 'ывшись'), None),
+))
+ADJECTIVE = _endings((
+    (('ее', 'ие', 'ые', 'ое', 'ими', 'ыми', 'ей', 'ий', 'ый', 'ой', 'ем',
+      'им', 'ым', 'ом', 'его', 'ого', 'ему', 'ому', 'их', 'ых', 'ую', 'юю',
+      'ая', 'яя', 'ою', 'ею'), None),
+))
+PARTICIPLE = _endings((
+    (('ем', 'нн', 'вш', 'ющ', 'щ'), AFTER_A),
+    (('ивш', 'ывш', 'ующ'), None),
+))
+REFLEXIVE = _endings(((('ся', 'сь'), None),))
+VERB = _endings((
+    (('ла', 'на', 'ете', 'йте', 'ли', 'й', 'л', 'ем', 'н', 'ло', 'но', 'ет',
+      'ют', 'ны', 'ть', 'ешь', 'нно'), AFTER_A),
+    (('ила', 'ыла', 'ена', 'ейте', 'уйте', 'ите', 'или', 'ыли', 'ей', 'уй',
+      'ил', 'ыл', 'им', 'ым', 'ен', 'ило', 'ыло', 'ено', 'ят', 'ует', 'уют',
+      'ит', 'ыт', 'ены', 'ить', 'ыть', 'ишь', 'ую', 'ю'), None),
+))
+NOUN = _endings((
+    (('а', 'ев', 'ов', 'ие', 'ье', 'е', 'иями', 'ями', 'ами', 'еи', 'ии',
+      'и', 'ией', 'ей', 'ой', 'ий', 'й', 'иям', 'ям', 'ием', 'ем', 'ам',
+      'ом', 'о', 'у', 'ах', 'иях', 'ях', 'ы', 'ь', 'ию', 'ью', 'ю', 'ия',
+      'ья', 'я'), None),
+))
+SUPERLATIVE = _endings(((('ейш', 'ейше'), None),))
+DERIVATIONAL = _endings(((('ост', 'ость'), None),))
+
+
+def _region_after_vowel_consonant(word, start):
+    for i in range(start + 1, len(word)):
+        if word[i] not in VOWELS and word[i - 1] in VOWELS:
+            return i + 1
+    return len(word)
+
+
+def _strip(word, region, endings):
+    """Отрезает самое длинное подходящее окончание или возвращает None."""
+    for ending, preceded_by in endings:
+        start = len(word) - len(ending)
+        if start < region or not word.endswith(ending):
+            continue
+        if preceded_by is None or (
+                start > region and word[start - 1] in preceded_by):
+            return word[:start]
+    return None
+
+
+def _strip_inflection(word, rv):
+    """Шаг 1: окончание деепричастия, прилагательного, глагола или имени."""
+    stripped = _strip(word, rv, PERFECTIVE_GERUND)
+    if stripped is not None:
+        return stripped
+    word = _strip(word, rv, REFLEXIVE) or word
+    stripped = _strip(word, rv, ADJECTIVE)
+    if stripped is not None:
+        return _strip(stripped, rv, PARTICIPLE) or stripped
+    stripped = _strip(word, rv, VERB)
+    if stripped is None:
+        stripped = _strip(word, rv, NOUN)
+    return word if stripped is None else stripped
+
+
+def _tidy(word, rv):
+    """Шаг 4: «нн» в конце, превосходная степень и мягкий знак."""
+    if word.endswith('нн') and len(word) - 2 >= rv:
+        return word[:-1]
+    stripped = _strip(word, rv, SUPERLATIVE)
+    if stripped is not None:
+        if stripped.endswith('нн') and len(stripped) - 2 >= rv:
+            return stripped[:-1]
+        return stripped
+    if word.endswith('ь') and len(word) - 1 >= rv:
+        return word[:-1]
+    return word
+
+
+# Словарь живого текста невелик по сравнению с числом слов в нём.
+@lru_cache(maxsize=STEM_CACHE_SIZE)
+def stem(word):
+    """Основа слова: русские слова стеммируются, прочие — нет."""
+    word = word.lower().replace('ё', 'е')
+    rv = next(
+        (i + 1 for i, char in enumerate(word) if char in VOWELS), len(word))
+    if rv == len(word):
+        return word
+    r2 = _region_after_vowel_consonant(
+        word, _region_after_vowel_consonant(word, 0))
+
+    word = _strip_inflection(word, rv)
+    if word.endswith('и') and len(word) - 1 >= rv:
+        word = word[:-1]
+    word = _strip(word, r2, DERIVATIONAL) or word
+    return _tidy(word, rv)
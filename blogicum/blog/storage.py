@@ -0,0 +1,89 @@
+import hashlib
+import posixpath
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+from django.views.static import serve
+
+# Год — максимум, который имеет смысл указывать в max-age.
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+HASH_LENGTH = 32
+# Короче хеш не укорачивается ради max_length: растёт риск совпадений.
+MIN_HASH_LENGTH = 16
+
+
+@deconstructible
+class ContentHashedStorage(FileSystemStorage):
+    """
+    Хранилище, в котором имя файла — хеш его содержимого.
+
+    Одинаковые файлы сохраняются один раз, а файл по заданному адресу
+    никогда не меняется, поэтому его можно кешировать навсегда.
+    """
+
+    def save(self, name, content, max_length=None):
+        hasher = hashlib.sha256()
+        for chunk in content.chunks():
+            hasher.update(chunk)
+        content.seek(0)
+        directory, filename = posixpath.split(name)
+        extension = posixpath.splitext(filename)[1].lower()
+        hash_length = HASH_LENGTH
+        if max_length is not None:
+            hash_length = min(hash_length, max_length - len(
+                posixpath.join(directory, extension)))
+        if hash_length < MIN_HASH_LENGTH:
+            raise SuspiciousFileOperation(
+                f'Имя файла в {directory!r} не помещается '
+                f'в {max_length} символов.')
+        name = posixpath.join(
+            directory, hasher.hexdigest()[:hash_length] + extension)
+        if self.exists(name):
+            return name
+        return super().save(name, content, max_length)
+
+    def save_as(self, name, content):
+        """
+        Сохраняет файл под точным именем, заменяя прежний.
+
+        Для производных файлов, имя которых уже выведено из хеша оригинала.
+        """
+        if self.exists(name):
+            self.delete(name)
+        return super().save(name, content)
+
+
+class ManifestStaticStorage(ManifestStaticFilesStorage):
+    """
+    Статика с хешем содержимого в имени файла.
+
+    При DEBUG, пока collectstatic не запускался, отдаёт ссылки
+    на исходные файлы. В боевом режиме файл без записи в манифесте —
+    ошибка: иначе страница сослалась бы на адрес, который кешируется
+    навсегда, но не меняется вместе с файлом.
+    """
+
+    @property
+    def manifest_strict(self):
+        return not settings.DEBUG
+
+    def hashed_name(self, name, content=None, filename=None):
+        try:
+            return super().hashed_name(name, content, filename)
+        except ValueError:
+            if not settings.DEBUG:
+                raise
+            return name
+
+
+post_image_storage = ContentHashedStorage()
+
+
+def serve_immutable(request, path, document_root=None, show_indexes=False):
+    """Отдаёт файл с заголовком вечного кеширования."""
+    response = serve(request, path, document_root, show_indexes)
+    response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    return response
@@ -0,0 +1,87 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .images import (IMAGE_ERRORS, delete_unused_image, generate_variants,
+                     strip_metadata)
+from .models import ImageStatus, ImageTask, Post
+from .page_cache import POST_LIST_TAG, post_tag, purge_page_cache
+from .storage import post_image_storage
+
+MAX_ATTEMPTS = 3
+# Задача, которую обработчик не завершил за это время, считается
+# брошенной и снова выдаётся другому обработчику.
+LOCK_TIMEOUT = timedelta(minutes=10)
+
+
+def enqueue_image_task(post):
+    """Ставит изображение поста в очередь и отмечает пост как ожидающий."""
+    task, created = ImageTask.objects.get_or_create(
+        post=post, defaults={'image': post.image.name})
+    if not created and task.image != post.image.name:
+        ImageTask.objects.filter(pk=task.pk).update(
+            image=post.image.name, attempts=0, locked_at=None, error='')
+    post.image_status = ImageStatus.PENDING
+    Post.objects.filter(pk=post.pk).update(image_status=post.image_status)
+
+
+def claim_image_task(now=None):
+    """Забирает следующую задачу из очереди или возвращает None."""
+    now = now or timezone.now()
+    available = Q(locked_at__isnull=True) | Q(locked_at__lt=now - LOCK_TIMEOUT)
+    candidates = ImageTask.objects.filter(
+        available, attempts__lt=MAX_ATTEMPTS
+    ).values_list('pk', flat=True)
+    for pk in candidates[:10]:
+        # Условное обновление — атомарный захват: из нескольких обработчиков
+        # задачу получит только тот, чей UPDATE изменил строку.
+        if ImageTask.objects.filter(available, pk=pk).update(
+                locked_at=now, attempts=F('attempts') + 1):
+            return ImageTask.objects.get(pk=pk)
+    return None
+
+
+def _finish(task, **post_fields):
+    """Сохраняет результат, если изображение поста не сменилось."""
+    with transaction.atomic():
+        Post.objects.filter(pk=task.post_id, image=task.image).update(
+            **post_fields)
+        ImageTask.objects.filter(pk=task.pk, image=task.image).delete()
+    purge_page_cache(POST_LIST_TAG, post_tag(task.post_id))
+
+
+def run_image_task(task):
+    """Обрабатывает изображение: убирает метаданные и создаёт варианты."""
+    try:
+        name = strip_metadata(task.image, post_image_storage)
+        image_variants = generate_variants(name)
+    except IMAGE_ERRORS as error:
+        # После последней попытки задача остаётся в таблице с текстом
+        # ошибки, но больше не выдаётся обработчикам.
+        ImageTask.objects.filter(pk=task.pk, image=task.image).update(
+            locked_at=None, error=str(error))
+        if task.attempts >= MAX_ATTEMPTS:
+            Post.objects.filter(pk=task.post_id, image=task.image).update(
+                image_status=ImageStatus.FAILED)
+        return False
+    _finish(task, image=name, image_variants=image_variants,
+            image_status=ImageStatus.READY, updated_at=timezone.now())
+    # Очищенная копия получает новое имя; исходник с EXIF удаляется,
+    # если его не использует другой пост.
+    if name != task.image:
+        delete_unused_image(task.image)
+    return True
+
+
+def process_image_tasks(limit=None):
+    """Обрабатывает задачи из очереди, пока она не опустеет."""
+    processed = 0
+    while limit is None or processed < limit:
+        task = claim_image_task()
+        if task is None:
+            break
+        run_image_task(task)
+        processed += 1
+    return processed
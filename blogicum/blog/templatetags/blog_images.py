@@ -0,0 +1,25 @@
+from django import template
+
+from blog.images import (IMAGE_FORMATS, variant_name, variant_size,
+                         variant_srcset)
+from blog.storage import post_image_storage
+
+register = template.Library()
+
+
+@register.inclusion_tag('includes/post_image.html')
+def post_image(post, variant='card'):
+    """Изображение поста с вариантами размеров и форматов."""
+    context = {'image': post.image}
+    if not post.image_variants_ready:
+        return context
+    name = post.image.name
+    width = post.image_variants['width']
+    height = post.image_variants['height']
+    context['width'], context['height'] = variant_size(width, height, variant)
+    context['src'] = post_image_storage.url(variant_name(name, variant, 'jpg'))
+    context['srcsets'] = {
+        extension: variant_srcset(name, width, height, extension)
+        for extension in IMAGE_FORMATS
+    }
+    return context
@@ -0,0 +1,361 @@
+"""
+Потоковый перенос данных блога в JSON Lines и CSV и обратно.
+
+В отличие от dumpdata/loaddata файл не загружается в память целиком:
+выгрузка идёт по курсору, загрузка — пачками через bulk_create, каждая
+пачка в своей транзакции. Категории, местоположения и пользователи
+связываются по естественным ключам (slug, название, username), поэтому
+их id в разных базах могут не совпадать; посты и комментарии, как
+и в loaddata, сохраняют свои id.
+"""
+import csv
+import json
+from contextlib import contextmanager
+from datetime import datetime
+from itertools import groupby, islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import Category, Comment, Location, Post
+
+User = get_user_model()
+TRANSFER_BATCH_SIZE = 1000
+# Поля выгрузки: имя в файле -> путь для values_list(). Порядок моделей —
+# порядок загрузки: сначала то, на что ссылаются остальные.
+TRANSFER_FIELDS = {
+    'category': (Category, {
+        'slug': 'slug', 'title': 'title', 'description': 'description',
+        'is_published': 'is_published', 'created_at': 'created_at',
+    }),
+    'location': (Location, {
+        'name': 'name', 'is_published': 'is_published',
+        'created_at': 'created_at',
+    }),
+    'user': (User, {
+        'username': 'username', 'email': 'email',
+        'first_name': 'first_name', 'last_name': 'last_name',
+        'password': 'password', 'is_active': 'is_active',
+        'is_staff': 'is_staff', 'is_superuser': 'is_superuser',
+        'date_joined': 'date_joined',
+    }),
+    'post': (Post, {
+        'id': 'id', 'title': 'title', 'text': 'text',
+        'pub_date': 'pub_date', 'is_published': 'is_published',
+        'created_at': 'created_at', 'image': 'image',
+        'author': 'author__username', 'category': 'category__slug',
+        'location': 'location__name',
+    }),
+    'comment': (Comment, {
+        'id': 'id', 'post': 'post_id', 'author': 'author__username',
+        'text': 'text', 'created_at': 'created_at',
+    }),
+}
+
+
+class TransferEncoder(DjangoJSONEncoder):
+    """В отличие от DjangoJSONEncoder сохраняет микросекунды дат."""
+
+    def default(self, o):
+        if isinstance(o, datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def export_rows(models=tuple(TRANSFER_FIELDS), with_passwords=False,
+                chunk_size=TRANSFER_BATCH_SIZE):
+    """Пары (модель, запись) для всех объектов, по курсору."""
+    for name in models:
+        model, fields = TRANSFER_FIELDS[name]
+        keys = [key for key in fields
+                if with_passwords or key != 'password']
+        rows = model.objects.order_by('pk').values_list(
+            *(fields[key] for key in keys)).iterator(chunk_size=chunk_size)
+        for row in rows:
+            yield name, dict(zip(keys, row))
+
+
+def write_jsonl(rows, stream):
+    """Пишет записи в JSON Lines; возвращает их число."""
+    count = 0
+    for name, record in rows:
+        stream.write(json.dumps(
+            {'model': name, **record}, cls=TransferEncoder,
+            ensure_ascii=False))
+        stream.write('\n')
+        count += 1
+    return count
+
+
+def read_jsonl(stream):
+    """Пары (модель, запись) из JSON Lines, строка за строкой."""
+    for line in stream:
+        if line.strip():
+            record = json.loads(line)
+            yield record.pop('model'), record
+
+
+def csv_name(model):
+    return f'{model}s.csv'
+
+
+def write_csv(rows, directory):
+    """Пишет записи каждой модели в свой CSV; возвращает их число."""
+    count = 0
+    for name, group in groupby(rows, key=lambda item: item[0]):
+        with open(directory / csv_name(name), 'w', newline='',
+                  encoding='utf-8') as stream:
+            writer = None
+            for _, record in group:
+                if writer is None:
+                    writer = csv.DictWriter(stream, fieldnames=list(record))
+                    writer.writeheader()
+                writer.writerow({
+                    key: '' if value is None else value
+                    for key, value in record.items()
+                })
+                count += 1
+    return count
+
+
+def read_csv(directory):
+    """Пары (модель, запись) из CSV-файлов в порядке загрузки моделей."""
+    for name in TRANSFER_FIELDS:
+        path = directory / csv_name(name)
+        if not path.exists():
+            continue
+        with open(path, newline='', encoding='utf-8') as stream:
+            for record in csv.DictReader(stream):
+                yield name, record
+
+
+def _value(model, field_name, value):
+    """Значение поля из записи; в CSV все значения — строки."""
+    if value == '':
+        value = None
+    return model._meta.get_field(field_name).to_python(value)
+
+
+def _key(value):
+    return value or None
+
+
+def _lookup(model, field, values):
+    """Первичные ключи по естественному ключу для одной пачки."""
+    values = {value for value in values if value}
+    if not values:
+        return {}
+    found = {}
+    for pk, value in model.objects.filter(
+            **{f'{field}__in': values}).order_by('-pk').values_list(
+                'pk', field):
+        found[value] = pk
+    return found
+
+
+def _new_records(records, key, model, field):
+    """
+    Записи, которых ещё нет в базе, без повторов внутри пачки.
+
+    Остальные записи учитываются загрузчиками как пропущенные.
+    """
+    keys = [key(record) for record in records]
+    seen = set(model.objects.filter(
+        **{f'{field}__in': {k for k in keys if k is not None}}
+    ).values_list(field, flat=True))
+    new = []
+    for record, k in zip(records, keys):
+        if k is not None and k not in seen:
+            seen.add(k)
+            new.append(record)
+    return new
+
+
+def _record_id(model, record, field='id'):
+    return _value(model, 'id', record.get(field))
+
+
+def _load_categories(records):
+    now = timezone.now()
+    categories = [
+        Category(
+            slug=record['slug'],
+            title=record['title'],
+            description=record.get('description') or '',
+            is_published=_value(
+                Category, 'is_published', record.get('is_published', True)),
+            created_at=_value(
+                Category, 'created_at', record.get('created_at')) or now,
+        )
+        for record in _new_records(
+            records, lambda r: r.get('slug'), Category, 'slug')
+    ]
+    Category.objects.bulk_create(categories, ignore_conflicts=True)
+    return len(records) - len(categories)
+
+
+def _load_locations(records):
+    now = timezone.now()
+    locations = [
+        Location(
+            name=record['name'],
+            is_published=_value(
+                Location, 'is_published', record.get('is_published', True)),
+            created_at=_value(
+                Location, 'created_at', record.get('created_at')) or now,
+        )
+        for record in _new_records(
+            records, lambda r: r.get('name'), Location, 'name')
+    ]
+    Location.objects.bulk_create(locations)
+    return len(records) - len(locations)
+
+
+def _load_users(records):
+    now = timezone.now()
+    users = [
+        User(
+            username=record['username'],
+            email=record.get('email') or '',
+            first_name=record.get('first_name') or '',
+            last_name=record.get('last_name') or '',
+            # Без хеша из выгрузки пароль нельзя использовать для входа.
+            password=record.get('password') or make_password(None),
+            is_active=_value(User, 'is_active', record.get('is_active', True)),
+            is_staff=_value(User, 'is_staff', record.get('is_staff', False)),
+            is_superuser=_value(
+                User, 'is_superuser', record.get('is_superuser', False)),
+            date_joined=_value(
+                User, 'date_joined', record.get('date_joined')) or now,
+        )
+        for record in _new_records(
+            records, lambda r: r.get('username'), User, 'username')
+    ]
+    User.objects.bulk_create(users, ignore_conflicts=True)
+    return len(records) - len(users)
+
+
+def _load_posts(records):
+    now = timezone.now()
+    # Посты без автора пропускаются.
+    signed = [r for r in records if r.get('author')]
+    authors = _lookup(User, 'username', (r['author'] for r in signed))
+    categories = _lookup(
+        Category, 'slug', (r.get('category') for r in signed))
+    locations = _lookup(
+        Location, 'name', (r.get('location') for r in signed))
+    posts = [
+        Post(
+            id=_record_id(Post, record),
+            title=record['title'],
+            text=record['text'],
+            pub_date=_value(Post, 'pub_date', record['pub_date']),
+            is_published=_value(
+                Post, 'is_published', record.get('is_published', True)),
+            created_at=_value(
+                Post, 'created_at', record.get('created_at')) or now,
+            image=record.get('image') or '',
+            author_id=authors[record['author']],
+            category_id=categories.get(_key(record.get('category'))),
+            location_id=locations.get(_key(record.get('location'))),
+        )
+        for record in _new_records(
+            signed, lambda r: _record_id(Post, r), Post, 'pk')
+        if record['author'] in authors
+    ]
+    Post.objects.bulk_create(posts, ignore_conflicts=True)
+    return len(records) - len(posts)
+
+
+def _load_comments(records):
+    now = timezone.now()
+    signed = [r for r in records if r.get('author')]
+    authors = _lookup(User, 'username', (r['author'] for r in signed))
+    post_ids = set(Post.objects.filter(pk__in={
+        _record_id(Comment, record, 'post') for record in signed
+    }).values_list('pk', flat=True))
+    comments = []
+    for record in _new_records(
+            signed, lambda r: _record_id(Comment, r), Comment, 'pk'):
+        post_id = _record_id(Comment, record, 'post')
+        if post_id not in post_ids or record['author'] not in authors:
+            continue
+        comments.append(Comment(
+            id=_record_id(Comment, record),
+            post_id=post_id,
+            author_id=authors[record['author']],
+            text=record['text'],
+            created_at=_value(
+                Comment, 'created_at', record.get('created_at')) or now,
+        ))
+    Comment.objects.bulk_create(comments, ignore_conflicts=True)
+    return len(records) - len(comments)
+
+
+LOADERS = {
+    'category': _load_categories,
+    'location': _load_locations,
+    'user': _load_users,
+    'post': _load_posts,
+    'comment': _load_comments,
+}
+
+
+@contextmanager
+def keep_created_at():
+    """Отключает auto_now_add, чтобы сохранить даты создания из файла."""
+    fields = [
+        field
+        for model in (Category, Location, Post, Comment)
+        for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def reset_sequences():
+    """Сдвигает счётчики id после вставки постов и комментариев с id."""
+    statements = connection.ops.sequence_reset_sql(
+        no_style(), [Post, Comment])
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
+def import_rows(rows, batch_size=TRANSFER_BATCH_SIZE, progress=None):
+    """
+    Загружает записи пачками; возвращает {модель: [принято, пропущено]}.
+
+    Уже существующие записи не перезаписываются и считаются
+    пропущенными. Пропускаются также посты без известного автора
+    и комментарии к неизвестным постам или от неизвестных авторов.
+    """
+    stats = {}
+    with keep_created_at():
+        for name, group in groupby(rows, key=lambda item: item[0]):
+            if name not in LOADERS:
+                raise ValueError(f'Неизвестная модель в файле: {name!r}.')
+            records = (record for _, record in group)
+            counts = stats.setdefault(name, [0, 0])
+            while True:
+                batch = list(islice(records, batch_size))
+                if not batch:
+                    break
+                with transaction.atomic():
+                    skipped = LOADERS[name](batch)
+                counts[0] += len(batch) - skipped
+                counts[1] += skipped
+                if progress is not None:
+                    progress(name, counts[0])
+    reset_sequences()
+    return stats
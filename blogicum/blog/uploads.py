@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+
+
+class LimitedUploadHandler(TemporaryFileUploadHandler):
+    """
+    Пишет загружаемый файл во временный файл на диске по частям.
+
+    Части сверх POST_IMAGE_MAX_SIZE отбрасываются, поэтому ни память,
+    ни диск не растут вместе с размером запроса. Настоящий размер
+    файла всё равно попадает в UploadedFile.size, и PostImageField
+    отклоняет такой файл, не открывая его. Поэтому обработчик
+    подключается только в представлениях с этим полем
+    (LimitedUploadMixin), а не для всего сайта.
+    """
+
+    def receive_data_chunk(self, raw_data, start):
+        if start + len(raw_data) <= settings.POST_IMAGE_MAX_SIZE:
+            return super().receive_data_chunk(raw_data, start)
+        return None
@@ -8,6 +8,8 @@ urlpatterns = [
     path('', views.PostsListView.as_view(), name='index'),
     path('posts/<int:post_id>/',
          views.PostDetailView.as_view(), name='post_detail'),
+    path('posts/<int:post_id>/comments/',
+         views.CommentListView.as_view(), name='comments'),
     path('posts/<int:post_id>/comment/',
          views.CommentCreateView.as_view(), name='add_comment'),
     path('posts/<int:post_id>/edit_comment/<int:comment_id>/',
@@ -23,6 +25,7 @@ urlpatterns = [
          views.PostDeleteView.as_view(), name='delete_post'),
     path('profile/<str:username>/',
          views.UserDetailView.as_view(), name='profile'),
+    path('search/', views.SearchView.as_view(), name='search'),
     path('edit_profile/',
          views.UserUpdateView.as_view(), name='edit_profile'),
 ]
@@ -1,14 +1,36 @@
-from datetime import date
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 
-from django.db.models import Count
+from .models import Comment, Post
 
-from .models import Post
+RECOUNT_BATCH_SIZE = 500
 
 
 def get_post_list():
     """Возвращает список постов, отсортированных по дате."""
-    post_list = Post.objects.annotate(comment_count=Count('comments')).filter(
-        is_published=True,
-        pub_date__lte=date.today()
-    ).order_by('-pub_date')
+    post_list = Post.objects.published().with_related().order_by(
+        '-pub_date')
     return post_list
+
+
+def recount_comments(post_list=None, batch_size=RECOUNT_BATCH_SIZE):
+    """Исправляет расхождения счётчика комментариев, возвращает их число."""
+    if post_list is None:
+        post_list = Post.objects.all()
+    actual = Coalesce(Subquery(
+        Comment.objects.filter(post=OuterRef('pk')).order_by().values(
+            'post').annotate(total=Count('pk')).values('total')
+    ), 0)
+    stale_ids = list(post_list.annotate(actual=actual).exclude(
+        comment_count=F('actual')).values_list('pk', flat=True))
+    for start in range(0, len(stale_ids), batch_size):
+        Post.objects.filter(
+            pk__in=stale_ids[start:start + batch_size]
+        ).update(comment_count=actual, updated_at=timezone.now())
+    return len(stale_ids)
+
+
+def touch_posts(post_list):
+    """Отмечает посты изменёнными, не вызывая сигналов сохранения."""
+    post_list.update(updated_at=timezone.now())
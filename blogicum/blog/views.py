@@ -1,60 +1,126 @@
-from datetime import date
-
 from django.contrib.auth import get_user_model
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Count
-from django.http import Http404
 from django.shortcuts import get_object_or_404
+from django.utils.http import urlencode
 from django.views.generic import (
     CreateView, DeleteView, DetailView, ListView, UpdateView)
 from django.views.generic.edit import ModelFormMixin
 from django.views.generic.list import MultipleObjectMixin
-from django.utils import timezone
 
 from .forms import CommentForm, PostForm, UserUpdateForm
-from .mixins import (CommentMixin, CommentUpdateDeleteMixin,
+from .mixins import (AnonymousPageCacheMixin, CommentMixin,
+                     CommentUpdateDeleteMixin, ConditionalGetMixin,
+                     KeysetPaginationMixin, LimitedUploadMixin,
                      PostDeleteUpdateMixin, ProfileUrlByUsername,
-                     UnauthorizedUsers)
-from .models import Category, Post
+                     ReplicaReadMixin, UnauthorizedUsers)
+from .models import Category, Comment, Post
+from .page_cache import (POST_LIST_TAG, get_tag_versions, post_tag,
+                         tags_changed_at)
+from .paginators import KeysetPaginator
+from .search import search_posts
 from .utils import get_post_list
 
 
 UserModel = get_user_model()
 MAX_POSTS_ON_MAIN = 10
+COMMENTS_CHUNK_SIZE = 20
+
+
+def latest(*moments):
+    """Самое позднее из известных времён изменения."""
+    return max(filter(None, moments), default=None)
+
+
+def get_tagged_page_state(tags, data=None, modified=None):
+    """
+    Состояние страницы по версиям её тегов в кеше страниц.
 
+    Любое изменение, видимое на странице, сбрасывает один из её тегов,
+    поэтому для проверки актуальности не нужны выборки по постам.
+    """
+    versions = get_tag_versions(tags)
+    return latest(tags_changed_at(versions), modified), (versions, data)
 
-class PostsListView(ListView):
+
+def get_post_page_state(post_id):
+    """Состояние страницы опубликованного поста для условного GET."""
+    state = Post.objects.published().filter(pk=post_id).values(
+        'updated_at', 'pub_date').first()
+    if state is None:
+        return None
+    return get_tagged_page_state(
+        (post_tag(post_id),), state, latest(*state.values()))
+
+
+class PostsListView(ReplicaReadMixin, ConditionalGetMixin,
+                    AnonymousPageCacheMixin, KeysetPaginationMixin, ListView):
     template_name = 'blog/index.html'
     paginate_by = MAX_POSTS_ON_MAIN
+    page_cache_tags = (POST_LIST_TAG,)
+
+    def get_page_state(self):
+        return get_tagged_page_state(self.page_cache_tags)
 
     def get_queryset(self):
-        return get_post_list().filter(
-            category__is_published=True)
+        return get_post_list()
 
 
-class PostDetailView(DetailView):
+class PostDetailView(ReplicaReadMixin, ConditionalGetMixin,
+                     AnonymousPageCacheMixin, DetailView):
     model = Post
     template_name = 'blog/detail.html'
 
+    def get_page_state(self):
+        return get_post_page_state(self.kwargs['post_id'])
+
+    def get_page_cache_tags(self):
+        return (post_tag(self.kwargs['post_id']),)
+
     def get_object(self):
-        object = get_object_or_404(Post, pk=self.kwargs['post_id'])
-        if (object.author != self.request.user):
-            if (not object.is_published
-                    or not object.category.is_published
-                    or not object.pub_date < timezone.now()):
-                raise Http404
-        return object
+        return get_object_or_404(
+            Post.objects.visible_to(self.request.user).with_related(),
+            pk=self.kwargs['post_id'])
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = CommentForm()
-        context['comments'] = (
-            self.object.comments.select_related('author')
-        )
+        context['comments'] = KeysetPaginator(
+            self.object.comments.select_related('author'),
+            COMMENTS_CHUNK_SIZE, 'created_at', descending=False
+        ).page()
         return context
 
 
-class PostCreateView(ProfileUrlByUsername, LoginRequiredMixin, CreateView):
+class CommentListView(ReplicaReadMixin, ConditionalGetMixin,
+                      AnonymousPageCacheMixin, KeysetPaginationMixin,
+                      ListView):
+    """Очередная порция комментариев к посту в виде HTML-фрагмента."""
+
+    template_name = 'includes/comment_list.html'
+    paginate_by = COMMENTS_CHUNK_SIZE
+    keyset_field = 'created_at'
+    keyset_descending = False
+
+    def get_page_state(self):
+        return get_post_page_state(self.kwargs['post_id'])
+
+    def get_page_cache_tags(self):
+        return (post_tag(self.kwargs['post_id']),)
+
+    def get_queryset(self):
+        post = get_object_or_404(
+            Post.objects.visible_to(self.request.user).only('pk'),
+            pk=self.kwargs['post_id'])
+        return Comment.objects.filter(post=post).select_related('author')
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['comments'] = context['page_obj']
+        return context
+
+
+class PostCreateView(LimitedUploadMixin, ProfileUrlByUsername,
+                     LoginRequiredMixin, CreateView):
     model = Post
     form_class = PostForm
     template_name = 'blog/create.html'
@@ -65,9 +131,9 @@ class PostCreateView(ProfileUrlByUsername, LoginRequiredMixin, CreateView):
         return super().form_valid(form)
 
 
-class PostUpdateView(UnauthorizedUsers, LoginRequiredMixin,
-                     PostDeleteUpdateMixin, UpdateView):
-    fields = ('title', 'text', 'location', 'category', 'image', )
+class PostUpdateView(LimitedUploadMixin, UnauthorizedUsers,
+                     LoginRequiredMixin, PostDeleteUpdateMixin, UpdateView):
+    form_class = PostForm
 
 
 class PostDeleteView(ProfileUrlByUsername, UnauthorizedUsers,
@@ -76,10 +142,22 @@ class PostDeleteView(ProfileUrlByUsername, UnauthorizedUsers,
     form_class = PostForm
 
 
-class CategoryDetailView(DetailView, MultipleObjectMixin):
+class CategoryDetailView(ReplicaReadMixin, ConditionalGetMixin,
+                         AnonymousPageCacheMixin, DetailView,
+                         MultipleObjectMixin):
     model = Category
     template_name = 'blog/category.html'
     paginate_by = MAX_POSTS_ON_MAIN
+    page_cache_tags = (POST_LIST_TAG,)
+
+    def get_page_state(self):
+        category = Category.objects.filter(
+            slug=self.kwargs['category_slug'], is_published=True
+        ).values('pk', 'updated_at').first()
+        if category is None:
+            return None
+        return get_tagged_page_state(
+            self.page_cache_tags, category, category['updated_at'])
 
     def get_object(self, *args, **kwargs):
         return get_object_or_404(
@@ -93,27 +171,57 @@ class CategoryDetailView(DetailView, MultipleObjectMixin):
         return context
 
 
-class UserDetailView(DetailView, MultipleObjectMixin):
+class UserDetailView(ReplicaReadMixin, ConditionalGetMixin, DetailView,
+                     MultipleObjectMixin):
     model = UserModel
     template_name = 'blog/profile.html'
     paginate_by = MAX_POSTS_ON_MAIN
     context_object_name = 'profile'
 
+    def get_page_state(self):
+        profile = UserModel.objects.filter(
+            username=self.kwargs['username']
+        ).values('pk', 'first_name', 'last_name', 'is_staff').first()
+        if profile is None:
+            return None
+        return get_tagged_page_state((POST_LIST_TAG,), profile)
+
     def get_object(self):
         return get_object_or_404(UserModel, username=self.kwargs['username'])
 
     def get_context_data(self, **kwargs):
-        object_list = self.object.posts.annotate(
-            comment_count=Count('comments')).select_related('author').order_by(
-                '-pub_date')
-        if self.request.user != self.object:
-            object_list = object_list.filter(
-                is_published=True, pub_date__lte=date.today())
+        object_list = self.object.posts.visible_to(
+            self.request.user).with_related().order_by('-pub_date')
         context = super(UserDetailView, self).get_context_data(
             object_list=object_list, **kwargs)
         return context
 
 
+class SearchView(ReplicaReadMixin, ListView):
+    """Поиск по заголовкам, текстам постов и комментариям к ним."""
+
+    template_name = 'blog/search.html'
+    paginate_by = MAX_POSTS_ON_MAIN
+
+    def get_search_query(self):
+        return self.request.GET.get('q', '').strip()
+
+    def get_queryset(self):
+        query = self.get_search_query()
+        if not query:
+            return Post.objects.none()
+        return search_posts(
+            Post.objects.visible_to(self.request.user).with_related(), query)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        query = self.get_search_query()
+        context['query'] = query
+        if query:
+            context['pagination_query'] = urlencode({'q': query}) + '&'
+        return context
+
+
 class UserUpdateView(ProfileUrlByUsername, LoginRequiredMixin, UpdateView):
     model = UserModel
     template_name = 'blog/user.html'
@@ -0,0 +1,21 @@
+"""
+Корневые маршруты для ASGI.
+
+Совпадают с blogicum.urls, но страницы блога и статические страницы
+обслуживают async-представления. Подключаются настройкой ASYNC_VIEWS.
+"""
+from django.urls import include, path
+
+from . import urls
+
+ASYNC_INCLUDES = {
+    'pages': path('pages/', include('pages.async_urls', namespace='pages')),
+    'blog': path('', include('blog.async_urls', namespace='blog')),
+}
+
+urlpatterns = [
+    ASYNC_INCLUDES.get(getattr(pattern, 'namespace', None), pattern)
+    for pattern in urls.urlpatterns
+]
+handler404 = urls.handler404
+handler500 = urls.handler500
@@ -0,0 +1,19 @@
+"""
+Выбор профиля настроек по переменной окружения BLOGICUM_ENV.
+
+dev (по умолчанию) — локальная разработка и тесты,
+prod — боевой запуск, см. prod.py.
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+BLOGICUM_ENV = os.environ.get('BLOGICUM_ENV', 'dev')
+
+if BLOGICUM_ENV == 'dev':
+    from .dev import *  # noqa: F401,F403
+elif BLOGICUM_ENV == 'prod':
+    from .prod import *  # noqa: F401,F403
+else:
+    raise ImproperlyConfigured(
+        f'Неизвестный профиль настроек BLOGICUM_ENV={BLOGICUM_ENV!r}.')
@@ -2,6 +2,7 @@
 Django settings for blogicum project.
 
 Generated by 'django-admin startproject' using Django 3.2.16.
+Общие настройки; профили dev и prod дополняют их.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/3.2/topics/settings/
@@ -10,10 +11,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
-BASE_DIR = Path(__file__).resolve().parent.parent
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
 LOGIN_REDIRECT_URL = 'blog:index'
 
@@ -26,19 +28,16 @@ EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 
 CSRF_FAILURE_VIEW = 'pages.views.csrf_failure'
-# Quick-start development settings - unsuitable for production
-# See https://docs.djangoproject.com/en/3.2/howto/deployment/checklist/
 
-# SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = 'django-insecure-z7)e)$8s^=d#u6h9c(2k685g2t5nhit^ft-fk_cn5dmf#x_7md'
+PAGE_CACHE_TIMEOUT = 60 * 15
 
-# SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+# Хранилище поискового индекса: 'fts5', 'terms' или 'auto' — FTS5,
+# если таблица для него создана миграцией, иначе обратный индекс.
+SEARCH_BACKEND = 'auto'
 
-ALLOWED_HOSTS = [
-    'localhost',
-    '127.0.0.1',
-]
+POST_IMAGE_MAX_SIZE = 10 * 1024 * 1024
+
+POST_IMAGE_MAX_PIXELS = 40_000_000
 
 
 # Application definition
@@ -62,11 +61,16 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'blog.middleware.ReplicaPinMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware'
 ]
 
-ROOT_URLCONF = 'blogicum.urls'
+# Под ASGI (blogicum/asgi.py) страницы для чтения обслуживают
+# async-представления из blog/async_views.py.
+ASYNC_VIEWS = os.environ.get('BLOGICUM_ASYNC_VIEWS') == '1'
+
+ROOT_URLCONF = 'blogicum.async_urls' if ASYNC_VIEWS else 'blogicum.urls'
 
 TEMPLATES_DIR = BASE_DIR / 'templates'
 
@@ -99,6 +103,32 @@ DATABASES = {
     }
 }
 
+DATABASE_ROUTERS = ['blog.routers.ReplicaRouter']
+
+# Псевдонимы баз из DATABASES, из которых читают страницы со списками
+# и постами; пустой список — всё читается из основной базы.
+DATABASE_REPLICAS = []
+
+# Сколько секунд после записи пользователь читает из основной базы.
+REPLICA_PIN_SECONDS = 5
+
+# Сколько секунд после любой записи реплики могут отставать. В это время
+# страницы читаются из основной базы, чтобы в общий кеш не попали
+# устаревшие данные, только что сброшенные сигналами.
+REPLICA_LAG_SECONDS = 5
+
+# Прагмы, которые выполняются для каждого нового соединения с SQLite.
+# WAL позволяет читать ленту во время записи комментариев, busy_timeout
+# (мс) — ждать освобождения базы вместо ошибки «database is locked».
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'busy_timeout': 5000,
+    'mmap_size': 128 * 1024 * 1024,
+    'cache_size': -20_000,
+    'temp_store': 'memory',
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -138,9 +168,14 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 
+STATIC_ROOT = BASE_DIR / 'static_root'
+
 STATICFILES_DIRS = [
     BASE_DIR / 'static'
 ]
+
+STATICFILES_STORAGE = 'blog.storage.ManifestStaticStorage'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
 
@@ -0,0 +1,36 @@
+"""Настройки для локальной разработки и тестов."""
+from .base import *  # noqa: F401,F403
+from .base import BASE_DIR, DATABASES
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = 'django-insecure-z7)e)$8s^=d#u6h9c(2k685g2t5nhit^ft-fk_cn5dmf#x_7md'
+
+# SECURITY WARNING: don't run with debug turned on in production!
+DEBUG = True
+
+ALLOWED_HOSTS = [
+    'localhost',
+    '127.0.0.1',
+]
+
+# Локальная «реплика» — та же база SQLite через отдельное соединение;
+# в тестах это отдельный файл, что позволяет проверить маршрутизацию.
+# Чтение из неё включается через DATABASE_REPLICAS = ['replica'].
+# Соединения живут между запросами, как в prod.py: иначе потоки пула
+# async-страниц открывали бы соединение и заново выполняли PRAGMA
+# на каждую выборку.
+DATABASES = {
+    'default': {**DATABASES['default'], 'CONN_MAX_AGE': 60},
+    'replica': {
+        **DATABASES['default'],
+        'CONN_MAX_AGE': 60,
+        'TEST': {'NAME': BASE_DIR / 'test_replica.sqlite3'},
+    },
+    # Тестовые базы SQLite создаются в памяти, где нет WAL. Тесты WAL
+    # и одновременных соединений работают с этой базой в файле.
+    'sqlite_file': {
+        **DATABASES['default'],
+        'CONN_MAX_AGE': 60,
+        'TEST': {'NAME': BASE_DIR / 'test_sqlite_file.sqlite3'},
+    },
+}
@@ -0,0 +1,142 @@
+"""
+Настройки боевого запуска.
+
+Все значения, зависящие от окружения, задаются переменными
+BLOGICUM_*; без BLOGICUM_SECRET_KEY и BLOGICUM_ALLOWED_HOSTS
+проект не запустится.
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .base import *  # noqa: F401,F403
+from .base import BASE_DIR, SQLITE_PRAGMAS, TEMPLATES
+
+
+def env(name, default=None):
+    value = os.environ.get(f'BLOGICUM_{name}', default)
+    if value is None:
+        raise ImproperlyConfigured(
+            f'Задайте переменную окружения BLOGICUM_{name}.')
+    return value
+
+
+def env_flag(name, default):
+    return env(name, str(default)).lower() in ('1', 'true', 'yes')
+
+
+DEBUG = False
+
+SECRET_KEY = env('SECRET_KEY')
+
+ALLOWED_HOSTS = env('ALLOWED_HOSTS').split(',')
+
+
+# Database
+
+# Соединение с базой переиспользуется между запросами этого процесса.
+CONN_MAX_AGE = int(env('CONN_MAX_AGE', 600))
+
+if env('DB_ENGINE', 'sqlite') == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': env('DB_NAME', 'blogicum'),
+            'USER': env('DB_USER', 'blogicum'),
+            'PASSWORD': env('DB_PASSWORD', ''),
+            'HOST': env('DB_HOST', 'localhost'),
+            'PORT': env('DB_PORT', '5432'),
+            'CONN_MAX_AGE': CONN_MAX_AGE,
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': env('DB_NAME', str(BASE_DIR / 'db.sqlite3')),
+            'CONN_MAX_AGE': CONN_MAX_AGE,
+        }
+    }
+    SQLITE_PRAGMAS = {
+        **SQLITE_PRAGMAS,
+        'busy_timeout': int(env('SQLITE_BUSY_TIMEOUT', 20_000)),
+    }
+
+# Реплики только для чтения через запятую: хосты PostgreSQL
+# или пути к копиям базы SQLite.
+REPLICA_LOCATION = (
+    'HOST' if DATABASES['default']['ENGINE'].endswith('postgresql')
+    else 'NAME')
+DATABASE_REPLICAS = []
+for number, location in enumerate(
+        filter(None, env('DB_REPLICAS', '').split(',')), start=1):
+    DATABASES[f'replica_{number}'] = {
+        **DATABASES['default'], REPLICA_LOCATION: location}
+    DATABASE_REPLICAS.append(f'replica_{number}')
+
+
+# Cache
+
+# Кеш страниц и его версии должны быть общими для всех процессов
+# сервера, поэтому по умолчанию кеш хранится в файлах, а не в памяти.
+CACHE_BACKENDS = {
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'memcached': 'django.core.cache.backends.memcached.PyMemcacheCache',
+}
+CACHE_LOCATIONS = {
+    'file': str(BASE_DIR / 'cache'),
+    'locmem': 'blogicum',
+    'memcached': '127.0.0.1:11211',
+}
+CACHE_BACKEND = env('CACHE_BACKEND', 'file')
+if CACHE_BACKEND not in CACHE_BACKENDS:
+    raise ImproperlyConfigured(
+        f'BLOGICUM_CACHE_BACKEND должен быть одним из {list(CACHE_BACKENDS)}.')
+
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKENDS[CACHE_BACKEND],
+        'LOCATION': env('CACHE_LOCATION', CACHE_LOCATIONS[CACHE_BACKEND]),
+    }
+}
+if CACHE_BACKEND == 'memcached':
+    # Серверы host:port через запятую; OPTIONS memcached передаются
+    # клиенту pymemcache как есть, MAX_ENTRIES он не принимает.
+    CACHES['default']['LOCATION'] = (
+        CACHES['default']['LOCATION'].split(','))
+else:
+    CACHES['default']['OPTIONS'] = {
+        'MAX_ENTRIES': int(env('CACHE_MAX_ENTRIES', 10_000))}
+
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+
+# Templates
+
+# Шаблоны компилируются один раз на процесс.
+TEMPLATES[0]['APP_DIRS'] = False
+TEMPLATES[0]['OPTIONS']['loaders'] = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
+
+
+# Security
+
+SECURE_SSL_REDIRECT = env_flag('SSL_REDIRECT', True)
+
+if env_flag('BEHIND_PROXY', False):
+    SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
+
+SECURE_HSTS_SECONDS = int(env('HSTS_SECONDS', 60 * 60 * 24 * 365))
+
+SECURE_HSTS_INCLUDE_SUBDOMAINS = True
+
+SECURE_HSTS_PRELOAD = True
+
+SESSION_COOKIE_SECURE = True
+
+CSRF_COOKIE_SECURE = True
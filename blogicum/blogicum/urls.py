@@ -5,6 +5,7 @@ from django.urls import include, path, reverse_lazy
 from django.views.generic.edit import CreateView
 
 from blog.forms import CustomUserCreationForm
+from blog.storage import serve_immutable
 
 urlpatterns = [
     path('pages/', include('pages.urls', namespace='pages')),
@@ -20,6 +21,8 @@ urlpatterns = [
         name='registration',
     ),
     path('auth/', include('django.contrib.auth.urls')),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+] + static(
+    settings.MEDIA_URL, view=serve_immutable, document_root=settings.MEDIA_ROOT
+)
 handler404 = 'pages.views.page_not_found'
 handler500 = 'pages.views.server_error'
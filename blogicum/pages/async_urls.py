@@ -0,0 +1,12 @@
+from django.urls import path
+
+from .views import AsyncTemplateView
+
+app_name = 'pages'
+
+urlpatterns = [
+    path('about/', AsyncTemplateView.as_view(template_name='pages/about.html'),
+         name='about'),
+    path('rules/', AsyncTemplateView.as_view(template_name='pages/rules.html'),
+         name='rules')
+]
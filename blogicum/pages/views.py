@@ -1,4 +1,7 @@
 from django.shortcuts import render
+from django.views.generic import TemplateView
+
+from blog.mixins import AsyncViewMixin
 
 
 def page_not_found(request, exception):
@@ -11,3 +14,11 @@ def server_error(request):
 
 def csrf_failure(request, reason=''):
     return render(request, 'pages/403csrf.html', status=403)
+
+
+class AsyncTemplateView(AsyncViewMixin, TemplateView):
+    """Статическая страница для ASGI без перехода в синхронный режим."""
+
+    async def get(self, request, *args, **kwargs):
+        # Шаблон отрисовывает в потоке сам обработчик ASGI.
+        return super().get(request, *args, **kwargs)
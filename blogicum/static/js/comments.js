@@ -0,0 +1,11 @@
+// Ссылка «Загрузить ещё» заменяется следующей пачкой комментариев.
+document.addEventListener("click", function (event) {
+  const link = event.target.closest("a[data-load-comments]");
+  if (!link) {
+    return;
+  }
+  event.preventDefault();
+  fetch(link.href)
+    .then(function (response) { return response.text(); })
+    .then(function (html) { link.outerHTML = html; });
+});
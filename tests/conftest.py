@@ -19,6 +19,7 @@ from typing import (
 import pytest
 from django.apps import apps
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.db.models import Model, Field
 from django.forms import BaseForm
 from django.http import HttpResponse
@@ -37,10 +38,22 @@ TitledUrlRepr = TypeVar("TitledUrlRepr", bound=Tuple[UrlRepr, str])
 
 @pytest.fixture(autouse=True)
 def enable_debug_false():
-    with override_settings(DEBUG=False):
+    # Без DEBUG статике с хешами нужен манифест, а collectstatic в тестах
+    # не запускается.
+    with override_settings(
+        DEBUG=False,
+        STATICFILES_STORAGE=(
+            "django.contrib.staticfiles.storage.StaticFilesStorage"),
+    ):
         yield
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    yield
+    cache.clear()
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -96,6 +109,26 @@ pytest_plugins = [
 ]
 
 
+# Тестовые базы SQLite — в памяти, где нет WAL, а соединение с базой
+# Django делит между потоками. Тесты одновременных соединений направляют
+# все запросы в базу SQLITE_FILE в файле.
+SQLITE_FILE = "sqlite_file"
+
+
+class SqliteFileRouter:
+    """Направляет все запросы в базу SQLITE_FILE."""
+
+    def db_for_read(self, model, **hints):
+        return SQLITE_FILE
+
+    db_for_write = db_for_read
+
+
+@pytest.fixture
+def sqlite_file(settings):
+    settings.DATABASE_ROUTERS = [f"{__name__}.SqliteFileRouter"]
+
+
 @pytest.fixture
 def mixer():
     return _mixer
@@ -363,6 +396,7 @@ def cleanup(request):
                     filename.endswith(".jpg")
                     or filename.endswith(".gif")
                     or filename.endswith(".png")
+                    or filename.endswith(".webp")
             ):
                 file_path = os.path.join(root, filename)
                 if os.path.getmtime(file_path) >= start_time:
@@ -0,0 +1,230 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.test.client import AsyncClient, Client
+from django.utils import timezone
+
+from blog.async_urls import ASYNC_VIEWS
+from blog.async_views import in_thread
+from blog.mixins import AsyncViewMixin
+from blog.models import Post
+from conftest import SQLITE_FILE
+from test_budgets import BENCHMARK_SCALE, _seed
+
+# Параллельные выборки идут в потоках со своими соединениями, поэтому
+# данные теста должны быть зафиксированы в базе.
+pytestmark = pytest.mark.django_db(transaction=True)
+
+LOAD_CONCURRENCY = int(os.environ.get("BLOGICUM_LOAD_CONCURRENCY", 50))
+LOAD_REQUESTS = int(os.environ.get("BLOGICUM_LOAD_REQUESTS", 500))
+
+
+@pytest.fixture
+def async_urls(settings):
+    settings.ROOT_URLCONF = "blogicum.async_urls"
+
+
+@pytest.fixture
+def post(post_with_published_location):
+    Post.objects.filter(pk=post_with_published_location.pk).update(
+        pub_date=timezone.now() - timedelta(days=1))
+    post_with_published_location.refresh_from_db()
+    return post_with_published_location
+
+
+def _page_urls(post):
+    return (
+        "/",
+        f"/posts/{post.id}/",
+        f"/category/{post.category.slug}/",
+        f"/profile/{post.author.username}/",
+        "/pages/about/",
+        "/pages/rules/",
+    )
+
+
+def _async_get(url, client=None, **extra):
+    return async_to_sync((client or AsyncClient()).get)(url, **extra)
+
+
+def _async_view_functions():
+    from blogicum.async_urls import urlpatterns
+
+    def walk(patterns):
+        for pattern in patterns:
+            if hasattr(pattern, "url_patterns"):
+                yield from walk(pattern.url_patterns)
+            elif isinstance(getattr(pattern.callback, "view_class", None),
+                            type) and issubclass(
+                    pattern.callback.view_class, AsyncViewMixin):
+                yield pattern.callback
+
+    return list(walk(urlpatterns))
+
+
+def test_read_views_are_coroutines():
+    views = _async_view_functions()
+    assert {view.view_class for view in views} >= set(ASYNC_VIEWS.values())
+    for view in views:
+        assert asyncio.iscoroutinefunction(view), view
+
+
+@pytest.mark.parametrize("handler", ("wsgi", "asgi"))
+def test_async_views_other_methods(async_urls, post, handler):
+    for url in _page_urls(post):
+        if handler == "asgi":
+            client = AsyncClient()
+            not_allowed = async_to_sync(client.post)(url)
+            options = async_to_sync(client.options)(url)
+        else:
+            client = Client()
+            not_allowed = client.post(url)
+            options = client.options(url)
+        assert not_allowed.status_code == HTTPStatus.METHOD_NOT_ALLOWED, url
+        assert options.status_code == HTTPStatus.OK, url
+        assert "GET" in options["Allow"], url
+
+
+def _select_one(using="default"):
+    with connections[using].cursor() as cursor:
+        cursor.execute("SELECT 1")
+        return cursor.fetchone()
+
+
+def test_worker_connections_are_reused():
+    # Соединение открывается одно на поток пула, а не на каждый вызов.
+    created, threads = [], set()
+
+    def remember(sender, connection, **kwargs):
+        created.append(connection)
+
+    def select_in_worker():
+        threads.add(threading.get_ident())
+        return _select_one()
+
+    async def select_several_times():
+        return [await in_thread(select_in_worker) for _ in range(10)]
+
+    connection_created.connect(remember)
+    try:
+        assert async_to_sync(select_several_times)() == [(1,)] * 10
+    finally:
+        connection_created.disconnect(remember)
+    assert len(created) == len(threads) < 10
+
+
+@pytest.mark.django_db(
+    transaction=True, databases=["default", SQLITE_FILE])
+def test_worker_connections_are_closed(monkeypatch):
+    # При CONN_MAX_AGE = 0 соединение потока пула закрывается сразу.
+    # Соединения с базой в памяти Django не закрывает, поэтому проверка
+    # идёт на базе в файле.
+    monkeypatch.setitem(connections.settings[SQLITE_FILE], "CONN_MAX_AGE", 0)
+    opened = []
+
+    def remember():
+        opened.append(connections[SQLITE_FILE])
+        return _select_one(SQLITE_FILE)
+
+    assert async_to_sync(in_thread)(remember) == (1,)
+    assert opened[0].connection is None
+
+
+def test_async_pages_match_sync(settings, post):
+    sync_pages = {}
+    for url in _page_urls(post):
+        response = Client().get(url)
+        assert response.status_code == HTTPStatus.OK, url
+        sync_pages[url] = response.content
+    settings.ROOT_URLCONF = "blogicum.async_urls"
+    for url in _page_urls(post):
+        cache.clear()
+        response = _async_get(url)
+        assert response.status_code == HTTPStatus.OK, url
+        assert response.content == sync_pages[url], url
+
+
+def test_async_not_modified(async_urls, post):
+    for url in _page_urls(post)[:4]:
+        response = _async_get(url)
+        assert response.has_header("ETag"), url
+        # AsyncClient в Django 3.2 передаёт extra как заголовки ASGI.
+        revalidated = _async_get(
+            url, **{"if-none-match": response["ETag"]})
+        assert revalidated.status_code == HTTPStatus.NOT_MODIFIED, url
+
+
+def test_async_visibility(async_urls, post, user):
+    Post.objects.filter(pk=post.pk).update(is_published=False)
+    url = f"/posts/{post.id}/"
+    assert _async_get(url).status_code == HTTPStatus.NOT_FOUND
+    client = AsyncClient()
+    client.force_login(post.author)
+    response = _async_get(url, client)
+    assert response.status_code == HTTPStatus.OK
+    assert "Пост снят с публикации" in response.content.decode()
+    assert _async_get(
+        f"/category/{post.category.slug}/?page=5"
+    ).status_code == HTTPStatus.NOT_FOUND
+
+
+def _load_urls():
+    post = Post.objects.published().order_by("-comment_count").first()
+    return [
+        url for url in _page_urls(post) for _ in range(LOAD_REQUESTS // 6)]
+
+
+def _wsgi_throughput(urls):
+    def fetch(url):
+        return Client().get(url).status_code
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(LOAD_CONCURRENCY) as pool:
+        statuses = list(pool.map(fetch, urls))
+    return len(urls) / (time.perf_counter() - start), statuses
+
+
+async def _asgi_throughput(urls):
+    limit = asyncio.Semaphore(LOAD_CONCURRENCY)
+
+    async def fetch(url):
+        async with limit:
+            return (await AsyncClient().get(url)).status_code
+
+    start = time.perf_counter()
+    statuses = await asyncio.gather(*map(fetch, urls))
+    return len(urls) / (time.perf_counter() - start), statuses
+
+
+@pytest.mark.skipif(
+    not BENCHMARK_SCALE,
+    reason="Задайте BLOGICUM_BENCHMARK_SCALE, чтобы запустить замеры.",
+)
+def test_wsgi_vs_asgi_throughput(settings, record_property):
+    _seed(BENCHMARK_SCALE)
+    urls = _load_urls()
+    # Страницы отдаются без кеша, чтобы сравнивать работу с базой.
+    settings.PAGE_CACHE_TIMEOUT = 0
+
+    cache.clear()
+    wsgi_rps, statuses = _wsgi_throughput(urls)
+    assert set(statuses) == {HTTPStatus.OK}
+
+    settings.ROOT_URLCONF = "blogicum.async_urls"
+    cache.clear()
+    asgi_rps, statuses = async_to_sync(_asgi_throughput)(urls)
+    assert set(statuses) == {HTTPStatus.OK}
+
+    record_property("concurrency", LOAD_CONCURRENCY)
+    record_property("wsgi_rps", round(wsgi_rps, 1))
+    record_property("asgi_rps", round(asgi_rps, 1))
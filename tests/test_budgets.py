@@ -0,0 +1,163 @@
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, NamedTuple
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Post
+from blog.seeding import seed_blog
+
+# 0 — набор пропускается; 1 — 1 000 пользователей, 50 000 постов
+# и 500 000 комментариев; 0.01 — тот же набор в сто раз меньше.
+BENCHMARK_SCALE = float(os.environ.get("BLOGICUM_BENCHMARK_SCALE", 0))
+BENCHMARK_REPORT = Path(os.environ.get(
+    "BLOGICUM_BENCHMARK_REPORT",
+    Path(__file__).resolve().parent.parent / "bench_report.json",
+))
+N_USERS = 1_000
+N_POSTS = 50_000
+N_COMMENTS = 500_000
+N_CATEGORIES = 20
+N_LOCATIONS = 50
+BATCH_SIZE = 5_000
+N_RUNS = 3
+
+
+class Budget(NamedTuple):
+    queries: int
+    sql_ms: float
+    wall_ms: float
+
+
+BUDGETS: Dict[str, Budget] = {
+    "blog:index": Budget(queries=3, sql_ms=100, wall_ms=500),
+    "blog:post_detail": Budget(queries=4, sql_ms=100, wall_ms=500),
+    "blog:comments": Budget(queries=4, sql_ms=50, wall_ms=300),
+    # Сессия, пользователь, пост, INSERT комментария, счётчик комментариев,
+    # строка поискового индекса и сохранение сессии (три запроса).
+    "blog:add_comment": Budget(queries=8, sql_ms=50, wall_ms=300),
+    "blog:edit_comment": Budget(queries=5, sql_ms=50, wall_ms=300),
+    "blog:delete_comment": Budget(queries=5, sql_ms=50, wall_ms=300),
+    "blog:category_posts": Budget(queries=6, sql_ms=150, wall_ms=500),
+    "blog:create_post": Budget(queries=5, sql_ms=50, wall_ms=300),
+    "blog:edit_post": Budget(queries=8, sql_ms=50, wall_ms=300),
+    "blog:delete_post": Budget(queries=7, sql_ms=50, wall_ms=300),
+    "blog:profile": Budget(queries=5, sql_ms=100, wall_ms=500),
+    "blog:edit_profile": Budget(queries=3, sql_ms=50, wall_ms=300),
+    "blog:search": Budget(queries=3, sql_ms=100, wall_ms=500),
+    "pages:about": Budget(queries=1, sql_ms=20, wall_ms=200),
+    "pages:rules": Budget(queries=1, sql_ms=20, wall_ms=200),
+}
+
+
+def _route_names():
+    from blog.urls import app_name as blog_app, urlpatterns as blog_urls
+    from pages.urls import app_name as pages_app, urlpatterns as pages_urls
+
+    return {
+        f"{app}:{pattern.name}"
+        for app, patterns in ((blog_app, blog_urls), (pages_app, pages_urls))
+        for pattern in patterns
+    }
+
+
+def test_every_route_has_budget():
+    missing = _route_names() - set(BUDGETS)
+    assert not missing, (
+        f"Для маршрутов {sorted(missing)} не задан бюджет в `BUDGETS`."
+    )
+
+
+def _seed(scale: float):
+    seed_blog(
+        prefix="bench",
+        users=max(1, int(N_USERS * scale)),
+        posts=max(1, int(N_POSTS * scale)),
+        comments=int(N_COMMENTS * scale),
+        categories=N_CATEGORIES,
+        locations=N_LOCATIONS,
+        chunk_size=BATCH_SIZE,
+    )
+
+
+def _route_urls():
+    post = Post.objects.published().order_by("-comment_count").first()
+    comment = post.comments.first()
+    return {
+        "blog:index": (None, "/"),
+        "blog:post_detail": (None, f"/posts/{post.id}/"),
+        "blog:comments": (None, f"/posts/{post.id}/comments/"),
+        "blog:add_comment": (
+            post.author, f"/posts/{post.id}/comment/", {"text": "Ещё"}),
+        "blog:edit_comment": (
+            comment.author,
+            f"/posts/{post.id}/edit_comment/{comment.id}/"),
+        "blog:delete_comment": (
+            comment.author,
+            f"/posts/{post.id}/delete_comment/{comment.id}/"),
+        "blog:category_posts": (None, f"/category/{post.category.slug}/"),
+        "blog:create_post": (post.author, "/posts/create/"),
+        "blog:edit_post": (post.author, f"/posts/{post.id}/edit/"),
+        "blog:delete_post": (post.author, f"/posts/{post.id}/delete/"),
+        "blog:profile": (None, f"/profile/{post.author.username}/"),
+        "blog:edit_profile": (post.author, "/edit_profile/"),
+        "blog:search": (None, "/search/?q=публикация"),
+        "pages:about": (None, "/pages/about/"),
+        "pages:rules": (None, "/pages/rules/"),
+    }
+
+
+def _measure(client: Client, url: str, data=None):
+    runs = []
+    for _ in range(N_RUNS):
+        cache.clear()
+        with CaptureQueriesContext(connection) as ctx:
+            start = time.perf_counter()
+            if data is None:
+                response = client.get(url)
+            else:
+                response = client.post(url, data=data)
+            wall = time.perf_counter() - start
+        assert response.status_code in (200, 302), (
+            f"`{url}` вернул {response}")
+        runs.append({
+            "queries": len(ctx.captured_queries),
+            "sql_ms": 1000 * sum(
+                float(query["time"]) for query in ctx.captured_queries),
+            "wall_ms": 1000 * wall,
+        })
+    return {key: min(run[key] for run in runs) for key in runs[0]}
+
+
+@pytest.mark.skipif(
+    not BENCHMARK_SCALE,
+    reason="Задайте BLOGICUM_BENCHMARK_SCALE, чтобы запустить замеры.",
+)
+@pytest.mark.django_db(transaction=True)
+def test_route_budgets():
+    _seed(BENCHMARK_SCALE)
+    report = {}
+    for name, (user, url, *data) in _route_urls().items():
+        client = Client()
+        if user is not None:
+            client.force_login(user)
+        report[name] = {"url": url, **_measure(client, url, *data)}
+
+    BENCHMARK_REPORT.write_text(json.dumps(
+        {"scale": BENCHMARK_SCALE, "routes": report},
+        indent=2, ensure_ascii=False, sort_keys=True,
+    ))
+
+    exceeded = [
+        f"{name}: {key} = {report[name][key]:.1f} > {limit}"
+        for name, budget in BUDGETS.items()
+        for key, limit in budget._asdict().items()
+        if report[name][key] > limit
+    ]
+    assert not exceeded, "Превышены бюджеты:\n" + "\n".join(exceeded)
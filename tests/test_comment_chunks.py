@@ -0,0 +1,47 @@
+from http import HTTPStatus
+
+import pytest
+from mixer.backend.django import Mixer
+
+from blog.views import COMMENTS_CHUNK_SIZE
+
+
+@pytest.fixture
+def many_comments(mixer: Mixer, post_with_published_location):
+    return mixer.cycle(COMMENTS_CHUNK_SIZE * 2 + 5).blend(
+        "blog.Comment", post=post_with_published_location)
+
+
+@pytest.mark.django_db
+def test_comments_are_loaded_in_chunks(
+        user_client, post_with_published_location, many_comments):
+    post = post_with_published_location
+    response = user_client.get(f"/posts/{post.id}/")
+    content = response.content.decode()
+    assert "js/comments.js" in content
+    assert "<script>" not in content
+    chunk = response.context["comments"]
+    loaded = [comment.pk for comment in chunk]
+    assert len(loaded) == COMMENTS_CHUNK_SIZE
+
+    while chunk.has_next():
+        response = user_client.get(
+            f"/posts/{post.id}/comments/?after={chunk.next_cursor}")
+        assert response.status_code == HTTPStatus.OK
+        assert "<html" not in response.content.decode()
+        chunk = response.context["comments"]
+        loaded.extend(comment.pk for comment in chunk)
+
+    expected = [
+        comment.pk for comment in
+        sorted(many_comments, key=lambda c: (c.created_at, c.pk))
+    ]
+    assert loaded == expected
+
+
+@pytest.mark.django_db
+def test_comment_chunks_follow_post_visibility(
+        client, user_client, posts_with_unpublished_category):
+    url = f"/posts/{posts_with_unpublished_category[0].id}/comments/"
+    assert client.get(url).status_code == HTTPStatus.NOT_FOUND
+    assert user_client.get(url).status_code == HTTPStatus.OK
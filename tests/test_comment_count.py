@@ -0,0 +1,91 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.models.signals import post_delete
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+
+from blog.models import Comment, Post
+
+
+@pytest.mark.django_db
+def test_comment_count_follows_comment_create_and_delete(
+        user_client, post_with_published_location):
+    post = post_with_published_location
+    user_client.post(f"/posts/{post.id}/comment/", data={"text": "Первый"})
+    user_client.post(f"/posts/{post.id}/comment/", data={"text": "Второй"})
+    post.refresh_from_db()
+    assert post.comment_count == 2
+
+    comment = post.comments.first()
+    user_client.post(f"/posts/{post.id}/delete_comment/{comment.id}/")
+    post.refresh_from_db()
+    assert post.comment_count == 1
+
+
+@pytest.mark.django_db
+def test_recount_comments_command_repairs_counts(
+        mixer: Mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(3).blend("blog.Comment", post=post)
+    Post.objects.filter(pk=post.pk).update(comment_count=42)
+
+    out = StringIO()
+    call_command("recount_comments", stdout=out)
+    post.refresh_from_db()
+    assert post.comment_count == 3
+    assert out.getvalue() == "Исправлено счётчиков комментариев: 1\n"
+
+    out = StringIO()
+    call_command("recount_comments", stdout=out)
+    assert out.getvalue() == "Исправлено счётчиков комментариев: 0\n"
+
+
+@pytest.mark.django_db
+def test_post_delete_does_not_update_count_per_comment(
+        mixer: Mixer, user, post_with_published_location):
+    post = post_with_published_location
+    other_post = mixer.blend("blog.Post", author=user)
+    mixer.cycle(3).blend("blog.Comment", post=post)
+    mixer.blend("blog.Comment", post=other_post, author=post.author)
+    with CaptureQueriesContext(connection) as ctx:
+        post.delete()
+    assert not [
+        query for query in ctx.captured_queries
+        if query["sql"].startswith('UPDATE "blog_post"')
+    ]
+    # Комментарии других постов по-прежнему уменьшают счётчик.
+    other_post.refresh_from_db()
+    assert other_post.comment_count == 1
+    other_post.comments.get().delete()
+    other_post.refresh_from_db()
+    assert other_post.comment_count == 0
+
+
+class DeleteFailed(Exception):
+    pass
+
+
+def _fail_delete(sender, instance, **kwargs):
+    raise DeleteFailed
+
+
+@pytest.mark.django_db
+def test_failed_post_delete_keeps_comment_counter(
+        mixer: Mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(2).blend("blog.Comment", post=post)
+    # Удаление обрывается на каскаде, до post_delete самого поста.
+    post_delete.connect(_fail_delete, sender=Comment)
+    try:
+        with pytest.raises(DeleteFailed), transaction.atomic():
+            post.delete()
+    finally:
+        post_delete.disconnect(_fail_delete, sender=Comment)
+    post.refresh_from_db()
+    assert post.comment_count == 2
+    post.comments.first().delete()
+    post.refresh_from_db()
+    assert post.comment_count == 1
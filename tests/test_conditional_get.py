@@ -0,0 +1,123 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog.models import Post
+
+
+@pytest.fixture
+def post(post_with_published_location):
+    Post.objects.filter(pk=post_with_published_location.pk).update(
+        pub_date=timezone.now() - timedelta(days=1))
+    post_with_published_location.refresh_from_db()
+    return post_with_published_location
+
+
+def _revalidate(client, url, response):
+    return client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+
+
+@pytest.mark.django_db
+def test_unchanged_pages_answer_not_modified(client, post):
+    urls = (
+        "/",
+        f"/posts/{post.id}/",
+        f"/posts/{post.id}/comments/",
+        f"/category/{post.category.slug}/",
+        f"/profile/{post.author.username}/",
+    )
+    for url in urls:
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.has_header("Last-Modified")
+        with CaptureQueriesContext(connection) as ctx:
+            revalidated = _revalidate(client, url, response)
+        assert revalidated.status_code == HTTPStatus.NOT_MODIFIED, url
+        assert revalidated["ETag"] == response["ETag"]
+        assert len(ctx.captured_queries) <= 3, url
+
+
+@pytest.mark.django_db
+def test_if_modified_since(client, post):
+    response = client.get("/")
+    assert client.get(
+        "/", HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+    ).status_code == HTTPStatus.NOT_MODIFIED
+
+
+@pytest.mark.django_db
+def test_comment_changes_post_page(client, user_client, post):
+    url = f"/posts/{post.id}/"
+    response = client.get(url)
+    user_client.post(f"/posts/{post.id}/comment/", data={"text": "Новый"})
+    assert _revalidate(client, url, response).status_code == HTTPStatus.OK
+
+
+@pytest.mark.django_db
+def test_deleted_post_changes_feed(client, mixer: Mixer, post):
+    other = mixer.blend(
+        "blog.Post", is_published=True, category=post.category,
+        pub_date=timezone.now() - timedelta(days=2))
+    response = client.get("/")
+    other.delete()
+    assert _revalidate(client, "/", response).status_code == HTTPStatus.OK
+
+
+@pytest.mark.django_db
+def test_category_change_changes_pages(client, post):
+    urls = ("/", f"/posts/{post.id}/", f"/category/{post.category.slug}/")
+    responses = [client.get(url) for url in urls]
+    post.category.description = "Новое описание"
+    post.category.save()
+    for url, response in zip(urls, responses):
+        assert _revalidate(client, url, response).status_code == HTTPStatus.OK
+
+
+@pytest.mark.django_db
+def test_hidden_post_is_not_revalidated(client, post):
+    url = f"/posts/{post.id}/"
+    response = client.get(url)
+    post.is_published = False
+    post.save()
+    assert _revalidate(
+        client, url, response).status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_authenticated_users_get_full_pages(user_client, post):
+    url = f"/posts/{post.id}/"
+    response = user_client.get(url)
+    assert not response.has_header("ETag")
+    assert user_client.get(
+        url, HTTP_IF_NONE_MATCH='"*"').status_code == HTTPStatus.OK
+
+
+@pytest.mark.django_db
+def test_list_revalidation_does_not_scan_posts(client, post):
+    for url in ("/", f"/category/{post.category.slug}/",
+                f"/profile/{post.author.username}/"):
+        response = client.get(url)
+        with CaptureQueriesContext(connection) as ctx:
+            revalidated = _revalidate(client, url, response)
+        assert revalidated.status_code == HTTPStatus.NOT_MODIFIED
+        assert not [
+            query for query in ctx.captured_queries
+            if 'FROM "blog_post"' in query["sql"]
+        ], url
+
+
+@pytest.mark.django_db
+def test_commenter_rename_changes_post_page(
+        client, another_user_client, another_user, post):
+    another_user_client.post(
+        f"/posts/{post.id}/comment/", data={"text": "Комментарий"})
+    url = f"/posts/{post.id}/"
+    response = client.get(url)
+    another_user.username = "renamed"
+    another_user.save()
+    assert _revalidate(client, url, response).status_code == HTTPStatus.OK
@@ -0,0 +1,128 @@
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.files.images import ImageFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from PIL import Image
+
+from blog.models import ImageStatus, ImageTask, Post
+from blog.tasks import (MAX_ATTEMPTS, claim_image_task, process_image_tasks,
+                        run_image_task)
+
+
+def _image_file(name="photo.jpg", exif=None):
+    buffer = BytesIO()
+    Image.new("RGB", (200, 100)).save(
+        buffer, format="JPEG", **({"exif": exif} if exif else {}))
+    return ImageFile(buffer, name=name)
+
+
+@pytest.mark.django_db
+def test_upload_is_queued_not_processed(post_with_published_location):
+    post = post_with_published_location
+    post.refresh_from_db()
+    assert post.image_status == ImageStatus.PENDING
+    assert not post.image_variants_ready
+    assert ImageTask.objects.get(post=post).image == post.image.name
+
+
+@pytest.mark.django_db
+def test_worker_command_processes_queue(post_with_published_location):
+    out = StringIO()
+    call_command("process_image_tasks", "--once", stdout=out)
+    post = Post.objects.get(pk=post_with_published_location.pk)
+    assert post.image_status == ImageStatus.READY
+    assert post.image_variants_ready
+    assert not ImageTask.objects.exists()
+    assert out.getvalue() == "Обработано изображений: 1\n"
+
+
+@pytest.mark.django_db
+def test_claimed_task_is_not_given_twice(post_with_published_location):
+    assert claim_image_task() is not None
+    assert claim_image_task() is None
+
+
+@pytest.mark.django_db
+def test_exif_is_stripped(mixer, user):
+    exif = Image.Exif()
+    exif[0x010F] = "Camera maker"
+    exif[0x0112] = 6
+    post = mixer.blend(
+        "blog.Post", author=user, image=_image_file(exif=exif.tobytes()))
+    original = post.image.name
+    process_image_tasks()
+    post.refresh_from_db()
+    # Очищенная копия получает новое имя, исходник удаляется.
+    assert post.image.name != original
+    assert not default_storage.exists(original)
+    with default_storage.open(post.image.name) as file:
+        image = Image.open(file)
+        assert not image.getexif()
+        # Поворот из EXIF применён к пикселям.
+        assert image.size == (100, 200)
+
+
+@pytest.mark.django_db
+def test_broken_image_fails_after_retries(post_with_published_location):
+    post = post_with_published_location
+    default_storage.delete(post.image.name)
+    for _ in range(MAX_ATTEMPTS + 1):
+        process_image_tasks()
+    post.refresh_from_db()
+    assert post.image_status == ImageStatus.FAILED
+    task = ImageTask.objects.get(post=post)
+    assert task.attempts == MAX_ATTEMPTS
+    assert task.error
+
+
+@pytest.mark.django_db
+def test_replaced_image_is_requeued(post_with_published_location):
+    post = post_with_published_location
+    old_task = claim_image_task()
+    post.image = _image_file("replacement.jpg")
+    post.save()
+    task = ImageTask.objects.get(post=post)
+    assert task.image == post.image.name
+    assert task.locked_at is None
+    # Обработчик старого файла не затирает результат для нового.
+    run_image_task(old_task)
+    process_image_tasks()
+    post.refresh_from_db()
+    assert post.image_variants["name"] == post.image.name
+    assert post.image_status == ImageStatus.READY
+
+
+@pytest.mark.django_db
+def test_removed_image_clears_status(post_with_published_location):
+    post = post_with_published_location
+    post.image = None
+    post.save()
+    post.refresh_from_db()
+    assert post.image_status == ""
+    assert not ImageTask.objects.exists()
+
+
+def _broken_png(*args, **kwargs):
+    raise SyntaxError("broken PNG file")
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("breakage", ["bomb", "syntax"])
+def test_undecodable_image_fails_task(
+        monkeypatch, post_with_published_location, breakage):
+    post = post_with_published_location
+    if breakage == "bomb":
+        # Изображение больше удвоенного предела Pillow.
+        monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", 100)
+    else:
+        monkeypatch.setattr("blog.tasks.generate_variants", _broken_png)
+    # Ошибка не прерывает обработчик: задача повторяется до предела.
+    assert process_image_tasks() == MAX_ATTEMPTS
+    assert process_image_tasks() == 0
+    post.refresh_from_db()
+    assert post.image_status == ImageStatus.FAILED
+    task = ImageTask.objects.get(post=post)
+    assert task.attempts == MAX_ATTEMPTS
+    assert task.error
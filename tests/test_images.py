@@ -0,0 +1,145 @@
+from io import BytesIO, StringIO
+
+import pytest
+from bs4 import BeautifulSoup
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.base import ContentFile
+from django.core.files.images import ImageFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from PIL import Image
+
+from blog.images import (IMAGE_FORMATS, IMAGE_VARIANTS, delete_variants,
+                         variant_name)
+from blog.models import Post
+from blog.storage import HASH_LENGTH, post_image_storage
+from blog.tasks import process_image_tasks
+
+
+def _image_file(color, name="photo.png"):
+    buffer = BytesIO()
+    Image.new("RGB", (50, 50), color).save(buffer, format="PNG")
+    return ImageFile(buffer, name=name)
+
+
+def _stored_files(name):
+    paths = [name] + [
+        variant_name(name, variant, extension)
+        for variant in IMAGE_VARIANTS for extension in IMAGE_FORMATS
+    ]
+    return {path for path in paths if post_image_storage.exists(path)}
+
+
+@pytest.mark.django_db
+def test_variants_are_generated_by_worker(post_with_published_location):
+    assert process_image_tasks() == 1
+    name = post_with_published_location.image.name
+    for variant in IMAGE_VARIANTS:
+        for extension in IMAGE_FORMATS:
+            path = variant_name(name, variant, extension)
+            assert default_storage.exists(path)
+            with default_storage.open(path) as file:
+                # Оригинал 100x100 не увеличивается.
+                assert Image.open(file).size == (100, 100)
+
+
+@pytest.mark.django_db
+def test_post_card_has_srcset_and_dimensions(
+        user_client, post_with_published_location):
+    post = post_with_published_location
+    process_image_tasks()
+    soup = BeautifulSoup(
+        user_client.get(f"/profile/{post.author.username}/").content,
+        features="html.parser",
+    )
+    img = soup.find("img", srcset=True)
+    assert img is not None
+    assert (img["width"], img["height"]) == ("100", "100")
+    assert variant_name(post.image.name, "card", "jpg") in img["src"]
+    assert soup.find("source", type="image/webp") is not None
+
+
+@pytest.mark.django_db
+def test_backfill_command_recreates_variants(post_with_published_location):
+    post = post_with_published_location
+    process_image_tasks()
+    delete_variants(post.image.name)
+    Post.objects.filter(pk=post.pk).update(image_variants={})
+    out = StringIO()
+    call_command("generate_image_variants", stdout=out)
+    post.refresh_from_db()
+    assert post.image_variants_ready
+    assert default_storage.exists(
+        variant_name(post.image.name, "detail_2x", "webp"))
+    assert out.getvalue() == "Созданы варианты для изображений: 1\n"
+
+
+@pytest.mark.django_db
+def test_large_image_is_downscaled(mixer, user):
+    buffer = BytesIO()
+    Image.new("RGB", (3000, 1500)).save(buffer, format="JPEG")
+    post = mixer.blend(
+        "blog.Post", author=user,
+        image=ImageFile(buffer, name="large.jpg"))
+    process_image_tasks()
+    post.refresh_from_db()
+    assert post.image_variants["width"] == 3000
+    path = variant_name(post.image.name, "card", "webp")
+    with default_storage.open(path) as file:
+        assert Image.open(file).size == (IMAGE_VARIANTS["card"], 320)
+
+
+@pytest.mark.django_db
+def test_shared_image_is_deleted_with_last_post(
+        mixer, user, django_capture_on_commit_callbacks):
+    first, second = (
+        mixer.blend("blog.Post", author=user, image=_image_file("teal"))
+        for _ in range(2))
+    assert first.image.name == second.image.name
+    process_image_tasks()
+    name = first.image.name
+    assert len(_stored_files(name)) == 1 + len(IMAGE_VARIANTS) * len(
+        IMAGE_FORMATS)
+    with django_capture_on_commit_callbacks(execute=True):
+        first.delete()
+    assert len(_stored_files(name)) == 1 + len(IMAGE_VARIANTS) * len(
+        IMAGE_FORMATS)
+    with django_capture_on_commit_callbacks(execute=True):
+        second.delete()
+    assert _stored_files(name) == set()
+
+
+@pytest.mark.django_db
+def test_replaced_image_is_deleted(
+        mixer, user, django_capture_on_commit_callbacks):
+    post = mixer.blend("blog.Post", author=user, image=_image_file("olive"))
+    process_image_tasks()
+    post = Post.objects.get(pk=post.pk)
+    old_name = post.image.name
+    post.image = _image_file("navy")
+    with django_capture_on_commit_callbacks(execute=True):
+        post.save()
+    assert _stored_files(old_name) == set()
+    assert _stored_files(post.image.name) == {post.image.name}
+
+
+def test_hashed_name_respects_max_length():
+    content = ContentFile(b"max length", name="photo.jpeg")
+    unlimited = post_image_storage.save("posts_images/photo.jpeg", content)
+    names = {unlimited}
+    try:
+        assert len(unlimited) == len("posts_images/.jpeg") + HASH_LENGTH
+        # Файл с полным хешем уже есть, но его имя длиннее max_length.
+        for _ in range(2):
+            name = post_image_storage.save(
+                "posts_images/photo.jpeg", content, max_length=40)
+            names.add(name)
+        assert len(names) == 2
+        assert len(name) == 40
+        assert name.startswith("posts_images/") and name.endswith(".jpeg")
+        with pytest.raises(SuspiciousFileOperation):
+            post_image_storage.save("posts_images/photo.jpeg", content,
+                                    max_length=20)
+    finally:
+        for name in names:
+            post_image_storage.delete(name)
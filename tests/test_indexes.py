@@ -0,0 +1,53 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = pytest.mark.skipif(
+    connection.vendor != "sqlite", reason="EXPLAIN QUERY PLAN is SQLite-only"
+)
+
+
+def _query_plans(client, url, table):
+    with CaptureQueriesContext(connection) as ctx:
+        client.get(url)
+    plans = []
+    with connection.cursor() as cursor:
+        for query in ctx.captured_queries:
+            sql = query["sql"]
+            if not sql.startswith("SELECT") or f'FROM "{table}"' not in sql:
+                continue
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+            plans.append([row[-1] for row in cursor.fetchall()])
+    return plans
+
+
+def _assert_no_table_scan(plans, table, url):
+    assert plans, f"На странице `{url}` не найдено запросов к `{table}`."
+    for plan in plans:
+        for step in plan:
+            if step.startswith(("SCAN", "SEARCH")) and f" {table}" in step:
+                assert "USING" in step, (
+                    f"Запрос страницы `{url}` читает `{table}` без индекса: "
+                    f"{plan}"
+                )
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures("many_posts_with_published_locations")
+def test_list_views_use_indexes(client, user_client, user, published_category):
+    urls = (
+        (client, "/"),
+        (client, f"/category/{published_category.slug}/"),
+        (client, f"/profile/{user.username}/"),
+        (user_client, f"/profile/{user.username}/"),
+    )
+    for http_client, url in urls:
+        plans = _query_plans(http_client, url, "blog_post")
+        _assert_no_table_scan(plans, "blog_post", url)
+
+
+@pytest.mark.django_db
+def test_post_comments_use_index(client, comment_to_a_post):
+    url = f"/posts/{comment_to_a_post.post_id}/"
+    plans = _query_plans(client, url, "blog_comment")
+    _assert_no_table_scan(plans, "blog_comment", url)
@@ -0,0 +1,74 @@
+import io
+import json
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+
+from blog.loadtest import (LOAD_USERNAME_PREFIX, Recorder, percentile,
+                           prepare_accounts, route_name)
+from blog.models import Post
+from blog.seeding import seed_blog
+from conftest import SQLITE_FILE
+
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert percentile(values, 0.5) == 50
+    assert percentile(values, 0.95) == 95
+    assert percentile(values, 0.99) == 99
+    assert percentile([7], 0.99) == 7
+
+
+def test_route_names():
+    assert route_name("/?after=abc") == "blog:index"
+    assert route_name("/posts/1/comment/") == "blog:add_comment"
+    assert route_name("/pages/about/") == "pages:about"
+    assert route_name("/nowhere/at/all/") == "other"
+
+
+def test_recorder_report():
+    recorder = Recorder()
+    for ms in range(1, 11):
+        recorder.add("blog:index", ms / 1000, ok=True)
+    recorder.add("blog:create_post", 0.5, ok=False)
+    report = recorder.report(elapsed=2)
+    assert report["routes"]["blog:index"]["rps"] == 5
+    assert report["routes"]["blog:index"]["p50_ms"] == 5
+    assert report["routes"]["blog:create_post"]["errors"] == 1
+    assert report["total"]["requests"] == 11
+
+
+@pytest.mark.django_db
+def test_accounts_get_a_new_password_per_run():
+    names, password = prepare_accounts(2)
+    _, next_password = prepare_accounts(2)
+    assert password != next_password
+    user = get_user_model().objects.get(username=names[0])
+    assert user.check_password(next_password)
+    assert not user.check_password(password)
+
+
+@pytest.mark.django_db(
+    transaction=True, databases=["default", SQLITE_FILE])
+def test_load_test_against_live_server(sqlite_file, live_server, tmp_path):
+    seed_blog(users=5, categories=2, locations=2, posts=30, comments=100,
+              unpublished=0, future=0)
+    output = tmp_path / "report.json"
+    call_command(
+        "load_test", "--url", live_server.url, "--duration", "2",
+        "--concurrency", "2", "--logged-in", "1",
+        "--scenario", "browse_feed=1", "--scenario", "read_post=1",
+        "--scenario", "add_comment=1", "--scenario", "create_post=1",
+        "--output", str(output), stdout=io.StringIO())
+    report = json.loads(output.read_text(encoding="utf-8"))
+    assert report["total"]["requests"] > 0
+    assert report["total"]["errors"] == 0
+    assert {"blog:index", "blog:post_detail"} <= set(report["routes"])
+    for stats in report["routes"].values():
+        assert stats["p50_ms"] <= stats["p95_ms"] <= stats["p99_ms"]
+    # Пользователи нагрузки удаляются по умолчанию вместе с постами.
+    assert not get_user_model().objects.filter(
+        username__startswith=LOAD_USERNAME_PREFIX).exists()
+    assert not Post.objects.filter(
+        author__username__startswith=LOAD_USERNAME_PREFIX).exists()
@@ -0,0 +1,130 @@
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog.models import Post
+from blog.page_cache import (cache_page_response, get_cached_page,
+                             get_page_cache_timeout, page_cache_key)
+from blog.schedule import get_next_publication
+
+
+@pytest.fixture
+def post(post_with_published_location):
+    Post.objects.filter(pk=post_with_published_location.pk).update(
+        pub_date=timezone.now() - timedelta(days=1))
+    post_with_published_location.refresh_from_db()
+    return post_with_published_location
+
+
+def _hide_title(post):
+    """Меняет заголовок в обход сигналов, не сбрасывая кеш."""
+    Post.objects.filter(pk=post.pk).update(title="Скрытое изменение")
+
+
+@pytest.mark.django_db
+def test_anonymous_pages_are_cached(client, user_client, post):
+    urls = ("/", f"/posts/{post.id}/", f"/category/{post.category.slug}/")
+    for url in urls:
+        client.get(url)
+    _hide_title(post)
+    for url in urls:
+        assert "Скрытое изменение" not in client.get(url).content.decode()
+    # Авторизованные пользователи всегда получают свежую страницу.
+    assert "Скрытое изменение" in user_client.get(
+        f"/posts/{post.id}/").content.decode()
+
+
+@pytest.mark.django_db
+def test_cache_key_ignores_unrelated_params(client, post):
+    client.get("/")
+    _hide_title(post)
+    assert "Скрытое изменение" not in client.get(
+        "/?utm_source=mail&ref=1").content.decode()
+
+    def key(url):
+        return page_cache_key(RequestFactory().get(url), ())
+
+    assert key("/?utm_source=mail&page=2") == key("/?page=2&x=1")
+    assert key("/?page=2") != key("/")
+    assert key("/?after=a") != key("/?before=a")
+
+
+@pytest.mark.django_db
+def test_cached_page_keeps_headers():
+    response = HttpResponse("Текст", content_type="text/plain")
+    response["Content-Language"] = "ru"
+    cache_page_response("page", response)
+    cached = get_cached_page("page")
+    assert cached.content == response.content
+    assert cached["Content-Type"] == "text/plain"
+    assert cached["Content-Language"] == "ru"
+
+
+@pytest.mark.django_db
+def test_comment_purges_post_and_list_pages(client, user_client, post):
+    client.get("/")
+    client.get(f"/posts/{post.id}/")
+    user_client.post(f"/posts/{post.id}/comment/", data={"text": "Новый"})
+    assert "Новый" in client.get(f"/posts/{post.id}/").content.decode()
+    assert "Комментарии (1)" in client.get("/").content.decode()
+
+
+@pytest.mark.django_db
+def test_post_change_keeps_other_post_pages(
+        client, mixer: Mixer, post, published_category):
+    other = mixer.blend(
+        "blog.Post", is_published=True, category=published_category,
+        pub_date=timezone.now() - timedelta(days=1))
+    client.get(f"/posts/{post.id}/")
+    client.get(f"/posts/{other.id}/")
+    _hide_title(post)
+    other.title = "Правка другого поста"
+    other.save()
+    assert "Скрытое изменение" not in client.get(
+        f"/posts/{post.id}/").content.decode()
+    assert "Правка другого поста" in client.get(
+        f"/posts/{other.id}/").content.decode()
+
+
+@pytest.mark.django_db
+def test_category_change_purges_all_pages(client, post):
+    client.get(f"/posts/{post.id}/")
+    post.category.title = "Переименованная категория"
+    post.category.save()
+    assert "Переименованная категория" in client.get(
+        f"/posts/{post.id}/").content.decode()
+
+
+@pytest.mark.django_db
+def test_timeout_does_not_outlive_scheduled_post(
+        settings, mixer: Mixer, post):
+    settings.PAGE_CACHE_TIMEOUT = 60 * 60
+    assert get_page_cache_timeout() == 60 * 60
+    mixer.blend(
+        "blog.Post", is_published=True,
+        pub_date=timezone.now() + timedelta(minutes=5))
+    assert 0 < get_page_cache_timeout() <= 5 * 60
+
+
+@pytest.mark.django_db
+def test_scheduled_post_appears_when_due(client, mixer: Mixer, post):
+    due = timezone.now() + timedelta(minutes=5)
+    scheduled = mixer.blend(
+        "blog.Post", is_published=True, category=post.category,
+        title="Отложенный пост", pub_date=due)
+    assert get_next_publication() == due
+    assert "Отложенный пост" not in client.get("/").content.decode()
+
+    # Запись в базе «дозревает» без сигналов, как это происходит со временем.
+    Post.objects.filter(pk=scheduled.pk).update(
+        pub_date=timezone.now() - timedelta(days=1))
+    assert "Отложенный пост" not in client.get("/").content.decode()
+    with mock.patch(
+        "blog.schedule.timezone.now", return_value=due + timedelta(seconds=1)
+    ):
+        assert "Отложенный пост" in client.get("/").content.decode()
@@ -0,0 +1,91 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog.paginators import encode_cursor
+from conftest import N_PER_PAGE
+
+
+@pytest.fixture
+def feed_posts(mixer: Mixer, user, published_category):
+    now = timezone.now()
+    # Пары постов с одинаковой датой проверяют разрешение по id.
+    pub_dates = (now - timedelta(days=1 + i // 2) for i in range(25))
+    return mixer.cycle(25).blend(
+        "blog.Post",
+        author=user,
+        is_published=True,
+        category=published_category,
+        pub_date=pub_dates,
+    )
+
+
+def _page_ids(response):
+    return [post.pk for post in response.context["page_obj"]]
+
+
+@pytest.mark.django_db
+def test_keyset_feed_walks_forward_and_back(client, feed_posts):
+    expected = [
+        post.pk for post in sorted(
+            feed_posts, key=lambda p: (p.pub_date, p.pk), reverse=True)
+    ]
+
+    pages = []
+    response = client.get("/")
+    while True:
+        assert response.status_code == HTTPStatus.OK
+        page_obj = response.context["page_obj"]
+        pages.append(_page_ids(response))
+        if not page_obj.has_next():
+            break
+        response = client.get(f"/?after={page_obj.next_cursor}")
+
+    assert [len(ids) for ids in pages] == [N_PER_PAGE, N_PER_PAGE, 5]
+    assert sum(pages, []) == expected
+
+    last_page = response.context["page_obj"]
+    response = client.get(f"/?before={last_page.previous_cursor}")
+    assert _page_ids(response) == pages[1]
+    response = client.get(
+        f"/?before={response.context['page_obj'].previous_cursor}")
+    assert _page_ids(response) == pages[0]
+    assert not response.context["page_obj"].has_previous()
+
+
+@pytest.mark.django_db
+def test_keyset_feed_rejects_malformed_cursor(client, feed_posts):
+    response = client.get("/?after=not-a-cursor")
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_keyset_feed_before_first_page(client, feed_posts):
+    first_page = client.get("/").context["page_obj"]
+    second = client.get(f"/?after={first_page.next_cursor}")
+    response = client.get(
+        f"/?before={second.context['page_obj'].previous_cursor}")
+    page_obj = response.context["page_obj"]
+    assert _page_ids(response) == [post.pk for post in first_page]
+    assert page_obj.has_next()
+    assert not page_obj.has_previous()
+    assert page_obj.next_cursor == first_page.next_cursor
+
+
+@pytest.mark.django_db
+def test_keyset_feed_before_empty_page(client, feed_posts):
+    newest = client.get("/").context["page_obj"]
+    # Курсор первой строки ленты: до неё постов нет.
+    cursor = encode_cursor(newest.object_list[0], "pub_date")
+    response = client.get(f"/?before={cursor}")
+    assert response.status_code == HTTPStatus.OK
+    page_obj = response.context["page_obj"]
+    assert list(page_obj) == []
+    assert not page_obj.has_next()
+    assert not page_obj.has_previous()
+    assert page_obj.next_cursor is None
+    assert b"after=None" not in response.content
+    assert b"before=None" not in response.content
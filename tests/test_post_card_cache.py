@@ -0,0 +1,72 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from blog.models import Comment, Post
+from blog.utils import recount_comments, touch_posts
+
+
+@pytest.fixture
+def post_with_published_location(post_with_published_location):
+    Post.objects.filter(pk=post_with_published_location.pk).update(
+        pub_date=timezone.now() - timedelta(days=1))
+    post_with_published_location.refresh_from_db()
+    return post_with_published_location
+
+
+@pytest.mark.django_db
+def test_post_card_is_served_from_cache(
+        user_client, post_with_published_location):
+    post = post_with_published_location
+    user_client.get("/")
+    # Обновление без сигналов не сбрасывает кеш: карточка остаётся прежней.
+    Post.objects.filter(pk=post.pk).update(title="Скрытое изменение")
+    content = user_client.get("/").content.decode()
+    assert post.title in content
+    assert "Скрытое изменение" not in content
+
+
+@pytest.mark.django_db
+def test_post_card_is_invalidated_on_related_changes(
+        user_client, post_with_published_location):
+    post = post_with_published_location
+    user_client.get("/")
+
+    post.category.title = "Новая категория"
+    post.category.save()
+    assert "Новая категория" in user_client.get("/").content.decode()
+
+    post.location.name = "Новое место"
+    post.location.save()
+    assert "Новое место" in user_client.get("/").content.decode()
+
+    post.author.username = "renamed_author"
+    post.author.save()
+    assert "@renamed_author" in user_client.get("/").content.decode()
+
+    user_client.post(f"/posts/{post.id}/comment/", data={"text": "Текст"})
+    assert "Комментарии (1)" in user_client.get("/").content.decode()
+
+    post.refresh_from_db()
+    post.title = "Новый заголовок"
+    post.save()
+    assert "Новый заголовок" in user_client.get("/").content.decode()
+
+
+@pytest.mark.django_db
+def test_post_card_follows_updates_without_signals(
+        user_client, post_with_published_location):
+    post = post_with_published_location
+    user_client.get("/")
+    # bulk_create не вызывает сигналов: счётчик исправляет recount_comments().
+    Comment.objects.bulk_create([
+        Comment(post=post, author=post.author, text=text)
+        for text in ("Первый", "Второй")
+    ])
+    recount_comments()
+    assert "Комментарии (2)" in user_client.get("/").content.decode()
+
+    Post.objects.filter(pk=post.pk).update(title="Без сигналов")
+    touch_posts(Post.objects.filter(pk=post.pk))
+    assert "Без сигналов" in user_client.get("/").content.decode()
@@ -0,0 +1,127 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from conftest import N_PER_PAGE
+
+# Сессия и пользователь, сам список и (для категории и профиля)
+# объект страницы со счётчиком пагинации.
+LIST_PAGE_MAX_QUERIES = 6
+
+
+@pytest.fixture
+def blend_posts(mixer: Mixer, user, published_category):
+    def blend(count):
+        return mixer.cycle(count).blend(
+            "blog.Post",
+            author=user,
+            is_published=True,
+            category=published_category,
+            location__is_published=True,
+            pub_date=timezone.now() - timedelta(days=1),
+        )
+    return blend
+
+
+def _count_queries(client, url):
+    cache.clear()
+    with CaptureQueriesContext(connection) as ctx:
+        client.get(url)
+    return len(ctx.captured_queries)
+
+
+@pytest.mark.django_db
+def test_list_pages_query_count_does_not_depend_on_page_size(
+        user_client, another_user_client, user, published_category,
+        blend_posts, django_assert_max_num_queries):
+    urls = (
+        "/",
+        f"/category/{published_category.slug}/",
+        f"/profile/{user.username}/",
+    )
+    blend_posts(1)
+    single = {
+        (client, url): _count_queries(client, url)
+        for client in (user_client, another_user_client) for url in urls
+    }
+    blend_posts(N_PER_PAGE * 2)
+    for (client, url), expected in single.items():
+        cache.clear()
+        with django_assert_max_num_queries(LIST_PAGE_MAX_QUERIES):
+            client.get(url)
+        assert _count_queries(client, url) == expected, (
+            f"Число запросов страницы `{url}` растёт вместе с числом постов."
+        )
+
+
+@pytest.mark.django_db
+def test_post_detail_loads_relations_in_one_query(
+        another_user_client, blend_posts, django_assert_max_num_queries):
+    post, = blend_posts(1)
+    # Сессия, пользователь, пост со связями, комментарии.
+    with django_assert_max_num_queries(4):
+        another_user_client.get(f"/posts/{post.id}/")
+
+
+def _count_selects(queries, table):
+    return sum(
+        query["sql"].startswith("SELECT") and f'FROM "{table}"' in query["sql"]
+        for query in queries
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("method", ["get", "post"])
+@pytest.mark.parametrize("route", ["edit", "delete"])
+def test_post_edit_routes_load_post_once(
+        user_client, blend_posts, route, method):
+    post, = blend_posts(1)
+    data = {"title": "Заголовок", "text": "Текст"} if route == "edit" else {}
+    with CaptureQueriesContext(connection) as ctx:
+        getattr(user_client, method)(f"/posts/{post.id}/{route}/", data=data)
+    assert _count_selects(ctx.captured_queries, "blog_post") == 1
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("method", ["get", "post"])
+@pytest.mark.parametrize("route", ["edit_comment", "delete_comment"])
+def test_comment_edit_routes_load_each_object_once(
+        mixer: Mixer, user, user_client, blend_posts, route, method):
+    post, = blend_posts(1)
+    comment = mixer.blend("blog.Comment", post=post, author=user)
+    url = f"/posts/{post.id}/{route}/{comment.id}/"
+    data = {"text": "Новый текст"} if route == "edit_comment" else {}
+    with CaptureQueriesContext(connection) as ctx:
+        getattr(user_client, method)(url, data=data)
+    assert _count_selects(ctx.captured_queries, "blog_post") == 1
+    assert _count_selects(ctx.captured_queries, "blog_comment") == 1
+
+
+@pytest.mark.django_db
+def test_comment_creation_reads_only_post_key(user_client, blend_posts):
+    post, = blend_posts(1)
+    with CaptureQueriesContext(connection) as ctx:
+        user_client.post(f"/posts/{post.id}/comment/", data={"text": "Текст"})
+    post_selects = [
+        query["sql"] for query in ctx.captured_queries
+        if query["sql"].startswith("SELECT")
+        and 'FROM "blog_post"' in query["sql"]
+    ]
+    assert len(post_selects) == 1
+    assert '"blog_post"."text"' not in post_selects[0]
+    assert post.comments.count() == 1
+
+
+@pytest.mark.django_db
+def test_comments_on_hidden_posts_are_rejected(
+        another_user_client, posts_with_unpublished_category):
+    post = posts_with_unpublished_category[0]
+    response = another_user_client.post(
+        f"/posts/{post.id}/comment/", data={"text": "Текст"})
+    assert response.status_code == 404
+    assert not post.comments.exists()
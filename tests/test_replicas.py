@@ -0,0 +1,85 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.models import Comment, Post
+
+# Основная база и реплика — два разных файла SQLite; данные в реплику
+# не копируются, поэтому по ответу видно, откуда он прочитан.
+pytestmark = pytest.mark.django_db(databases=["default", "replica"])
+
+
+@pytest.fixture
+def replicas(settings):
+    settings.DATABASE_REPLICAS = ["replica"]
+    # Реплика в тестах не догоняет основную базу, поэтому окно отставания
+    # отключено; оно проверяется отдельно.
+    settings.REPLICA_LAG_SECONDS = 0
+
+
+@pytest.fixture
+def post(post_with_published_location):
+    Post.objects.filter(pk=post_with_published_location.pk).update(
+        pub_date=timezone.now() - timedelta(days=1))
+    return post_with_published_location
+
+
+def test_without_replicas_reads_primary(client, post):
+    assert client.get(f"/posts/{post.id}/").status_code == HTTPStatus.OK
+
+
+def test_read_views_use_replica(client, replicas, post):
+    urls = (
+        "/",
+        f"/posts/{post.id}/",
+        f"/category/{post.category.slug}/",
+        f"/profile/{post.author.username}/",
+    )
+    for url in urls:
+        with CaptureQueriesContext(connections["replica"]) as ctx:
+            response = client.get(url)
+        assert ctx.captured_queries, f"`{url}` не читает из реплики."
+        assert post.title not in response.content.decode()
+
+
+def test_writes_go_to_primary_and_pin_session(user_client, replicas, post):
+    url = f"/posts/{post.id}/"
+    # Пост есть только в основной базе: из реплики он не найден.
+    assert user_client.get(url).status_code == HTTPStatus.NOT_FOUND
+    response = user_client.post(f"{url}comment/", data={"text": "Моё"})
+    assert response.status_code == HTTPStatus.FOUND
+    assert Comment.objects.using("default").filter(text="Моё").exists()
+    assert not Comment.objects.using("replica").exists()
+    # Сразу после записи автор читает из основной базы и видит комментарий.
+    assert "Моё" in user_client.get(url).content.decode()
+
+
+def test_pin_expires(settings, user_client, replicas, post):
+    settings.REPLICA_PIN_SECONDS = 0
+    url = f"/posts/{post.id}/"
+    user_client.post(f"{url}comment/", data={"text": "Моё"})
+    assert user_client.get(url).status_code == HTTPStatus.NOT_FOUND
+
+
+def test_pages_read_primary_while_replicas_lag(
+        settings, client, replicas, post):
+    settings.REPLICA_LAG_SECONDS = 60
+    url = f"/posts/{post.id}/"
+    post.title = "Новый заголовок"
+    post.save()
+    # Запись только что сброшена из кеша: страница читается из основной
+    # базы, и в кеш попадает актуальная версия.
+    with CaptureQueriesContext(connections["replica"]) as ctx:
+        response = client.get(url)
+    assert not ctx.captured_queries
+    assert "Новый заголовок" in response.content.decode()
+    assert "Новый заголовок" in client.get(url).content.decode()
+
+    settings.REPLICA_LAG_SECONDS = 0
+    cache.clear()
+    assert client.get(url).status_code == HTTPStatus.NOT_FOUND
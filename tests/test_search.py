@@ -0,0 +1,174 @@
+import time
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.db.models import Q
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog.models import Comment, Post
+from blog.search import rebuild_index, search_posts
+from blog.stemmer import stem
+from test_budgets import BENCHMARK_SCALE, _seed
+
+
+@pytest.fixture
+def blend_post(mixer: Mixer, user, published_category, published_location):
+    def blend(**kwargs):
+        return mixer.blend("blog.Post", **{
+            "author": user,
+            "category": published_category,
+            "location": published_location,
+            "is_published": True,
+            "pub_date": timezone.now() - timedelta(days=1),
+            **kwargs,
+        })
+
+    return blend
+
+
+def _found(query, user=None):
+    queryset = Post.objects.published() if user is None else (
+        Post.objects.visible_to(user))
+    return list(search_posts(queryset, query))
+
+
+@pytest.mark.parametrize("forms", (
+    ("публикация", "публикации", "публикациями"),
+    ("бежать", "бежал", "бежали"),
+    ("Ёлка", "ёлки", "елками"),
+))
+def test_stemmer_joins_word_forms(forms):
+    assert len({stem(word) for word in forms}) == 1
+
+
+@pytest.mark.django_db
+def test_search_finds_word_forms(blend_post):
+    post = blend_post(title="Прогулка", text="Мы гуляли по горам весь день.")
+    blend_post(title="Другое", text="Ничего общего.")
+    assert _found("горы") == [post]
+    assert _found("ГУЛЯЛИ ГОРАХ") == [post]
+    assert _found("горы море") == []
+
+
+@pytest.mark.django_db
+def test_title_match_ranks_higher(blend_post):
+    in_text = blend_post(title="Заметка", text="Рассказ про путешествие.")
+    in_title = blend_post(title="Путешествие", text="Рассказ.")
+    assert _found("путешествия") == [in_title, in_text]
+
+
+@pytest.mark.django_db
+def test_search_respects_visibility(blend_post, user):
+    hidden = blend_post(title="Черновик", is_published=False)
+    future = blend_post(
+        title="Черновик", pub_date=timezone.now() + timedelta(days=1))
+    assert _found("черновик") == []
+    assert set(_found("черновик", user)) == {hidden, future}
+
+
+@pytest.mark.django_db
+def test_index_follows_changes(blend_post, mixer, user):
+    post = blend_post(title="Старое название")
+    assert _found("старое") == [post]
+
+    post.title = "Новое название"
+    post.save()
+    assert _found("старое") == []
+    assert _found("новое") == [post]
+
+    comment = mixer.blend(
+        "blog.Comment", post=post, author=user, text="Отличные фотографии")
+    assert _found("фотография") == [post]
+    comment = Comment.objects.get(pk=comment.pk)
+    comment.text = "Красивые горы"
+    comment.save()
+    assert _found("фотография") == []
+    assert _found("горы") == [post]
+    comment.delete()
+    assert _found("горы") == []
+
+    post.delete()
+    assert _found("новое") == []
+
+
+@pytest.mark.django_db
+def test_comment_write_touches_only_its_row(blend_post, mixer, user):
+    post = blend_post(title="Поход", text="Текст.")
+    other = blend_post(title="Другое", text="Текст.")
+    mixer.cycle(5).blend(
+        "blog.Comment", post=post, author=user, text="Старые комментарии")
+    mixer.blend("blog.Comment", post=other, author=user, text="Горы")
+    with CaptureQueriesContext(connection) as queries:
+        mixer.blend("blog.Comment", post=post, author=user, text="Озеро")
+    index_queries = [
+        query["sql"] for query in queries if "blog_search" in query["sql"]]
+    assert len(index_queries) == 1
+    assert index_queries[0].startswith("INSERT OR REPLACE")
+    # Слова запроса ищутся и в посте, и в любом из его комментариев.
+    assert _found("поход озеро комментарий") == [post]
+    assert _found("поход горы") == []
+
+
+@pytest.mark.django_db
+def test_term_backend(settings, blend_post, mixer, user):
+    settings.SEARCH_BACKEND = "terms"
+    in_text = blend_post(title="Заметка", text="Рассказ про путешествие.")
+    in_title = blend_post(title="Путешествие", text="Рассказ.")
+    mixer.blend("blog.Comment", post=in_text, author=user, text="Горы")
+    assert rebuild_index() == 2
+    assert _found("путешествия") == [in_title, in_text]
+    assert _found("путешествие горы") == [in_text]
+    comment = Comment.objects.get(post=in_text)
+    comment.text = "Горы и горы"
+    comment.save()
+    mixer.blend("blog.Comment", post=in_title, author=user, text="Море")
+    assert _found("горы") == [in_text]
+    assert _found("море путешествие") == [in_title]
+    comment.delete()
+    assert _found("горы") == []
+    in_title.delete()
+    assert _found("путешествия") == [in_text]
+
+
+@pytest.mark.django_db
+def test_search_page(client, blend_post):
+    post = blend_post(title="Путешествие на Байкал")
+    response = client.get("/search/", {"q": "байкала"})
+    assert response.status_code == HTTPStatus.OK
+    assert list(response.context["page_obj"]) == [post]
+    assert client.get("/search/").status_code == HTTPStatus.OK
+
+
+@pytest.mark.skipif(
+    not BENCHMARK_SCALE,
+    reason="Задайте BLOGICUM_BENCHMARK_SCALE, чтобы запустить замеры.",
+)
+@pytest.mark.django_db(transaction=True)
+def test_search_faster_than_like(record_property):
+    _seed(BENCHMARK_SCALE)
+    post_ids = Post.objects.values_list("pk", flat=True)[:20]
+    Post.objects.filter(pk__in=list(post_ids)).update(
+        title="Заметки о путешествиях")
+    Comment.objects.filter(post_id__in=list(post_ids)[:5]).update(
+        text="Снова в путешествие")
+    rebuild_index()
+
+    def measure(run):
+        start = time.perf_counter()
+        found = set(run())
+        return time.perf_counter() - start, found
+
+    like_time, like_found = measure(lambda: Post.objects.published().filter(
+        Q(title__icontains="путешеств") | Q(text__icontains="путешеств")
+        | Q(comments__text__icontains="путешеств")
+    ).distinct().values_list("pk", flat=True))
+    search_time, search_found = measure(lambda: search_posts(
+        Post.objects.published(), "путешествие").values_list("pk", flat=True))
+    record_property("like_ms", 1000 * like_time)
+    record_property("search_ms", 1000 * search_time)
+    assert search_found == like_found
+    assert search_time < like_time
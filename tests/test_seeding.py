@@ -0,0 +1,73 @@
+import io
+from collections import Counter
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+
+from blog import corpus
+from blog.models import Category, Comment, Post
+from blog.seeding import SEED_DEFAULTS, _generate, seed_blog
+
+SMALL = {"users": 20, "categories": 4, "locations": 5, "posts": 300,
+         "comments": 3000}
+
+
+def _options(**kwargs):
+    return {**SEED_DEFAULTS, **SMALL, **kwargs}
+
+
+def test_corpus_does_not_depend_on_workers():
+    options = _options()
+    tasks = corpus.chunk_tasks(0, options["comments"], options)
+    single = list(_generate(corpus.comment_chunk, tasks, workers=1))
+    parallel = list(_generate(corpus.comment_chunk, tasks, workers=2))
+    assert single == parallel
+    assert sum(map(len, single)) == options["comments"]
+    other_seed = corpus.chunk_tasks(1, options["comments"], options)
+    assert list(_generate(corpus.comment_chunk, other_seed, 1)) != single
+
+
+@pytest.mark.django_db
+def test_corpus_does_not_depend_on_batch_size():
+    seed_blog(prefix="small", chunk_size=7, **SMALL)
+    seed_blog(prefix="large", chunk_size=1000, **SMALL)
+    titles = list(Post.objects.order_by("pk").values_list("title", "text"))
+    comments = list(Comment.objects.order_by("pk").values_list("text"))
+    assert titles[:SMALL["posts"]] == titles[SMALL["posts"]:]
+    assert comments[:SMALL["comments"]] == comments[SMALL["comments"]:]
+
+
+def test_comments_follow_power_law():
+    options = _options()
+    rows = corpus.comment_chunk((0, 0, options["comments"], options))
+    per_post = sorted(Counter(row[0] for row in rows).values(), reverse=True)
+    mean = options["comments"] / options["posts"]
+    assert per_post[0] > 5 * mean
+    assert len(per_post) < options["posts"]
+
+
+@pytest.mark.django_db
+def test_seed_blog_command():
+    out = io.StringIO()
+    args = [f"--{key}={value}" for key, value in SMALL.items()]
+    call_command("seed_blog", *args, "--batch-size=100", stdout=out,
+                 stderr=io.StringIO())
+    assert out.getvalue().splitlines() == [
+        "user: 20", "category: 4", "location: 5", "post: 300",
+        "comment: 3000",
+    ]
+    assert Post.objects.count() == SMALL["posts"]
+    assert Category.objects.count() == SMALL["categories"]
+    now = timezone.now()
+    assert Post.objects.filter(pub_date__gt=now).exists()
+    assert Post.objects.filter(is_published=False).exists()
+    # Даты создания не сбрасываются на момент вставки.
+    assert Post.objects.filter(created_at__lt=now).count() > 0.9 * (
+        SMALL["posts"])
+    assert not Comment.objects.filter(created_at__gt=now).exists()
+    post = Post.objects.order_by("-comment_count").first()
+    assert post.comment_count == post.comments.count() > 10
+
+    with pytest.raises(CommandError):
+        call_command("seed_blog", *args, stdout=out)
@@ -0,0 +1,95 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from django.core.management.utils import get_random_secret_key
+
+MANAGE_PY = Path(__file__).resolve().parent.parent / "blogicum" / "manage.py"
+
+
+def _run_prod(tmp_path, *args, **extra_env):
+    env = {
+        **os.environ,
+        "DJANGO_SETTINGS_MODULE": "blogicum.settings",
+        "BLOGICUM_ENV": "prod",
+        "BLOGICUM_SECRET_KEY": get_random_secret_key(),
+        "BLOGICUM_ALLOWED_HOSTS": "blogicum.example.com",
+        "BLOGICUM_CACHE_LOCATION": str(tmp_path / "cache"),
+        "BLOGICUM_DB_NAME": str(tmp_path / "db.sqlite3"),
+        **extra_env,
+    }
+    env = {key: value for key, value in env.items() if value is not None}
+    return subprocess.run(
+        [sys.executable, str(MANAGE_PY), *args],
+        env=env, capture_output=True, text=True,
+    )
+
+
+def test_prod_settings_pass_deploy_checks(tmp_path):
+    result = _run_prod(
+        tmp_path, "check", "--deploy", "--fail-level", "WARNING")
+    assert result.returncode == 0, result.stderr
+
+
+def test_prod_settings_enable_performance_options(tmp_path):
+    result = _run_prod(tmp_path, "shell", "-c", (
+        "from django.conf import settings as s; "
+        "print(s.DEBUG, s.CONN_MAX_AGE, "
+        "s.TEMPLATES[0]['OPTIONS']['loaders'][0][0], "
+        "s.CACHES['default']['BACKEND'])"
+    ))
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split() == [
+        "False", "600",
+        "django.template.loaders.cached.Loader",
+        "django.core.cache.backends.filebased.FileBasedCache",
+    ]
+
+
+def test_prod_settings_require_secret_key():
+    env = {
+        key: value for key, value in os.environ.items()
+        if not key.startswith("BLOGICUM_")
+    }
+    result = subprocess.run(
+        [sys.executable, str(MANAGE_PY), "check"],
+        env={**env, "BLOGICUM_ENV": "prod",
+             "DJANGO_SETTINGS_MODULE": "blogicum.settings"},
+        capture_output=True, text=True,
+    )
+    assert result.returncode != 0
+    assert "BLOGICUM_SECRET_KEY" in result.stderr
+
+
+# Для memcached клиент создаётся без подключения к серверу, поэтому
+# проверяется только то, что pymemcache принимает настройки.
+CHECK_CACHE = (
+    "import importlib.util, json; "
+    "from django.conf import settings as s; "
+    "from django.core.cache import cache; "
+    "memcached = s.CACHE_BACKEND == 'memcached'; "
+    "has_client = importlib.util.find_spec('pymemcache') is not None; "
+    "client = cache._cache if memcached and has_client else None; "
+    "memcached or cache.set('key', 'value'); "
+    "print(json.dumps([s.CACHES['default'], "
+    "memcached or cache.get('key') == 'value']))"
+)
+
+
+@pytest.mark.parametrize("backend", ("file", "locmem", "memcached"))
+def test_prod_cache_backends(tmp_path, backend):
+    location = str(tmp_path / "cache") if backend == "file" else None
+    result = _run_prod(
+        tmp_path, "shell", "-c", CHECK_CACHE,
+        BLOGICUM_CACHE_BACKEND=backend, BLOGICUM_CACHE_LOCATION=location)
+    assert result.returncode == 0, result.stderr
+    config, works = json.loads(result.stdout)
+    assert works
+    if backend == "memcached":
+        assert config["LOCATION"] == ["127.0.0.1:11211"]
+        assert "MAX_ENTRIES" not in config.get("OPTIONS", {})
+    else:
+        assert config["OPTIONS"]["MAX_ENTRIES"] == 10_000
@@ -0,0 +1,91 @@
+import threading
+import time
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.db import DatabaseError, connections
+from django.test.client import Client
+from django.utils import timezone
+
+from conftest import SQLITE_FILE
+
+pytestmark = [
+    pytest.mark.skipif(
+        connections[SQLITE_FILE].vendor != "sqlite",
+        reason="Прагмы есть только у SQLite"),
+    pytest.mark.django_db(
+        transaction=True, databases=["default", SQLITE_FILE]),
+]
+
+N_WRITERS = 8
+N_READERS = 4
+COMMENTS_PER_WRITER = 15
+
+
+def _pragma(name):
+    with connections[SQLITE_FILE].cursor() as cursor:
+        cursor.execute(f"PRAGMA {name}")
+        return cursor.fetchone()[0]
+
+
+def test_pragmas_are_applied(settings):
+    assert _pragma("journal_mode") == "wal"
+    assert _pragma("synchronous") == 1
+    assert _pragma("busy_timeout") == settings.SQLITE_PRAGMAS["busy_timeout"]
+    assert _pragma("cache_size") == settings.SQLITE_PRAGMAS["cache_size"]
+
+
+def _in_thread(target, errors):
+    def run():
+        try:
+            target()
+        except (AssertionError, DatabaseError) as error:
+            errors.append(error)
+        finally:
+            connections.close_all()
+    return threading.Thread(target=run)
+
+
+def test_concurrent_comments_and_feed_reads(sqlite_file, mixer):
+    post = mixer.blend(
+        "blog.Post", is_published=True, category__is_published=True,
+        pub_date=timezone.now() - timedelta(days=1))
+    authors = mixer.cycle(N_WRITERS).blend("auth.User")
+    start = threading.Barrier(N_WRITERS + N_READERS)
+    writers_done = threading.Event()
+    errors, reads = [], []
+
+    def write(author):
+        def target():
+            client = Client()
+            client.force_login(author)
+            start.wait()
+            for i in range(COMMENTS_PER_WRITER):
+                response = client.post(
+                    f"/posts/{post.id}/comment/", data={"text": f"#{i}"})
+                assert response.status_code == HTTPStatus.FOUND
+        return target
+
+    def read():
+        client = Client()
+        start.wait()
+        while not writers_done.is_set():
+            assert client.get("/").status_code == HTTPStatus.OK
+            reads.append(time.perf_counter())
+
+    writers = [_in_thread(write(author), errors) for author in authors]
+    readers = [_in_thread(read, errors) for _ in range(N_READERS)]
+    for thread in writers + readers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    writers_done.set()
+    for thread in readers:
+        thread.join()
+
+    assert not errors, errors
+    assert reads, "Читатели не получили ни одной страницы."
+    post.refresh_from_db()
+    assert post.comment_count == N_WRITERS * COMMENTS_PER_WRITER
+    assert post.comments.count() == N_WRITERS * COMMENTS_PER_WRITER
@@ -0,0 +1,73 @@
+import gzip
+import re
+from io import StringIO
+
+import pytest
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import RequestFactory
+
+from blog.storage import (IMMUTABLE_CACHE_CONTROL, ContentHashedStorage,
+                          ManifestStaticStorage, serve_immutable)
+
+BOOTSTRAP = "css/bootstrap.min.css"
+
+
+@pytest.fixture
+def manifest_storage(settings, tmp_path):
+    settings.STATIC_ROOT = tmp_path
+    settings.STATICFILES_STORAGE = "blog.storage.ManifestStaticStorage"
+
+
+def test_missing_manifest_entry_fails_without_debug(
+        settings, manifest_storage):
+    storage = ManifestStaticStorage()
+    assert storage.manifest_strict
+    with pytest.raises(ValueError):
+        storage.url(BOOTSTRAP)
+    with pytest.raises(ValueError):
+        storage.hashed_name(BOOTSTRAP)
+
+    settings.DEBUG = True
+    assert not storage.manifest_strict
+    assert storage.url(BOOTSTRAP) == f"/static/{BOOTSTRAP}"
+    assert storage.hashed_name(BOOTSTRAP) == BOOTSTRAP
+
+
+def test_collected_static_is_hashed_and_compressed(
+        manifest_storage, tmp_path):
+    call_command("collectstatic", interactive=False, verbosity=0)
+    url = staticfiles_storage.url(BOOTSTRAP)
+    assert re.fullmatch(r"/static/css/bootstrap\.min\.[0-9a-f]{12}\.css", url)
+
+    out = StringIO()
+    call_command("compress_static", stdout=out, stderr=StringIO())
+    hashed = tmp_path / url[len("/static/"):]
+    with gzip.open(f"{hashed}.gz") as compressed:
+        assert compressed.read() == hashed.read_bytes()
+
+
+def test_media_names_are_content_addressed(tmp_path):
+    storage = ContentHashedStorage(location=tmp_path)
+    first = storage.save("posts_images/a.JPG", ContentFile(b"same"))
+    second = storage.save("posts_images/b.jpg", ContentFile(b"same"))
+    other = storage.save("posts_images/c.jpg", ContentFile(b"other"))
+    assert first == second
+    assert re.fullmatch(r"posts_images/[0-9a-f]{32}\.jpg", first)
+    assert other != first
+
+
+def test_media_is_served_immutable(tmp_path):
+    (tmp_path / "file.jpg").write_bytes(b"data")
+    response = serve_immutable(
+        RequestFactory().get("/media/file.jpg"), "file.jpg",
+        document_root=tmp_path)
+    assert response["Cache-Control"] == IMMUTABLE_CACHE_CONTROL
+
+
+@pytest.mark.django_db
+def test_post_image_name_is_content_hash(post_with_published_location):
+    assert re.fullmatch(
+        r"posts_images/[0-9a-f]{32}\.\w+",
+        post_with_published_location.image.name)
@@ -0,0 +1,159 @@
+import io
+import json
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.models import Category, Comment, Location, Post
+from blog.transfer import export_rows, import_rows
+
+User = get_user_model()
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def blog_data(mixer, user, published_category, published_location):
+    posts = mixer.cycle(3).blend(
+        "blog.Post", author=user, category=published_category,
+        location=published_location, is_published=True,
+        pub_date=timezone.now() - timedelta(days=1))
+    for post in posts:
+        mixer.cycle(2).blend("blog.Comment", post=post, author=user)
+    long_ago = timezone.now() - timedelta(days=365)
+    Post.objects.update(created_at=long_ago)
+    Comment.objects.update(created_at=long_ago)
+    return posts
+
+
+def _snapshot():
+    return {
+        "categories": list(Category.objects.order_by("slug").values_list(
+            "slug", "title", "is_published")),
+        "locations": list(Location.objects.order_by("name").values_list(
+            "name", "is_published")),
+        "users": list(User.objects.order_by("username").values_list(
+            "username", "email")),
+        "posts": list(Post.objects.order_by("pk").values_list(
+            "pk", "title", "text", "pub_date", "created_at",
+            "author__username", "category__slug", "location__name",
+            "comment_count")),
+        "comments": list(Comment.objects.order_by("pk").values_list(
+            "pk", "post_id", "author__username", "text", "created_at")),
+    }
+
+
+def _clear():
+    Comment.objects.all().delete()
+    Post.objects.all().delete()
+    User.objects.all().delete()
+    Category.objects.all().delete()
+    Location.objects.all().delete()
+
+
+@pytest.mark.parametrize("fmt", ("jsonl", "csv"))
+def test_round_trip(blog_data, tmp_path, fmt):
+    before = _snapshot()
+    path = tmp_path / ("blog.jsonl" if fmt == "jsonl" else "blog")
+    call_command("export_blog", str(path), "--format", fmt,
+                 stderr=io.StringIO())
+    _clear()
+    out = io.StringIO()
+    call_command("import_blog", str(path), "--format", fmt,
+                 "--batch-size", "2", stdout=out, stderr=io.StringIO())
+    assert _snapshot() == before
+    assert out.getvalue().splitlines() == [
+        "category: принято 1, пропущено 0",
+        "location: принято 1, пропущено 0",
+        "user: принято 1, пропущено 0",
+        "post: принято 3, пропущено 0",
+        "comment: принято 6, пропущено 0",
+    ]
+    # Последовательности id сдвинуты: новый пост получает свободный id.
+    post = Post.objects.first()
+    post.pk = None
+    post.save()
+
+
+def test_passwords_exported_on_request(user):
+    records = dict(export_rows(["user"]))
+    assert "password" not in records["user"]
+    records = dict(export_rows(["user"], with_passwords=True))
+    assert records["user"]["password"] == user.password
+
+
+def test_natural_keys_and_orphans(user, published_category):
+    rows = [
+        ("category", {"slug": published_category.slug, "title": "Другая",
+                      "description": ""}),
+        ("location", {"name": "Новое место"}),
+        ("post", {"id": 100, "title": "Пост", "text": "Текст",
+                  "pub_date": "2020-01-01T00:00:00Z",
+                  "author": user.username,
+                  "category": published_category.slug,
+                  "location": "Новое место"}),
+        ("post", {"id": 101, "title": "Сирота", "text": "Текст",
+                  "pub_date": "2020-01-01T00:00:00Z", "author": "nobody"}),
+        ("comment", {"id": 7, "post": 100, "author": user.username,
+                     "text": "Ок"}),
+        ("comment", {"id": 8, "post": 101, "author": user.username,
+                     "text": "Нет поста"}),
+    ]
+    stats = import_rows(iter(rows), batch_size=1)
+    assert stats["post"] == [1, 1]
+    assert stats["comment"] == [1, 1]
+    post = Post.objects.get(pk=100)
+    assert post.category == published_category
+    assert post.location.name == "Новое место"
+    # Существующая категория не перезаписывается.
+    published_category.refresh_from_db()
+    assert published_category.title != "Другая"
+    assert list(post.comments.values_list("pk", flat=True)) == [7]
+
+
+@pytest.mark.parametrize("fmt", ("jsonl", "csv"))
+def test_reimport_skips_existing(blog_data, tmp_path, fmt):
+    path = tmp_path / ("blog.jsonl" if fmt == "jsonl" else "blog")
+    call_command("export_blog", str(path), "--format", fmt,
+                 stderr=io.StringIO())
+    before = _snapshot()
+    out = io.StringIO()
+    call_command("import_blog", str(path), "--format", fmt,
+                 "--batch-size", "2", stdout=out, stderr=io.StringIO())
+    assert _snapshot() == before
+    report = out.getvalue()
+    for model, count in (("category", 1), ("location", 1), ("user", 1),
+                         ("post", 3), ("comment", 6)):
+        assert f"{model}: принято 0, пропущено {count}" in report
+
+
+def test_records_without_author_are_skipped(user):
+    rows = [
+        ("post", {"id": 100, "title": "Пост", "text": "Текст",
+                  "pub_date": "2020-01-01T00:00:00Z",
+                  "author": user.username}),
+        ("post", {"id": 101, "title": "Без автора", "text": "Текст",
+                  "pub_date": "2020-01-01T00:00:00Z"}),
+        ("post", {"id": 100, "title": "Повтор", "text": "Текст",
+                  "pub_date": "2020-01-01T00:00:00Z",
+                  "author": user.username}),
+        ("comment", {"id": 7, "post": 100, "text": "Без автора"}),
+        ("comment", {"id": 8, "post": 100, "author": "",
+                     "text": "Пустой автор"}),
+    ]
+    stats = import_rows(iter(rows))
+    assert stats == {"post": [1, 2], "comment": [0, 2]}
+    assert list(Post.objects.values_list("pk", "title")) == [(100, "Пост")]
+    assert not Comment.objects.exists()
+
+
+def test_jsonl_is_one_record_per_line(blog_data, tmp_path):
+    path = tmp_path / "blog.jsonl"
+    call_command("export_blog", str(path), "--models", "post", "comment",
+                 stderr=io.StringIO())
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 9
+    assert {json.loads(line)["model"] for line in lines} == {
+        "post", "comment"}
@@ -0,0 +1,166 @@
+import os
+import struct
+import tracemalloc
+import zlib
+from http import HTTPStatus
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test.client import (BOUNDARY, MULTIPART_CONTENT, Client,
+                                RequestFactory, encode_multipart)
+from django.utils import timezone
+from PIL import Image
+
+from blog.forms import PostForm
+from blog.models import Post
+from blog.uploads import LimitedUploadHandler
+
+UPLOAD_SIZE = 16 * 1024 * 1024
+PEAK_MEMORY_LIMIT = 2 * 1024 * 1024
+
+
+def _png_header(width, height):
+    """PNG, в заголовке которого заявлены огромные размеры."""
+
+    def chunk(kind, data):
+        return (struct.pack(">I", len(data)) + kind + data
+                + struct.pack(">I", zlib.crc32(kind + data)))
+
+    return (b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2,
+                                         0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(b"\x00" * 64))
+            + chunk(b"IEND", b""))
+
+
+def _form(image, category):
+    return PostForm(
+        data={"title": "Заголовок", "text": "Текст",
+              "pub_date": "2024-01-01T00:00", "category": category.pk},
+        files={"image": image},
+    )
+
+
+@pytest.mark.django_db
+def test_oversized_file_is_rejected(settings, published_category):
+    settings.POST_IMAGE_MAX_SIZE = 1024
+    form = _form(
+        SimpleUploadedFile("big.jpg", b"\xff" * 2048), published_category)
+    assert not form.is_valid()
+    assert form.errors["image"][0].startswith("Размер файла")
+
+
+@pytest.mark.django_db
+def test_pixel_bomb_is_rejected_by_header(published_category):
+    form = _form(
+        SimpleUploadedFile("bomb.png", _png_header(50_000, 50_000)),
+        published_category)
+    assert not form.is_valid()
+    assert "пикселей" in form.errors["image"][0]
+
+
+@pytest.mark.django_db
+def test_valid_image_is_accepted(published_category):
+    buffer = BytesIO()
+    Image.new("RGB", (300, 200)).save(buffer, format="JPEG")
+    form = _form(
+        SimpleUploadedFile("ok.jpg", buffer.getvalue()), published_category)
+    form.is_valid()
+    assert "image" not in form.errors
+
+
+def test_handler_stops_writing_past_limit(settings):
+    settings.POST_IMAGE_MAX_SIZE = 100
+    handler = LimitedUploadHandler()
+    handler.new_file("image", "big.jpg", "image/jpeg", 0)
+    for start in range(0, 1000, 64):
+        handler.receive_data_chunk(b"x" * 64, start)
+    uploaded = handler.file_complete(1000)
+    assert uploaded.size == 1000
+    assert os.path.getsize(uploaded.temporary_file_path()) <= 100
+    uploaded.close()
+
+
+@pytest.mark.django_db
+def test_upload_peak_memory(record_property, published_category):
+    body = encode_multipart(BOUNDARY, {
+        "title": "Заголовок", "text": "Текст",
+        "pub_date": "2024-01-01T00:00", "category": published_category.pk,
+        "image": SimpleUploadedFile("huge.jpg", os.urandom(UPLOAD_SIZE)),
+    })
+    request = RequestFactory().generic(
+        "POST", "/posts/create/", body, content_type=MULTIPART_CONTENT)
+    request.upload_handlers = [LimitedUploadHandler(request)]
+    del body
+
+    tracemalloc.start()
+    try:
+        form = PostForm(request.POST, request.FILES)
+        form.is_valid()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert form.errors["image"][0].startswith("Размер файла")
+    record_property("upload_size_bytes", UPLOAD_SIZE)
+    record_property("peak_memory_bytes", peak)
+    assert peak < PEAK_MEMORY_LIMIT
+
+
+class RecordingUploadHandler(LimitedUploadHandler):
+    used = []
+
+    def new_file(self, *args, **kwargs):
+        self.used.append(args[1])
+        return super().new_file(*args, **kwargs)
+
+
+@pytest.mark.django_db
+def test_limited_handler_only_in_post_views(
+        settings, monkeypatch, user, published_category):
+    settings.POST_IMAGE_MAX_SIZE = 1024
+    monkeypatch.setattr("blog.mixins.LimitedUploadHandler",
+                        RecordingUploadHandler)
+    RecordingUploadHandler.used = []
+    assert "blog.uploads.LimitedUploadHandler" not in (
+        settings.FILE_UPLOAD_HANDLERS)
+    client = Client(enforce_csrf_checks=True)
+    client.force_login(user)
+    data = {"title": "Заголовок", "text": "Текст",
+            "pub_date": "2024-01-01T00:00",
+            "category": published_category.pk,
+            "image": SimpleUploadedFile("big.jpg", b"\xff" * 2048)}
+    # CSRF-токен по-прежнему обязателен.
+    response = client.post("/posts/create/", data)
+    assert response.status_code == HTTPStatus.FORBIDDEN
+
+    client.get("/posts/create/")
+    data["image"].seek(0)
+    response = client.post("/posts/create/", {
+        **data, "csrfmiddlewaretoken": client.cookies["csrftoken"].value})
+    assert response.status_code == HTTPStatus.OK
+    assert response.context["form"].errors["image"][0].startswith(
+        "Размер файла")
+    assert RecordingUploadHandler.used == ["big.jpg"]
+
+
+@pytest.mark.django_db
+def test_oversized_image_is_rejected_on_edit(
+        settings, user_client, user, published_category):
+    settings.POST_IMAGE_MAX_SIZE = 1024
+    post = Post.objects.create(
+        title="Заголовок", text="Текст", author=user,
+        category=published_category, pub_date=timezone.now())
+    buffer = BytesIO()
+    Image.effect_noise((200, 200), 64).convert("RGB").save(
+        buffer, format="JPEG")
+    assert len(buffer.getvalue()) > settings.POST_IMAGE_MAX_SIZE
+    response = user_client.post(f"/posts/{post.pk}/edit/", {
+        "title": "Заголовок", "text": "Текст",
+        "pub_date": "2024-01-01T00:00", "category": published_category.pk,
+        "image": SimpleUploadedFile("big.jpg", buffer.getvalue())})
+    assert response.status_code == HTTPStatus.OK
+    assert response.context["form"].errors["image"][0].startswith(
+        "Размер файла")
+    post.refresh_from_db()
+    assert not post.image
@@ -0,0 +1,48 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog.models import Post
+
+
+@pytest.fixture
+def posts_around_now(mixer: Mixer, user, published_category):
+    now = timezone.now()
+    return {
+        name: mixer.blend(
+            "blog.Post", author=user, is_published=True,
+            category=published_category, pub_date=now + delta)
+        for name, delta in (
+            ("earlier", -timedelta(minutes=1)),
+            ("later", timedelta(minutes=1)),
+        )
+    }
+
+
+@pytest.mark.django_db
+def test_published_compares_full_datetime(posts_around_now):
+    published = Post.objects.published()
+    assert posts_around_now["earlier"] in published
+    assert posts_around_now["later"] not in published
+
+
+@pytest.mark.django_db
+def test_visible_to_lets_author_see_own_posts(
+        user, another_user, posts_around_now, posts_with_unpublished_category):
+    hidden = [posts_around_now["later"], *posts_with_unpublished_category]
+    for post in hidden:
+        assert post in Post.objects.visible_to(user)
+        assert post not in Post.objects.visible_to(another_user)
+        assert post not in Post.objects.visible_to(AnonymousUser())
+
+
+@pytest.mark.django_db
+def test_post_detail_uses_visibility_rule(
+        user_client, another_user_client, posts_around_now):
+    url = f"/posts/{posts_around_now['later'].id}/"
+    assert user_client.get(url).status_code == HTTPStatus.OK
+    assert another_user_client.get(url).status_code == HTTPStatus.NOT_FOUND